@@ -0,0 +1,78 @@
+"""
+Word rendering time against table size: documents whose database schema
+tables have 10, 100 and 1000 columns, rendered with the bulk table
+builder (utils.add_table) and with the previous cell-by-cell builder.
+
+"us/column" is the time above a document with empty schema tables,
+divided by the number of columns: linear scaling keeps it flat.
+
+Run from design_engine_agent/:
+
+    PYTHONPATH=. python benchmarks/docx_tables.py [columns ...]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sample_design import build_design
+
+from design_engine import utils
+from design_engine.utils import render_phase3_design_to_word
+
+TABLES = 4
+
+
+def add_table_cell_by_cell(doc, headers, rows):
+    """The previous add_table: add_row().cells and cell.text per cell."""
+    table = doc.add_table(rows=1, cols=len(headers))
+    table.style = "Light Grid Accent 1"
+
+    hdr_cells = table.rows[0].cells
+    for i, h in enumerate(headers):
+        hdr_cells[i].text = h
+
+    for row in rows:
+        row_cells = table.add_row().cells
+        for i, cell in enumerate(row):
+            row_cells[i].text = str(cell)
+
+
+BUILDERS = {"bulk": utils.add_table, "cell-by-cell": add_table_cell_by_cell}
+
+
+def render_seconds(builder, design: dict, path: str, repeat: int) -> float:
+    original = utils.add_table
+    utils.add_table = builder
+    try:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            render_phase3_design_to_word(design, path)
+            best = min(best, time.perf_counter() - started)
+        return best
+    finally:
+        utils.add_table = original
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10, 100, 1000]
+
+    print(f"{TABLES} schema tables per document; best of 3 (1 at 1000+ columns)")
+    print(f"{'columns':>8}{'builder':>14}{'seconds':>10}{'us/column':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "doc.docx")
+        empty = build_design(tables=TABLES, columns=0)
+        baseline = {name: render_seconds(builder, empty, path, 3) for name, builder in BUILDERS.items()}
+
+        for columns in sizes:
+            design = build_design(tables=TABLES, columns=columns)
+            repeat = 1 if columns >= 1000 else 3
+            for name, builder in BUILDERS.items():
+                seconds = render_seconds(builder, design, path, repeat)
+                per_column = (seconds - baseline[name]) / (TABLES * columns) * 1e6
+                print(f"{columns:>8}{name:>14}{seconds:>10.3f}{per_column:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Word documents per second: a fresh python-docx Document() per render
+versus copies of the preloaded base template (docx_template).
+
+Run from design_engine_agent/:
+
+    PYTHONPATH=. python benchmarks/docx_template.py [documents] [template.docx]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sample_design import build_design
+
+from design_engine.docx_template import load_template, render_phase3_design_from_template
+from design_engine.utils import render_phase3_design_to_word
+
+
+def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    template_path = sys.argv[2] if len(sys.argv) > 2 else None
+    design = build_design()
+
+    started = time.perf_counter()
+    template = load_template(template_path)
+    print(f"template loaded and compiled in {time.perf_counter() - started:.3f}s")
+
+    engines = {
+        "python-docx": render_phase3_design_to_word,
+        "template": lambda phase3, path: render_phase3_design_from_template(phase3, path, template),
+    }
+
+    print(f"{'renderer':<14}{'docs/s':>10}{'ms/doc':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, render in engines.items():
+            render(design, str(Path(tmp) / "warmup.docx"))
+            started = time.perf_counter()
+            for i in range(documents):
+                render(design, str(Path(tmp) / f"doc-{i}.docx"))
+            elapsed = time.perf_counter() - started
+            print(f"{name:<14}{documents / elapsed:>10.1f}{elapsed / documents * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Phase 3 PDF throughput: the native fpdf2 renderer versus the current
+DOCX -> PDF path (python-docx + pdfitdown), serially and across a
+process pool like the one RenderExecutor uses.
+
+Run from design_engine_agent/:
+
+    PYTHONPATH=. python benchmarks/pdf_rendering.py [documents] [workers]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from sample_design import build_design
+
+from design_engine.pdf_rendering import render_phase3_design_to_pdf
+from design_engine.conversion import convert_in_process
+from design_engine.utils import render_phase3_design_to_word
+
+
+def docx_then_pdf(design: dict, out: str):
+    render_phase3_design_to_word(design, f"{out}.docx")
+    convert_in_process(f"{out}.docx", f"{out}.pdf")
+
+
+def native(design: dict, out: str):
+    render_phase3_design_to_pdf(design, f"{out}.pdf")
+
+
+ENGINES = {"docx + pdfitdown": docx_then_pdf, "native (fpdf2)": native}
+
+
+def serial(engine, design: dict, documents: int, out_dir: Path) -> float:
+    started = time.perf_counter()
+    for i in range(documents):
+        engine(design, str(out_dir / f"doc-{i}"))
+    return documents / (time.perf_counter() - started)
+
+
+def pooled(engine, design: dict, documents: int, out_dir: Path, workers: int) -> float:
+    # spawn: after a pdfitdown conversion in this process, forked workers hang in theirs
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        # Start the workers before timing
+        list(pool.map(engine, [design] * workers, [str(out_dir / f"warm-{i}") for i in range(workers)]))
+        started = time.perf_counter()
+        list(pool.map(engine, [design] * documents, [str(out_dir / f"doc-{i}") for i in range(documents)]))
+        return documents / (time.perf_counter() - started)
+
+
+def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    design = build_design()
+
+    print(f"{documents} documents, {workers} pool workers")
+    print(f"{'engine':<20}{'serial docs/s':>16}{'pool docs/s':>16}")
+    for name, engine in ENGINES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            engine(design, str(Path(tmp) / "warmup"))
+            one = serial(engine, design, documents, Path(tmp))
+            many = pooled(engine, design, documents, Path(tmp), workers)
+        print(f"{name:<20}{one:>16.1f}{many:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Per-request overhead of building agent pipelines + Runners versus
+reusing them from the RunnerRegistry.
+
+Run from design_engine_agent/:
+
+    PYTHONPATH=. python benchmarks/runner_registry.py [iterations]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from google.adk.agents import SequentialAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+
+from design_engine.design_document_agent import (
+    create_design_document_agent,
+    create_sectioned_design_agent,
+)
+from design_engine.question_generation_agent import create_question_generation_agent
+from design_engine.runners import RunnerRegistry
+
+
+PIPELINES = {
+    "phase2": lambda: SequentialAgent(
+        name="design_engine", sub_agents=[create_question_generation_agent()]
+    ),
+    "phase3_single": lambda: SequentialAgent(
+        name="design_engine_generation", sub_agents=[create_design_document_agent()]
+    ),
+    "phase3_sections": create_sectioned_design_agent,
+}
+
+
+def per_request(factory, session_service, iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        Runner(agent=factory(), app_name=f"app-{i % 10}", session_service=session_service)
+    return (time.perf_counter() - started) / iterations
+
+
+def from_registry(registry: RunnerRegistry, pipeline: str, iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        registry.runner(pipeline, f"app-{i % 10}")
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    session_service = InMemorySessionService()
+    registry = RunnerRegistry(session_service)
+    for name, factory in PIPELINES.items():
+        registry.register(name, factory)
+
+    print(f"{'pipeline':<18}{'per request':>14}{'registry':>14}{'saved':>14}")
+    for name, factory in PIPELINES.items():
+        built = per_request(factory, session_service, iterations)
+        reused = from_registry(registry, name, iterations)
+        print(
+            f"{name:<18}{built * 1e3:>11.3f} ms{reused * 1e3:>11.3f} ms"
+            f"{(built - reused) * 1e3:>11.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Synthetic, schema-valid Phase3SystemDesign documents for the rendering
+benchmarks. Sizes are tunable so scaling can be measured.
+"""
+
+
+def _items(prefix: str, n: int) -> list[str]:
+    return [f"{prefix} {i}: sustain the agreed behaviour under peak load and partial failure" for i in range(n)]
+
+
+def _test_plan(name: str) -> dict:
+    return {
+        "name": name,
+        "scope": f"{name} coverage of every public interface",
+        "tools": ["pytest", "locust"],
+        "success_criteria": "All critical paths pass on every merge",
+    }
+
+
+def build_design(tables: int = 8, columns: int = 12, components: int = 10) -> dict:
+    return {
+        "executive_summary": {
+            "title": "Benchmark Payments Platform",
+            "project_type": "Web application",
+            "purpose": "Accept card and wallet payments for online merchants – with “strict” latency targets.",
+            "core_features": _items("Feature", 8),
+            "constraints": _items("Constraint", 5),
+            "user_scale": {"expected_active_users": "1M", "concurrent_users": 20000},
+        },
+        "system_overview": {
+            "functional_goals": _items("Goal", 8),
+            "non_functional_requirements": _items("NFR", 8),
+            "primary_user_personas": ["Merchant admin", "Shopper", "Support agent"],
+            "user_flows": [
+                {
+                    "name": f"Flow {i}",
+                    "description": "Shopper completes a checkout",
+                    "entry_points": ["Web", "Mobile"],
+                    "success_criteria": "Payment captured",
+                }
+                for i in range(4)
+            ],
+            "assumptions": _items("Assumption", 4),
+        },
+        "architecture_design": {
+            "overview": "Event-driven services behind an API gateway. " * 6,
+            "components": [
+                {
+                    "name": f"service-{i}",
+                    "responsibility": "Owns one bounded context and its data",
+                    "technologies": ["Python", "FastAPI", "PostgreSQL"],
+                    "interfaces": ["REST", "Kafka"],
+                    "notes": "Horizontally scaled",
+                }
+                for i in range(components)
+            ],
+            "data_flow_diagram_refs": ["DFD-1"],
+            "critical_interactions": _items("Interaction", 4),
+            "rationale": _items("Rationale", 4),
+        },
+        "database_design": {
+            "db_type": "PostgreSQL",
+            "storage_characteristics": "Row store with monthly partitions",
+            "schemas": [
+                {
+                    "table_name": f"table_{t}",
+                    "description": "Transactional records",
+                    "columns": [
+                        {
+                            "name": f"column_{c}",
+                            "type": "varchar(255)" if c % 3 else "bigint",
+                            "nullable": bool(c % 2),
+                            "description": f"Attribute {c} of the record, indexed when queried",
+                        }
+                        for c in range(columns)
+                    ],
+                    "indexes": ["pk", "created_at"],
+                }
+                for t in range(tables)
+            ],
+            "relationships": _items("Relationship", 4),
+            "transactions_and_consistency": "Serializable for ledger writes",
+            "backup_and_replication": ["PITR", "Cross-region replica"],
+        },
+        "security_and_compliance": {
+            "authentication": {"method": "OAuth2", "identity_provider": "Keycloak", "session_management": "JWT"},
+            "authorization": ["RBAC"],
+            "encryption": ["TLS 1.3", "AES-256 at rest"],
+            "compliance": ["PCI DSS"],
+            "monitoring_and_alerting": ["SIEM"],
+            "incident_response": "24/7 on-call rotation",
+        },
+        "deployment_strategy": {
+            "model": "Cloud",
+            "containerization": ["Docker"],
+            "orchestration": "Kubernetes",
+            "ci_cd": ["GitHub Actions"],
+            "rollout_strategy": ["Canary"],
+            "infra_as_code": "Terraform",
+        },
+        "scalability_and_reliability": {
+            "load_balancing": ["L7"],
+            "autoscaling": ["HPA"],
+            "caching_strategy": ["Redis"],
+            "failover_and_dr": ["Multi-AZ"],
+            "monitoring_metrics": ["p99 latency"],
+            "slo_sla_targets": [
+                {"metric": "availability", "target": "99.95%", "measurement_window": "30d", "notes": "-"}
+            ],
+        },
+        "cost_and_resource_estimation": {
+            "cost_items": [
+                {"name": f"Cost item {i}", "monthly_estimate_usd": 120.5 * (i + 1), "rationale": "Sized for peak"}
+                for i in range(6)
+            ],
+            "one_time_costs": [{"name": "Setup", "monthly_estimate_usd": 5000, "rationale": "Migration"}],
+            "assumptions": ["On-demand pricing"],
+            "licensing": ["OSS"],
+        },
+        "testing_and_qa_strategy": {
+            "unit_testing": _test_plan("Unit"),
+            "integration_testing": _test_plan("Integration"),
+            "e2e_testing": _test_plan("End-to-end"),
+            "load_and_stress": _test_plan("Load"),
+            "security_testing": _test_plan("Security"),
+            "acceptance_criteria": _items("Criterion", 4),
+        },
+        "appendices": {
+            "glossary": [{"term": f"Term {i}", "definition": "Definition of the term"} for i in range(6)],
+            "references": ["PCI DSS v4.0"],
+            "additional_notes": "None",
+        },
+        "mermaid_diagrams": {
+            "system_architecture": "flowchart LR\nClient-->Gateway\nGateway-->Payments",
+            "user_flows": "flowchart TD\nCart-->Checkout-->Receipt",
+            "database_er": "erDiagram\nMERCHANT ||--o{ PAYMENT : receives",
+        },
+    }
@@ -0,0 +1,244 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, Optional
+
+from google.adk.models.lite_llm import LiteLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+
+# =========================
+# Priorities
+# =========================
+
+# Short, interactive calls a user is waiting on (Phase 2 questions)
+PRIORITY_INTERACTIVE = 0
+# Long background generations (Phase 3 designs)
+PRIORITY_BATCH = 1
+
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+
+class AdmissionRejected(Exception):
+    """Raised when the LLM wait queue is full; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# =========================
+# Admission Scheduler
+# =========================
+
+class AdmissionScheduler:
+    """
+    Global concurrency cap for LLM requests with fair queuing.
+
+    - At most ``max_concurrent`` requests hold a slot at once
+    - Waiting runs are queued per user and served round-robin, so one
+      user with many requests cannot starve the others
+    - Interactive runs go first, but after ``interactive_weight``
+      interactive grants in a row a waiting batch run is let through
+    - New interactive runs are rejected (AdmissionRejected) once
+      ``max_waiting`` runs are queued; batch runs always wait
+
+    The cap is per process: with several uvicorn workers the model
+    server sees up to workers x ``max_concurrent`` runs.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        max_waiting: int = 20,
+        interactive_weight: int = 4,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.interactive_weight = interactive_weight
+        self._active = 0
+        self._interactive_streak = 0
+        # priority -> user_id -> waiting futures; the user order is the round-robin order
+        self._waiting: dict[int, OrderedDict[str, deque[asyncio.Future]]] = {
+            PRIORITY_INTERACTIVE: OrderedDict(),
+            PRIORITY_BATCH: OrderedDict(),
+        }
+        self._metrics = {
+            "admitted": 0,
+            "rejected": 0,
+            "total_wait_seconds": 0.0,
+            "total_hold_seconds": 0.0,
+            "released": 0,
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(
+            len(futures) for users in self._waiting.values() for futures in users.values()
+        )
+
+    def overloaded(self) -> bool:
+        return self.queue_depth >= self.max_waiting
+
+    def retry_after(self) -> int:
+        """Rough seconds until a new run would be admitted."""
+        released = self._metrics["released"]
+        avg_hold = self._metrics["total_hold_seconds"] / released if released else 30.0
+        rounds = (self.queue_depth + 1) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(rounds * avg_hold))
+
+    @asynccontextmanager
+    async def slot(self, user_id: str, priority: int = PRIORITY_BATCH, reject_when_full: bool = False):
+        await self.acquire(user_id, priority, reject_when_full)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._metrics["total_hold_seconds"] += time.perf_counter() - started
+            self.release()
+
+    async def acquire(self, user_id: str, priority: int = PRIORITY_BATCH, reject_when_full: bool = False):
+        if self._active < self.max_concurrent and not self.queue_depth:
+            self._grant(priority)
+            return
+
+        if reject_when_full and self.overloaded():
+            self._metrics["rejected"] += 1
+            raise AdmissionRejected(
+                f"LLM queue is full ({self.queue_depth} waiting)", self.retry_after()
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[priority].setdefault(user_id, deque()).append(future)
+        started = time.perf_counter()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: hand the slot on
+                self.release()
+            else:
+                self._remove(priority, user_id, future)
+            raise
+        self._metrics["total_wait_seconds"] += time.perf_counter() - started
+
+    def release(self):
+        self._active -= 1
+        self._metrics["released"] += 1
+        self._dispatch()
+
+    def _grant(self, priority: int):
+        self._active += 1
+        self._metrics["admitted"] += 1
+        if priority == PRIORITY_INTERACTIVE:
+            self._interactive_streak += 1
+        else:
+            self._interactive_streak = 0
+
+    def _dispatch(self):
+        while self._active < self.max_concurrent:
+            priority = self._next_priority()
+            if priority is None:
+                return
+
+            users = self._waiting[priority]
+            user_id, futures = next(iter(users.items()))
+            future = futures.popleft()
+            # Rotate: this user goes to the back of the line
+            del users[user_id]
+            if futures:
+                users[user_id] = futures
+
+            if future.cancelled():
+                continue
+            self._grant(priority)
+            future.set_result(None)
+
+    def _next_priority(self) -> Optional[int]:
+        interactive = bool(self._waiting[PRIORITY_INTERACTIVE])
+        batch = bool(self._waiting[PRIORITY_BATCH])
+        if interactive and not (batch and self._interactive_streak >= self.interactive_weight):
+            return PRIORITY_INTERACTIVE
+        if batch:
+            return PRIORITY_BATCH
+        return None
+
+    def _remove(self, priority: int, user_id: str, future: asyncio.Future):
+        futures = self._waiting[priority].get(user_id)
+        if futures is None:
+            return
+        try:
+            futures.remove(future)
+        except ValueError:
+            return
+        if not futures:
+            del self._waiting[priority][user_id]
+
+    def stats(self) -> dict:
+        admitted = self._metrics["admitted"]
+        released = self._metrics["released"]
+        return {
+            "active": self._active,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": self.queue_depth,
+            "waiting": {
+                PRIORITY_NAMES[p]: sum(len(f) for f in users.values())
+                for p, users in self._waiting.items()
+            },
+            "waiting_users": len(
+                {u for users in self._waiting.values() for u in users}
+            ),
+            "admitted": admitted,
+            "rejected": self._metrics["rejected"],
+            "avg_wait_seconds": self._metrics["total_wait_seconds"] / admitted if admitted else 0.0,
+            "avg_hold_seconds": self._metrics["total_hold_seconds"] / released if released else 0.0,
+        }
+
+
+# =========================
+# Per-request admission
+# =========================
+
+# (scheduler, user_id, priority, reject_when_full) of the agent run in progress
+_admission: ContextVar[Optional[tuple]] = ContextVar("llm_admission", default=None)
+
+
+@contextmanager
+def admitting(
+    scheduler: AdmissionScheduler,
+    user_id: str,
+    priority: int = PRIORITY_BATCH,
+    reject_when_full: bool = False,
+):
+    """
+    Every LLM request made inside this block, including from the tasks
+    it starts (e.g. the parallel section agents), waits for its own slot
+    of ``scheduler`` (see AdmittedLiteLlm).
+    """
+    token = _admission.set((scheduler, user_id, priority, reject_when_full))
+    try:
+        yield
+    finally:
+        _admission.reset(token)
+
+
+class AdmittedLiteLlm(LiteLlm):
+    """LiteLlm whose requests hold a slot of the admission in effect (``admitting``), if any."""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        admission = _admission.get()
+        if admission is None:
+            async for response in super().generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+
+        scheduler, user_id, priority, reject_when_full = admission
+        async with scheduler.slot(user_id, priority, reject_when_full):
+            async for response in super().generate_content_async(llm_request, stream=stream):
+                yield response
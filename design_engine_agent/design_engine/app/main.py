@@ -1,16 +1,17 @@
 from fastapi import FastAPI, Request, Form, HTTPException , Body
-from fastapi.responses import HTMLResponse , RedirectResponse , FileResponse
+from fastapi.responses import HTMLResponse , RedirectResponse , FileResponse , StreamingResponse , JSONResponse
 from fastapi.templating import Jinja2Templates 
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+from contextlib import asynccontextmanager
+import os
 import urllib.parse
 import uuid
 import asyncio
-from typing import List
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel
+from dataclasses import asdict
 from google.adk.agents import SequentialAgent
-from google.adk.sessions import InMemorySessionService
-from google.adk.runners import Runner
-from google.genai import types
 from google.adk.events import Event, EventActions
 from litellm import close_litellm_async_clients
 from datetime import datetime
@@ -19,17 +20,287 @@ from ..question_generation_agent import create_question_generation_agent
 import json
 from ..utils import (
     normalize_phase_2_questions,
-    render_phase3_design_to_word,
     build_new_message_phase2,
-    build_new_message_phase3
+    build_new_message_phase3,
+    build_new_message_phase3_sections,
 )
-from ..design_document_agent import create_design_document_agent
-from docx2pdf import convert
-from litellm.exceptions import BadRequestError
+from ..design_document_agent import (
+    create_design_document_agent,
+    create_sectioned_design_agent,
+    pop_raw_output,
+    PHASE3_SECTIONS,
+    section_output_key,
+    OLLAMA_MODEL,
+    OLLAMA_KEEP_ALIVE,
+    PROMPT_VERSION,
+)
+from ..jobs import JobQueue, JobQueueFull, SqliteJobStore, ACTIVE_STATUSES, JOB_QUEUED, JOB_SUCCEEDED
+from ..progress import (
+    ProgressBroker,
+    format_sse,
+    PROGRESS_STATUS,
+    PROGRESS_SECTION_COMPLETED,
+    PROGRESS_CACHE_HIT,
+    PROGRESS_COALESCED,
+    PROGRESS_RENDER_STARTED,
+    PROGRESS_PDF_READY,
+)
+from ..rendering import RenderExecutor
+from ..design_store import (
+    DESIGN_SUFFIX,
+    StoredDesignError,
+    design_path_for,
+    document_paths_for,
+    find_designs,
+    load_design,
+)
+from ..rerender import RERENDER_SUCCEEDED, rerender_design, rerender_designs, summarize as summarize_rerender
+from ..retry import RetryController, retry_metrics
+from ..admission import (
+    AdmissionScheduler,
+    AdmissionRejected,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BATCH,
+)
+from ..repair import Phase3SectionRepairer
+from ..runners import RunnerRegistry
+from ..warmup import ModelWarmup
+from ..catalog import ProjectCatalog
+from ..cache import PersistentCache, phase2_question_key, phase3_design_key
+from ..singleflight import SingleFlight
+from google.adk.sessions import DatabaseSessionService
+from ..session_store import (
+    TTLSessionStore,
+    SqliteSessionStore,
+    BoundedInMemorySessionService,
+    run_expiry_loop,
+)
+from ..db import enable_wal
+from ..schemas import ClarificationQuestions, Phase3SystemDesign
+
+
+# ----------------------------
+# Background Jobs (Phase 3 generation)
+# ----------------------------
+PHASE3_WORKERS = int(os.getenv("DESIGN_ENGINE_PHASE3_WORKERS", "2"))
+PHASE3_MAX_QUEUE = int(os.getenv("DESIGN_ENGINE_PHASE3_MAX_QUEUE", "50"))
+# Cancel Phase 3 jobs whose progress nobody has watched for this long (0 = never);
+# jobs submitted through the JSON API are never abandoned
+ABANDON_JOB_AFTER = float(os.getenv("DESIGN_ENGINE_ABANDON_JOB_AFTER", "60")) or None
+# Bulk re-render jobs get workers of their own, so they never hold up Phase 3
+RERENDER_WORKERS = int(os.getenv("DESIGN_ENGINE_RERENDER_WORKERS", "1"))
+
+
+
+# ----------------------------
+# LLM retries (shared by Phase 2 and Phase 3)
+# ----------------------------
+MAX_RETRIES = int(os.getenv("DESIGN_ENGINE_MAX_RETRIES", "5"))
+RETRY_BASE_DELAY = float(os.getenv("DESIGN_ENGINE_RETRY_BASE_DELAY", "1.0"))
+
+# LLM admission: global cap on concurrent runs, fair per-user queuing,
+# Phase 2 ahead of Phase 3, 503 + Retry-After once too many are waiting
+llm_scheduler = AdmissionScheduler(
+    max_concurrent=int(os.getenv("DESIGN_ENGINE_LLM_CONCURRENCY", "2")),
+    max_waiting=int(os.getenv("DESIGN_ENGINE_LLM_MAX_WAITING", "20")),
+    interactive_weight=int(os.getenv("DESIGN_ENGINE_LLM_INTERACTIVE_WEIGHT", "4")),
+)
+
+# Model warmup: load the model before the first request and keep it resident
+WARMUP_ENABLED = os.getenv("DESIGN_ENGINE_WARMUP", "true").lower() == "true"
+WARMUP_MODELS = [OLLAMA_MODEL] + [
+    m.strip() for m in os.getenv("DESIGN_ENGINE_WARMUP_MODELS", "").split(",")
+    if m.strip() and m.strip() != OLLAMA_MODEL
+]
+
+model_warmup = ModelWarmup(
+    models=WARMUP_MODELS if WARMUP_ENABLED else [],
+    keep_alive=OLLAMA_KEEP_ALIVE,
+    # Well under Ollama's default 5 minute keep-alive, in case it is ignored
+    refresh_interval=float(os.getenv("DESIGN_ENGINE_KEEP_WARM_INTERVAL", "120")) or None,
+)
+
+# "single": one agent emits the whole document
+# "sections": one agent per Phase3SystemDesign section, run in parallel
+PHASE3_GENERATION_MODE = os.getenv("PHASE3_GENERATION_MODE", "single")
+
+
+# ----------------------------
+# Caches (SQLite files shared by all worker processes)
+# ----------------------------
+CACHE_DIR = Path(os.getenv("DESIGN_ENGINE_CACHE_DIR", "design_engine/.cache"))
+
+question_cache = PersistentCache(
+    CACHE_DIR / "phase2_questions.sqlite3",
+    max_entries=int(os.getenv("DESIGN_ENGINE_QUESTION_CACHE_ENTRIES", "1000")),
+    ttl_seconds=float(os.getenv("DESIGN_ENGINE_QUESTION_CACHE_TTL", str(7 * 24 * 3600))),
+)
+
+design_cache = PersistentCache(
+    CACHE_DIR / "phase3_designs.sqlite3",
+    max_entries=int(os.getenv("DESIGN_ENGINE_DESIGN_CACHE_ENTRIES", "500")),
+    ttl_seconds=float(os.getenv("DESIGN_ENGINE_DESIGN_CACHE_TTL", str(30 * 24 * 3600))),
+    max_bytes=int(os.getenv("DESIGN_ENGINE_DESIGN_CACHE_BYTES", str(256 * 1024 * 1024))),
+)
+
+
+# In-flight request coalescing, keyed like the caches above
+phase2_flight = SingleFlight("phase2")
+design_flight = SingleFlight("phase3")
+
+
+# ----------------------------
+# Document Rendering (DOCX + PDF in worker processes)
+# ----------------------------
+RENDER_WORKERS = int(os.getenv("DESIGN_ENGINE_RENDER_WORKERS", "0")) or None
+RENDER_TIMEOUT = float(os.getenv("DESIGN_ENGINE_RENDER_TIMEOUT", "300"))
+
+render_executor = RenderExecutor(max_workers=RENDER_WORKERS, timeout=RENDER_TIMEOUT)
+# Documents one bulk re-render job renders at once; the other workers stay free for Phase 3
+RERENDER_CONCURRENCY = (
+    int(os.getenv("DESIGN_ENGINE_RERENDER_CONCURRENCY", "0")) or max(1, render_executor.max_workers // 2)
+)
+# Re-render jobs belong to no session; this keeps one active job per user
+RERENDER_SESSION_ID = "rerender"
+# Retry-After (seconds) when the re-render queue is full
+RERENDER_RETRY_AFTER = 30
+
+
+# ----------------------------
+# Session state (bounded, expiring)
+# ----------------------------
+SESSION_TTL = float(os.getenv("DESIGN_ENGINE_SESSION_TTL", "7200"))
+SESSION_EXPIRY_INTERVAL = float(os.getenv("DESIGN_ENGINE_SESSION_EXPIRY_INTERVAL", "60"))
+
+# "memory": per-process state, single uvicorn worker only
+# "sqlite": shared SQLite file (WAL), any worker can serve any request
+SESSION_BACKEND = os.getenv("DESIGN_ENGINE_SESSION_BACKEND", "memory")
+DB_PATH = Path(os.getenv("DESIGN_ENGINE_DB_PATH", "design_engine/.data/design_engine.sqlite3"))
+
+if SESSION_BACKEND == "sqlite":
+    # Phase 2 wizard state: questions, answers and current question index
+    phase2_sessions = SqliteSessionStore(
+        DB_PATH,
+        ttl_seconds=SESSION_TTL,
+        max_entries=int(os.getenv("DESIGN_ENGINE_WIZARD_MAX_ENTRIES", "10000")),
+    )
+    enable_wal(DB_PATH)
+    session_service_stateful = DatabaseSessionService(
+        db_url=f"sqlite+aiosqlite:///{DB_PATH}",
+        connect_args={"timeout": 30},
+    )
+    # Job status must be visible to whichever worker serves /jobs/{id}
+    job_store = SqliteJobStore(
+        DB_PATH.with_name("jobs.sqlite3"),
+        ttl_seconds=SESSION_TTL,
+        max_entries=int(os.getenv("DESIGN_ENGINE_JOB_STORE_ENTRIES", "10000")),
+    )
+else:
+    # Phase 2 wizard state: questions, answers and current question index
+    phase2_sessions = TTLSessionStore(
+        ttl_seconds=SESSION_TTL,
+        max_entries=int(os.getenv("DESIGN_ENGINE_WIZARD_MAX_ENTRIES", "10000")),
+        max_bytes=int(os.getenv("DESIGN_ENGINE_WIZARD_MAX_BYTES", str(64 * 1024 * 1024))),
+    )
+    session_service_stateful = BoundedInMemorySessionService(
+        ttl_seconds=SESSION_TTL,
+        max_sessions=int(os.getenv("DESIGN_ENGINE_MAX_SESSIONS", "1000")),
+        max_bytes=int(os.getenv("DESIGN_ENGINE_SESSIONS_MAX_BYTES", str(256 * 1024 * 1024))),
+    )
+    job_store = None
+
+job_queue = JobQueue(
+    num_workers=PHASE3_WORKERS,
+    max_queue_size=PHASE3_MAX_QUEUE,
+    store=job_store,
+    abandon_after=ABANDON_JOB_AFTER,
+    lanes={"rerender": RERENDER_WORKERS},
+)
+
+
+def overloaded_response(retry_after: int, message: str = None) -> HTMLResponse:
+    return HTMLResponse(
+        message or f"The design engine is busy, please retry in {retry_after}s",
+        status_code=503,
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client went away before its request finished."""
+
+
+async def run_until_disconnected(request: Request, coro, poll_interval: float = 1.0):
+    """
+    Await ``coro`` while polling the client connection; if the client
+    disconnects, cancel it (which aborts the in-flight LLM request).
+    """
+    task = asyncio.create_task(coro)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=poll_interval)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise ClientDisconnected()
+
+
+# ----------------------------
+# Live progress (Server-Sent Events)
+# ----------------------------
+progress_broker = ProgressBroker()
+
+
+def publish_job_status(job):
+    progress_broker.publish(job.id, PROGRESS_STATUS, status=job.status, error=job.error)
+    if job.status not in ACTIVE_STATUSES:
+        progress_broker.close(job.id)
+
+
+job_queue.add_listener(publish_job_status)
+
+
+def pin_job_session(job):
+    """A job's session must not be evicted or expire while it waits in the queue or runs."""
+    if job.kind != "phase3":
+        return
+    key = {"app_name": job.app_name, "user_id": job.user_id, "session_id": job.session_id}
+    # Published once as queued and once when finished (or cancelled while queued)
+    if job.status == JOB_QUEUED:
+        session_service_stateful.pin(**key)
+    elif job.status not in ACTIVE_STATUSES:
+        session_service_stateful.unpin(**key)
+
 
+if hasattr(session_service_stateful, "pin"):
+    job_queue.add_listener(pin_job_session)
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    render_executor.start()
+    runner_registry.warm("phase2", PHASE3_PIPELINE)
+    # Runs in the background; /ready reports when the model is loaded
+    warmup_task = asyncio.create_task(model_warmup.run())
+    await job_queue.start()
+    expiry_task = asyncio.create_task(
+        run_expiry_loop(
+            phase2_sessions,
+            session_service_stateful,
+            *([job_store] if job_store else []),
+            interval=SESSION_EXPIRY_INTERVAL,
+        )
+    )
+    yield
+    warmup_task.cancel()
+    expiry_task.cancel()
+    await job_queue.stop()
+    render_executor.shutdown()
+    await close_litellm_async_clients()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 app.mount(
@@ -41,27 +312,35 @@ app.mount(
 
 BASE_PATH = Path("design_engine/documents")
 
-user_projects = {
-    user_dir.name: [
-        file.name
-        for file in user_dir.iterdir()
-        if file.is_file() and file.suffix.lower() == ".pdf"
-    ]
-    for user_dir in BASE_PATH.iterdir()
-    if user_dir.is_dir()
-}
-
-print(f'All the user_projects are: {user_projects}')
-
+# ----------------------------
+# Project catalog (lazy, incrementally refreshed SQLite index)
+# ----------------------------
+CATALOG_PATH = os.getenv("DESIGN_ENGINE_CATALOG_PATH", "design_engine/.data/projects.sqlite3")
+DASHBOARD_PAGE_SIZE = int(os.getenv("DESIGN_ENGINE_DASHBOARD_PAGE_SIZE", "20"))
 
-templates = Jinja2Templates(directory="design_engine/templates")
+project_catalog = ProjectCatalog(CATALOG_PATH, BASE_PATH)
 
 
-sessions = {}
+async def dashboard_context(request: Request, user: str, page: int = 1, **extra) -> dict:
+    page = max(page, 1)
+    projects, total = await project_catalog.alist_projects(
+        user,
+        offset=(page - 1) * DASHBOARD_PAGE_SIZE,
+        limit=DASHBOARD_PAGE_SIZE,
+    )
+    return {
+        "request": request,
+        "username": user,
+        "projects": projects,
+        "page": page,
+        "pages": max(1, -(-total // DASHBOARD_PAGE_SIZE)),
+        "total_projects": total,
+        "jobs": [job.to_dict() for job in await job_queue.alist_jobs(user)],
+        **extra,
+    }
 
-phase2_sessions = {}
-session_service_stateful = InMemorySessionService()
 
+templates = Jinja2Templates(directory="design_engine/templates")
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -110,13 +389,128 @@ async def logout(request: Request, payload: dict = Body(...)):
     return response
 
 @app.get("/dashboard")
-async def dashboard(request: Request):
+async def dashboard(request: Request, page: int = 1):
     user = request.cookies.get("user")
     if not user:
         return HTMLResponse("<h3>You are not logged in</h3>", status_code=401)
     
-    projects = user_projects.get(user, [])
-    return templates.TemplateResponse("dashboard.html", {"request": request, "username": user, "projects": projects})
+    return templates.TemplateResponse(
+        "dashboard.html",
+        await dashboard_context(request, user, page)
+    )
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "jobs": job_queue.stats(),
+        "rendering": render_executor.stats(),
+        "pdf_conversion": render_executor.conversion.stats() if render_executor.conversion else None,
+        "retries": retry_metrics,
+        "llm_admission": llm_scheduler.stats(),
+        "runners": runner_registry.stats(),
+        "warmup": model_warmup.stats(),
+        "question_cache": await asyncio.to_thread(question_cache.stats),
+        "design_cache": await asyncio.to_thread(design_cache.stats),
+        "catalog": await asyncio.to_thread(project_catalog.stats),
+        "coalescing": {
+            "phase2": phase2_flight.stats(),
+            "phase3": design_flight.stats(),
+        },
+        "sessions": {
+            "backend": SESSION_BACKEND,
+            "wizard": await asyncio.to_thread(phase2_sessions.stats),
+            "adk": (
+                session_service_stateful.stats()
+                if hasattr(session_service_stateful, "stats") else {}
+            ),
+        },
+    }
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 only once the configured models are warm."""
+    return JSONResponse(
+        model_warmup.stats(),
+        status_code=200 if model_warmup.ready else 503,
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = await job_queue.aget(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job_queue.touch(job_id)
+    return job.to_dict()
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(request: Request, job_id: str):
+    job = await job_queue.aget(job_id)
+    if not job or job.user_id != request.cookies.get("user"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not await job_queue.acancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status}")
+    return {"id": job_id, "cancelled": True}
+
+
+@app.get("/jobs/{job_id}/progress", response_class=HTMLResponse)
+async def job_progress_page(request: Request, job_id: str):
+    job = await job_queue.aget(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job_queue.touch(job_id)
+    return templates.TemplateResponse(
+        "phase3/progress.html",
+        {"request": request, "job": job.to_dict()}
+    )
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(request: Request, job_id: str):
+    """
+    Server-Sent Events stream of a job's progress. Reconnecting clients
+    send Last-Event-ID and only receive what they missed.
+    """
+    job = await job_queue.aget(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    last_event_id = int(request.headers.get("last-event-id") or 0)
+
+    if progress_broker.has(job_id):
+        events = progress_broker.subscribe(job_id, after=last_event_id)
+    else:
+        # Job runs in another worker process: follow its shared status only
+        events = poll_job_status(job_id)
+
+    async def stream():
+        async for event in events:
+            # An open stream (keep-alives included) keeps the job from being abandoned
+            job_queue.touch(job_id)
+            yield format_sse(event)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def poll_job_status(job_id: str, interval: float = 2.0):
+    last_status, event_id = None, 0
+    while True:
+        job = await job_queue.aget(job_id)
+        if job is None:
+            return
+        if job.status != last_status:
+            last_status, event_id = job.status, event_id + 1
+            yield {"id": event_id, "type": PROGRESS_STATUS, "status": job.status, "error": job.error}
+        if job.status not in ACTIVE_STATUSES:
+            return
+        await asyncio.sleep(interval)
 
 
 
@@ -158,6 +552,24 @@ root_agent = SequentialAgent(
     )
 
 
+# ----------------------------
+# Runner registry (agents built once, runners reused per app_name)
+# ----------------------------
+def create_phase3_single_pipeline():
+    return SequentialAgent(
+        name="design_engine_generation",
+        sub_agents=[create_design_document_agent()]
+    )
+
+
+PHASE3_PIPELINE = f"phase3_{PHASE3_GENERATION_MODE}"
+
+runner_registry = RunnerRegistry(session_service_stateful)
+runner_registry.register("phase2", lambda: root_agent)
+runner_registry.register("phase3_single", create_phase3_single_pipeline)
+runner_registry.register("phase3_sections", create_sectioned_design_agent)
+
+
 
 # ---------------------------
 # Phase 1: Handle Form Submission
@@ -171,7 +583,8 @@ async def new_project_phase1(
     description: str = Form(...),
     core_features: str = Form(""),
     expected_user_scale: str = Form(...),
-    constraints: List[str] = Form([])
+    constraints: List[str] = Form([]),
+    no_cache: bool = Form(False),
 ):
     user = request.cookies.get("user")
     if not user:
@@ -192,24 +605,56 @@ async def new_project_phase1(
     encoded = urllib.parse.quote(json.dumps(phase_1_inputs))
 
     # Redirect to Phase 2 questions (you can generate questions dynamically here)
-    return RedirectResponse(f"/phase2?data={encoded}", status_code=303)
+    cache_flag = "&no_cache=true" if no_cache else ""
+    return RedirectResponse(f"/phase2?data={encoded}{cache_flag}", status_code=303)
 
 
 @app.get("/phase2")
-async def phase2_start(request: Request, data: str = None):
+async def phase2_start(request: Request, data: str = None, no_cache: bool = False):
     print(f'################### Inside Phase2 ############################')
 
     
-    MAX_RETRIES = 5
-    attempt = 0
-    success = False
     phase_1_inputs = json.loads(urllib.parse.unquote(data)) if data else {}
     print(f'Phase1 inputs: {phase_1_inputs}')
+
+    try:
+        session_id, _ = await start_phase2_session(request, phase_1_inputs, no_cache)
+    except ClientDisconnected:
+        return HTMLResponse("Client disconnected", status_code=499)
+    except AdmissionRejected as e:
+        print(f"🚦 Phase 2 rejected, LLM queue full: {e}")
+        return overloaded_response(e.retry_after)
+
+    return RedirectResponse(
+    f"/phase2/{session_id}",
+    status_code=303
+    )
+
+
+async def start_phase2_session(
+    request: Request,
+    phase_1_inputs: dict,
+    no_cache: bool = False,
+) -> tuple[str, dict]:
+    """
+    Creates the project session and its Phase 2 questions (cache or LLM).
+    Returns the session id and the normalized questions; raises
+    ClientDisconnected / AdmissionRejected.
+    """
     # Generate a session
     session_id = str(uuid.uuid4())
     print(f'Session ID:- {session_id}' )
 
+    # -----------------
+    # Question cache (skip the LLM for previously seen Phase 1 inputs)
+    # -----------------
+    cache_key = phase2_question_key(phase_1_inputs)
+    cached_questions = None if no_cache else await question_cache.aget(cache_key)
+
     initial_state = {"phase_1_inputs": phase_1_inputs}
+    if cached_questions is not None:
+        print(f'⚡ Phase 2 question cache hit: {cache_key[:12]}')
+        initial_state["phase_2_clarification_questions"] = cached_questions
     print(f'Initial State:- {initial_state}')
     
 
@@ -223,91 +668,103 @@ async def phase2_start(request: Request, data: str = None):
 
     print(f'Session Created')
 
-
-    runner = Runner(
-        agent=root_agent,
-        app_name=phase_1_inputs["project_name"],
-        session_service=session_service_stateful,
-    )
-    print(f'Runner Created')
-
-    new_message = types.Content(
-        role="user",
-        parts=[types.Part(
-            text="Based on Phase 1 inputs, generate clarification questions to finalize the system design."
-        )]
-    )
-    print(f'New Message Created')
-
-    while attempt < MAX_RETRIES and not success:
-        attempt += 1
-        print(f"\n🔁 Runner attempt {attempt}")
-
-        new_message = build_new_message_phase2(is_retry=(attempt > 1))
-
+    if cached_questions is None:
         try:
-            async for event in runner.run_async(
-                user_id=phase_1_inputs["user"],
-                session_id=session_id,
-                new_message=new_message,
-            ):
-                if event.is_final_response():
-                    print("\n=== Phase 2 Questions Generated ===")
-                    print(event.content.parts[0].text)
-                    success = True
-
-        except BadRequestError as e:
-            print("❌ LLM BadRequestError occurred")
-            print("Message:", str(e))
-
-            if hasattr(e, "response"):
-                print("Raw response:", e.response)
-
-            if attempt >= MAX_RETRIES:
-                print("🚨 Max retries reached. Aborting.")
-                raise
-
-            print("🔧 Retrying with stricter prompt...")
-
-        except Exception as e:
-            print("❌ Unexpected error:", e)
+            # Identical concurrent requests share one generation; a client
+            # that leaves stops waiting (and stops the LLM if nobody else waits).
+            # Its session is left to expire since a shared run may still use it.
+            cached_questions, shared = await run_until_disconnected(
+                request,
+                phase2_flight.do(
+                    cache_key,
+                    lambda: generate_phase2_questions(
+                        phase_1_inputs["project_name"], phase_1_inputs["user"], session_id
+                    ),
+                ),
+            )
+        except ClientDisconnected:
+            print(f"🛑 Client left during Phase 2 for session {session_id}")
             raise
 
+        if shared:
+            # Generated in another request's session: copy it into ours
+            await append_state(
+                phase_1_inputs["project_name"],
+                phase_1_inputs["user"],
+                session_id,
+                {"phase_2_clarification_questions": cached_questions},
+            )
+        else:
+            await question_cache.aset(cache_key, cached_questions)
+
     
     # -----------------
-    # Fetch Phase 2 Questions from Session
+    # Validated Phase 2 Questions
     # -----------------
-    session = await session_service_stateful.get_session(
-        app_name=phase_1_inputs["project_name"],
-        user_id=phase_1_inputs["user"],
-        session_id=session_id,
-    )
+    phase_2_clarification_questions = normalize_phase_2_questions(cached_questions)
 
-    raw_phase_2_questions = session.state.get("phase_2_clarification_questions", {} )
-    phase_2_clarification_questions = normalize_phase_2_questions( raw_phase_2_questions )
 
-
-    phase2_sessions[session_id] = {
+    await phase2_sessions.aset(session_id, {
     "phase_1_inputs": phase_1_inputs,
     "questions": phase_2_clarification_questions["questions"],
     "question_keys": list(phase_2_clarification_questions["questions"].keys()),
     "current_index": 0,
     "answers": {}
-    }
+    })
 
 
     print(phase_2_clarification_questions)
 
-    return RedirectResponse(
-    f"/phase2/{session_id}",
-    status_code=303
-    )
+    return session_id, phase_2_clarification_questions
 
 
 
+async def generate_phase2_questions(app_name: str, user_id: str, session_id: str) -> dict:
+    """Runs the question generation agent with retries and returns the validated questions."""
+    runner = runner_registry.runner("phase2", app_name)
+
+    outcome = await RetryController(
+        phase="phase2",
+        runner=runner,
+        session_service=session_service_stateful,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        output_key="phase_2_clarification_questions",
+        schema=ClarificationQuestions,
+        build_message=build_new_message_phase2,
+        max_retries=MAX_RETRIES,
+        base_delay=RETRY_BASE_DELAY,
+        admission=llm_scheduler,
+        priority=PRIORITY_INTERACTIVE,
+        reject_when_full=True,
+    ).run()
+    print(f"📊 Phase 2 attempts: {outcome.attempts_as_dicts()}")
+
+    return outcome.value
+
+
+async def append_state(app_name: str, user_id: str, session_id: str, state_delta: dict):
+    """Write values produced outside the session's own runs into its state."""
+    session = await session_service_stateful.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    await session_service_stateful.append_event(
+        session,
+        Event(
+            invocation_id=f"system_{int(time.time() * 1000)}",
+            author="system",
+            actions=EventActions(state_delta=state_delta),
+            timestamp=time.time(),
+        ),
+    )
+
+
 @app.get("/phase2/{session_id}")
 async def phase2_question(request: Request, session_id: str):
-    session = phase2_sessions.get(session_id)
+    session = await phase2_sessions.aget(session_id)
     if not session:
         return HTMLResponse("Invalid session", status_code=404)
 
@@ -335,7 +792,7 @@ async def phase2_submit(
     session_id: str,
     answers: list[str] = Form(...)
 ):
-    session = phase2_sessions.get(session_id)
+    session = await phase2_sessions.aget(session_id)
     if not session:
         return HTMLResponse("Invalid session", status_code=404)
 
@@ -355,6 +812,7 @@ async def phase2_submit(
 
     session["answers"][question_text] = final_answers
     session["current_index"] += 1
+    await phase2_sessions.aset(session_id, session)
 
     # More questions?
     if session["current_index"] < len(session["question_keys"]):
@@ -371,48 +829,28 @@ async def phase2_submit(
     user_id = session["phase_1_inputs"]["user"]
 
     # 🔐 Persist into session_service_stateful
-    persist_event = Event(
-        invocation_id=f"phase_2_answers_{int(time.time() * 1000)}",
-        author="system",
-        actions=EventActions(
-            state_delta={
-                "phase_2_answers": phase_2_answers,
-                "phase_2_completed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            }
-        ),
-        timestamp=time.time(),
-    )
-
-    # You already created this earlier
-    await session_service_stateful.append_event(
-        await session_service_stateful.get_session(
-            app_name=session["phase_1_inputs"]["project_name"],
-            user_id=session["phase_1_inputs"]["user"],
-            session_id=session_id,
-        ),
-        persist_event,
-    )
+    await persist_phase2_answers(app_name, user_id, session_id, phase_2_answers)
 
     print("✅ Phase 2 answers persisted in session")
 
     # Cleanup in-memory cache (optional but recommended)
-    del phase2_sessions[session_id]
+    await phase2_sessions.adelete(session_id)
 
     
 
     return RedirectResponse(f"/phase3/{session_id}/{app_name}/{user_id}", status_code=303)
 
 
+async def persist_phase2_answers(app_name: str, user_id: str, session_id: str, phase_2_answers: dict):
+    await append_state(app_name, user_id, session_id, {
+        "phase_2_answers": phase_2_answers,
+        "phase_2_completed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    })
+
 
 @app.get("/phase3/{session_id}/{app_name}/{user_id}")
 async def phase3_generate(request: Request, session_id: str , app_name: str , user_id: str):
 
-
-        
-    MAX_RETRIES = 5
-    attempt = 0
-    success = False
-    
     # Fetch session
     session = await session_service_stateful.get_session(
         app_name=app_name,
@@ -420,103 +858,473 @@ async def phase3_generate(request: Request, session_id: str , app_name: str , us
         session_id=session_id
     )
 
-    
-
     if not session:
         return HTMLResponse("Invalid session", status_code=404)
-    
 
-    
+    try:
+        job = await submit_phase3_job(user_id, app_name, session_id)
+    except AdmissionRejected as e:
+        return overloaded_response(e.retry_after, str(e))
+
+    return RedirectResponse(f"/jobs/{job.id}/progress", status_code=303)
+
+
+async def submit_phase3_job(user_id: str, app_name: str, session_id: str, abandonable: bool = True):
+    """
+    Queues Phase 3 for a session, or returns the job already running for
+    it. Raises AdmissionRejected when the LLM or job queue is full.
+    API clients poll at their own pace, so their jobs are not abandonable.
+    """
+    # A refresh while the design is generating must not start it again
+    job = await job_queue.afind_active(user_id, session_id)
+    if job is not None:
+        return job
+
+    if llm_scheduler.overloaded():
+        retry_after = llm_scheduler.retry_after()
+        raise AdmissionRejected(
+            f"The design engine is busy, please retry in {retry_after}s", retry_after
+        )
+    try:
+        return job_queue.submit(
+            kind="phase3",
+            user_id=user_id,
+            app_name=app_name,
+            session_id=session_id,
+            work=run_phase3_job,
+            abandonable=abandonable,
+        )
+    except JobQueueFull as e:
+        raise AdmissionRejected(str(e), llm_scheduler.retry_after()) from e
+
+
+async def run_phase3_job(job) -> dict:
+    """
+    Runs Phase 3 generation for a queued job:
+    cache lookup / LLM design generation -> Word rendering -> PDF conversion.
+    """
+    session_id = job.session_id
+    app_name = job.app_name
+    user_id = job.user_id
+
+    session = await session_service_stateful.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id
+    )
 
     print("📦 Session state entering Phase 3:")
     print(session.state)
 
     # -----------------
-    # Phase 3 Agent
+    # Design cache (identical inputs -> identical design at temperature 0)
     # -----------------
-    design_agent_runner = Runner(
-        agent=SequentialAgent(
-            name="design_engine_generation",
-            sub_agents=[create_design_document_agent()]
-        ),
-        app_name=app_name,
-        session_service=session_service_stateful,
+    cache_key = phase3_design_key(
+        session.state.get("phase_1_inputs", {}),
+        session.state.get("phase_2_answers", {}),
+        model=OLLAMA_MODEL,
+        prompt_version=f"{PROMPT_VERSION}:{PHASE3_GENERATION_MODE}",
     )
+    system_design_document = await design_cache.aget(cache_key)
+    cache_hit = system_design_document is not None
+    shared = False
+
+    if cache_hit:
+        print(f"⚡ Phase 3 design cache hit: {cache_key[:12]}")
+        progress_broker.publish(job.id, PROGRESS_CACHE_HIT)
+        await append_state(
+            app_name, user_id, session_id, {"phase_3_system_design": system_design_document}
+        )
+        attempts = []
+    else:
+        # Identical designs being generated right now are awaited, not redone
+        (system_design_document, attempts), shared = await design_flight.do(
+            cache_key,
+            lambda progress: generate_phase3_design(app_name, user_id, session_id, progress=progress),
+            # Every job waiting on the generation gets its progress events
+            progress=phase3_progress(job.id),
+        )
+        if shared:
+            progress_broker.publish(job.id, PROGRESS_COALESCED)
+            await append_state(
+                app_name, user_id, session_id, {"phase_3_system_design": system_design_document}
+            )
+            attempts = []
+        else:
+            await design_cache.aset(cache_key, system_design_document)
 
-    design_message = types.Content(
-        role="user",
-        parts=[types.Part(
-            text="Using all available session context (Phase 1 + Phase 2), generate the full system design document."
-        )]
+    # -----------------
+    # Render to Word + PDF (worker process)
+    # -----------------
+    output_word_path = f"design_engine/documents/{user_id}/{app_name}.docx"
+    pdf_output_path = f"design_engine/documents/{user_id}/{app_name}.pdf"
+
+    progress_broker.publish(job.id, PROGRESS_RENDER_STARTED)
+    await render_executor.render(
+        system_design_document,
+        output_word_path,
+        pdf_output_path,
+        # Stored next to the documents so they can be re-rendered without the LLM
+        design_path=str(design_path_for(output_word_path)),
     )
-    while attempt < MAX_RETRIES and not success:
-        attempt += 1
-        print(f"\n🔁 Runner attempt {attempt}")
 
-        new_message = build_new_message_phase3(is_retry=(attempt > 1))
-        try:
-            async for event in design_agent_runner.run_async(
-                user_id=user_id,
-                session_id=session_id,
-                new_message=design_message,
-            ):
-                if event.is_final_response():
-                    print("\n=== Phase 3 System Design Document ===")
-                    print(event.content.parts[0].text)
-
-        except BadRequestError as e:
-            print("❌ LLM BadRequestError occurred")
-            print("Message:", str(e))
-
-            if hasattr(e, "response"):
-                print("Raw response:", e.response)
-
-            if attempt >= MAX_RETRIES:
-                print("🚨 Max retries reached. Aborting.")
-                raise
-
-            print("🔧 Retrying with stricter prompt...")
-
-        except Exception as e:
-            print("❌ Unexpected error:", e)
-            raise
+    print(f"✅ System design document rendered: {output_word_path} / {pdf_output_path}")
+
+    await project_catalog.arecord(user_id, app_name, output_word_path, pdf_output_path)
+    progress_broker.publish(
+        job.id,
+        PROGRESS_PDF_READY,
+        url=f"/view-project/{urllib.parse.quote(user_id)}/{urllib.parse.quote(Path(pdf_output_path).name)}",
+    )
+
+    return {
+        "word_path": output_word_path,
+        "pdf_path": pdf_output_path,
+        "attempts": attempts,
+        "cache_hit": cache_hit,
+        "coalesced": not cache_hit and shared,
+    }
+
+
+SECTION_BY_OUTPUT_KEY = {section_output_key(s): s for s in PHASE3_SECTIONS}
+
+
+def phase3_progress(job_id: str):
+    """RetryController progress hook that forwards events to the job's SSE stream."""
+    def emit(event_type: str, **data):
+        if event_type == "state":
+            for key in data["keys"]:
+                if key in SECTION_BY_OUTPUT_KEY:
+                    progress_broker.publish(
+                        job_id, PROGRESS_SECTION_COMPLETED, section=SECTION_BY_OUTPUT_KEY[key]
+                    )
+            return
+        progress_broker.publish(job_id, event_type, **data)
+    return emit
 
+
+async def generate_phase3_design(
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    progress=None,
+) -> tuple[dict, list[dict]]:
+    """
+    Runs the Phase 3 agent pipeline with retries / section repair.
+    Returns the validated design and the per-attempt records.
+    """
     # -----------------
-    # Fetch generated designexc
+    # Phase 3 Agent
     # -----------------
-    session = await session_service_stateful.get_session(
+    if PHASE3_GENERATION_MODE == "sections":
+        build_message = build_new_message_phase3_sections
+    else:
+        build_message = build_new_message_phase3
+
+    design_agent_runner = runner_registry.runner(PHASE3_PIPELINE, app_name)
+
+    outcome = await RetryController(
+        phase="phase3",
+        runner=design_agent_runner,
+        session_service=session_service_stateful,
         app_name=app_name,
-        user_id = user_id,
+        user_id=user_id,
         session_id=session_id,
+        output_key="phase_3_system_design",
+        schema=Phase3SystemDesign,
+        build_message=build_message,
+        max_retries=MAX_RETRIES,
+        base_delay=RETRY_BASE_DELAY,
+        # Only regenerate the sections that fail validation
+        repair=Phase3SectionRepairer(
+            session_service=session_service_stateful,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            runners=runner_registry,
+        ),
+        raw_output_source=pop_raw_output,
+        progress=progress,
+        admission=llm_scheduler,
+        priority=PRIORITY_BATCH,
+    ).run()
+
+    return outcome.value, outcome.attempts_as_dicts()
+
+
+
+# ----------------------------
+# JSON API (same pipeline as the wizard, without the redirects)
+# ----------------------------
+class ProjectRequest(BaseModel):
+    project_name: str
+    project_type: str
+    platform: str
+    description: str
+    core_features: List[str] = []
+    expected_user_scale: str
+    constraints: List[str] = []
+    # Defaults to the logged-in user's cookie
+    user: Optional[str] = None
+    # Pre-filled Phase 2 answers skip the question round trip entirely
+    answers: Optional[Dict[str, Union[List[str], str]]] = None
+    no_cache: bool = False
+
+
+class AnswersRequest(BaseModel):
+    answers: Dict[str, Union[List[str], str]]
+
+
+RESULT_MEDIA_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+
+
+def normalize_answers(answers: dict) -> dict:
+    return {
+        question: value if isinstance(value, list) else [value]
+        for question, value in answers.items()
+    }
+
+
+def api_overloaded(e: AdmissionRejected) -> JSONResponse:
+    return JSONResponse(
+        {"detail": str(e), "retry_after": e.retry_after},
+        status_code=503,
+        headers={"Retry-After": str(e.retry_after)},
     )
 
-    system_design_document = session.state.get("phase_3_system_design")
 
-    # -----------------
-    # Render to Word
-    # -----------------
-    output_word_path = f"design_engine/documents/{user_id}/{app_name}.docx"
+def api_job_payload(job) -> dict:
+    return {
+        **job.to_dict(),
+        "status_url": f"/api/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events",
+        "result_url": f"/api/jobs/{job.id}/result",
+    }
 
-    output_dir = Path(output_word_path).parent
-    output_dir.mkdir(parents=True, exist_ok=True)
 
-    render_phase3_design_to_word(system_design_document, output_word_path)
+def api_job_accepted(job) -> JSONResponse:
+    return JSONResponse(
+        api_job_payload(job),
+        status_code=202,
+        headers={"Location": f"/api/jobs/{job.id}"},
+    )
 
-    print(f"✅ System design document rendered: {output_word_path}")
 
-    pdf_output_path = f"design_engine/documents/{user_id}/{app_name}.pdf"
+@app.post("/api/projects")
+async def api_create_project(request: Request, project: ProjectRequest):
+    """
+    Phase 1 inputs -> Phase 2 questions. With ``answers`` included the
+    questions are skipped and Phase 3 is queued straight away.
+    """
+    user = project.user or request.cookies.get("user")
+    if not user:
+        raise HTTPException(status_code=401, detail="user is required")
+
+    phase_1_inputs = project.model_dump(exclude={"user", "answers", "no_cache"})
+    phase_1_inputs["core_features"] = [f.strip() for f in project.core_features if f.strip()]
+    phase_1_inputs["user"] = user
+    app_name = project.project_name
+
+    if project.answers:
+        session_id = str(uuid.uuid4())
+        await session_service_stateful.create_session(
+            app_name=app_name,
+            user_id=user,
+            session_id=session_id,
+            state={"phase_1_inputs": phase_1_inputs},
+        )
+        await persist_phase2_answers(app_name, user, session_id, normalize_answers(project.answers))
+        try:
+            job = await submit_phase3_job(user, app_name, session_id, abandonable=False)
+        except AdmissionRejected as e:
+            return api_overloaded(e)
+        return api_job_accepted(job)
+
+    try:
+        session_id, questions = await start_phase2_session(
+            request, phase_1_inputs, project.no_cache
+        )
+    except ClientDisconnected:
+        return JSONResponse({"detail": "Client disconnected"}, status_code=499)
+    except AdmissionRejected as e:
+        return api_overloaded(e)
 
-    convert(
-        output_word_path,
-        pdf_output_path
+    return JSONResponse(
+        {
+            "session_id": session_id,
+            "project_name": app_name,
+            "user": user,
+            "questions": [
+                {"question": text, **spec} for text, spec in questions["questions"].items()
+            ],
+            "answers_url": f"/api/projects/{session_id}/answers",
+        },
+        status_code=201,
     )
 
-    user_projects.setdefault(user_id, []).append(app_name)
 
-    projects = user_projects.get(user_id ,[])
+@app.post("/api/projects/{session_id}/answers")
+async def api_submit_answers(session_id: str, payload: AnswersRequest):
+    """All Phase 2 answers in one request -> queued Phase 3 job."""
+    wizard = await phase2_sessions.aget(session_id)
+    if not wizard:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+
+    unknown = [q for q in payload.answers if q not in wizard["questions"]]
+    if unknown:
+        raise HTTPException(status_code=422, detail={"unknown_questions": unknown})
+
+    app_name = wizard["phase_1_inputs"]["project_name"]
+    user_id = wizard["phase_1_inputs"]["user"]
+
+    await persist_phase2_answers(app_name, user_id, session_id, normalize_answers(payload.answers))
+    await phase2_sessions.adelete(session_id)
+
+    try:
+        job = await submit_phase3_job(user_id, app_name, session_id, abandonable=False)
+    except AdmissionRejected as e:
+        return api_overloaded(e)
+    return api_job_accepted(job)
+
+
+@app.get("/api/jobs/{job_id}")
+async def api_job_status(job_id: str, wait: float = 0):
+    """Job status; ``wait`` long-polls up to that many seconds (max 60) for it to finish."""
+    job = await job_queue.aget(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    deadline = time.monotonic() + min(max(wait, 0), 60)
+    while job.status in ACTIVE_STATUSES and time.monotonic() < deadline:
+        job_queue.touch(job_id)
+        await asyncio.sleep(min(0.5, max(deadline - time.monotonic(), 0)))
+        job = await job_queue.aget(job_id) or job
+
+    job_queue.touch(job_id)
+    return api_job_payload(job)
+
+
+@app.get("/api/jobs/{job_id}/result")
+async def api_job_result(job_id: str, format: str = "json"):
+    """The finished design as JSON, DOCX or PDF; 202 while still running."""
+    if format not in ("json", *RESULT_MEDIA_TYPES):
+        raise HTTPException(status_code=400, detail="format must be json, docx or pdf")
+
+    job = await job_queue.aget(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job_queue.touch(job_id)
+
+    if job.status in ACTIVE_STATUSES:
+        return JSONResponse(api_job_payload(job), status_code=202, headers={"Retry-After": "2"})
+    if job.status != JOB_SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job {job.status}: {job.error}")
+
+    if job.kind == "rerender":
+        # No single document to return; the result lists every re-rendered file
+        if format != "json":
+            raise HTTPException(status_code=400, detail="Re-render jobs only have a JSON result")
+        return JSONResponse(job.result)
+
+    if format == "json":
+        session = await session_service_stateful.get_session(
+            app_name=job.app_name, user_id=job.user_id, session_id=job.session_id
+        )
+        design = session.state.get("phase_3_system_design") if session else None
+        if design is None:
+            # The session is gone; the design stored next to the documents is not
+            design_path = design_path_for(job.result["word_path"])
+            try:
+                design = (await asyncio.to_thread(load_design, design_path)).design
+            except (FileNotFoundError, StoredDesignError):
+                raise HTTPException(status_code=410, detail="Design JSON is no longer available")
+        return JSONResponse(design)
+
+    path = Path(job.result[f"{'word' if format == 'docx' else 'pdf'}_path"])
+    if not path.exists():
+        raise HTTPException(status_code=410, detail=f"{format.upper()} file is no longer available")
+    return FileResponse(path, media_type=RESULT_MEDIA_TYPES[format], filename=path.name)
+
+
+# ----------------------------
+# Re-rendering from stored design JSON (no LLM)
+# ----------------------------
+def user_documents_dir(user_id: str) -> Path:
+    user_dir = BASE_PATH / user_id
+    if user_dir.resolve().parent != BASE_PATH.resolve():
+        raise HTTPException(status_code=400, detail="Invalid user")
+    return user_dir
+
+
+async def record_rerendered(user_id: str, design_path: Path):
+    # An existing PDF is kept (and listed) when only the DOCX was re-rendered
+    word_path, pdf_path = document_paths_for(design_path)
+    project = design_path.name[: -len(DESIGN_SUFFIX)]
+    await project_catalog.arecord(user_id, project, str(word_path), str(pdf_path))
+
+
+@app.post("/api/documents/{user_id}/rerender")
+async def api_rerender_user(user_id: str, pdf: bool = True):
+    """
+    Queues a re-render of every document of a user that has a stored
+    design. Returns the job (202); its result holds the summary.
+    """
+    design_paths = find_designs(BASE_PATH, user_id) if user_documents_dir(user_id).is_dir() else []
+    if not design_paths:
+        raise HTTPException(status_code=404, detail="No stored designs for this user")
+
+    # A second request while the user's documents are re-rendering joins it
+    job = await job_queue.afind_active(user_id, RERENDER_SESSION_ID)
+    if job is not None:
+        return api_job_accepted(job)
+
+    try:
+        job = job_queue.submit(
+            kind="rerender",
+            user_id=user_id,
+            app_name="",
+            session_id=RERENDER_SESSION_ID,
+            work=lambda job: run_rerender_job(job, design_paths, pdf),
+            abandonable=False,
+        )
+    except JobQueueFull as e:
+        return api_overloaded(AdmissionRejected(str(e), RERENDER_RETRY_AFTER))
+    return api_job_accepted(job)
+
+
+async def run_rerender_job(job, design_paths: list[Path], render_pdf: bool) -> dict:
+    """
+    Re-renders a user's documents. It runs on the "rerender" workers of
+    the job queue and needs no LLM, only render workers: at most
+    RERENDER_CONCURRENCY documents render at once.
+    """
+    started = time.perf_counter()
+    results = await rerender_designs(
+        render_executor, design_paths, render_pdf=render_pdf, concurrency=RERENDER_CONCURRENCY
+    )
+    for r in results:
+        if r.status == RERENDER_SUCCEEDED:
+            await record_rerendered(job.user_id, Path(r.design_path))
+
+    return {
+        **summarize_rerender(results, time.perf_counter() - started),
+        "results": [asdict(r) for r in results],
+    }
 
-    print(projects)
 
-    return templates.TemplateResponse("dashboard.html", {"request": request, "username": user_id, "projects": projects})
+@app.post("/api/documents/{user_id}/{project}/rerender")
+async def api_rerender_project(user_id: str, project: str, pdf: bool = True):
+    """Re-render one document from its stored design."""
+    design_path = user_documents_dir(user_id) / f"{project}{DESIGN_SUFFIX}"
+    if not design_path.exists():
+        raise HTTPException(status_code=404, detail="No stored design for this project")
 
+    result = await rerender_design(render_executor, design_path, render_pdf=pdf)
+    if result.status != RERENDER_SUCCEEDED:
+        raise HTTPException(status_code=500, detail=result.error)
 
+    await record_rerendered(user_id, design_path)
+    return asdict(result)
@@ -0,0 +1,319 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from .cache import canonical_digest
+from .db import connect, enable_wal
+from .design_store import DESIGN_SUFFIX, design_path_for, document_paths_for, load_design
+from .rendering import render_design_documents, renderer_version
+
+
+# Flat batch output and the per-user documents of the app
+DEFAULT_ARCHIVE_ROOTS = [Path("generated_documents"), Path("design_engine/documents")]
+MANIFEST_PATH = os.getenv("DESIGN_ENGINE_RENDER_MANIFEST", "design_engine/.data/render_manifest.sqlite3")
+
+ARCHIVE_RENDERED = "rendered"
+ARCHIVE_UNCHANGED = "unchanged"
+ARCHIVE_FAILED = "failed"
+
+
+@dataclass
+class ArchiveResult:
+    design_path: str
+    status: str = ARCHIVE_FAILED
+    digest: Optional[str] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+
+# =========================
+# Render Manifest
+# =========================
+
+class RenderManifest:
+    """
+    SQLite record of what every archived design was last rendered from:
+    the digest of its design JSON and the renderer version. A row is
+    written as soon as its document is rendered, so an interrupted run
+    resumes where it stopped.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        enable_wal(self.path)
+        with connect(self.path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rendered (
+                    design_path TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    renderer_version TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    rendered_at REAL NOT NULL
+                )
+                """
+            )
+
+    def entries(self) -> dict[str, tuple]:
+        """design_path -> (digest, renderer_version, mtime_ns, size)"""
+        with connect(self.path) as conn:
+            rows = conn.execute(
+                "SELECT design_path, digest, renderer_version, mtime_ns, size FROM rendered"
+            ).fetchall()
+        return {path: tuple(rest) for path, *rest in rows}
+
+    def record(self, design_path: str, digest: str, version: str, stat: os.stat_result):
+        with connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO rendered "
+                "(design_path, digest, renderer_version, mtime_ns, size, rendered_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (design_path, digest, version, stat.st_mtime_ns, stat.st_size, time.time()),
+            )
+
+
+# =========================
+# Archive Walk
+# =========================
+
+def walk_archive(roots: list[Path]) -> tuple[list[Path], list[Path]]:
+    """
+    Stored designs anywhere under ``roots``, and the Word documents that
+    have none (rendered before designs were stored; they cannot be
+    re-rendered).
+    """
+    designs, without_design = [], []
+    for root in roots:
+        for directory, _, files in os.walk(root):
+            names = set(files)
+            for name in files:
+                if name.endswith(DESIGN_SUFFIX):
+                    designs.append(Path(directory, name))
+                elif name.endswith(".docx") and not name.startswith("~$"):
+                    if design_path_for(name).name not in names:
+                        without_design.append(Path(directory, name))
+    return sorted(designs), sorted(without_design)
+
+
+def outputs_exist(design_path: Path, render_pdf: bool) -> bool:
+    word_path, pdf_path = document_paths_for(design_path)
+    return word_path.exists() and (not render_pdf or pdf_path.exists())
+
+
+# =========================
+# Worker-side job
+# =========================
+
+def render_archived_design(design_path: str, known_digest: Optional[str], render_pdf: bool) -> tuple[str, str]:
+    """
+    Load a stored design and render its documents unless its digest is
+    still ``known_digest``. Returns (status, digest). Runs inside a pool
+    process, so loading and hashing are parallel too.
+    """
+    design = load_design(design_path).design
+    digest = canonical_digest(design)
+    if digest == known_digest:
+        return ARCHIVE_UNCHANGED, digest
+
+    word_path, pdf_path = document_paths_for(design_path)
+    render_design_documents(design, str(word_path), str(pdf_path) if render_pdf else None)
+    return ARCHIVE_RENDERED, digest
+
+
+# =========================
+# Archive Re-render
+# =========================
+
+class ArchiveRenderer:
+    """
+    Brings every document in the archive up to date with the current
+    renderer, across all cores.
+
+    A design is skipped without being read when its file (mtime + size),
+    the renderer version and its documents are as recorded. Otherwise a
+    worker loads it and compares the design digest, so touched-but-equal
+    designs are still not rendered again.
+    """
+
+    def __init__(
+        self,
+        manifest: RenderManifest,
+        workers: Optional[int] = None,
+        render_pdf: bool = True,
+        force: bool = False,
+    ):
+        self.manifest = manifest
+        self.workers = workers or os.cpu_count() or 1
+        self.render_pdf = render_pdf
+        self.force = force
+        self.version = renderer_version(render_pdf)
+
+    def plan(self, design_paths: list[Path]) -> tuple[list[tuple], list[ArchiveResult]]:
+        """(jobs to submit, designs skipped up front)"""
+        entries = {} if self.force else self.manifest.entries()
+        jobs, skipped = [], []
+
+        for path in design_paths:
+            key = str(path.resolve())
+            stat = path.stat()
+            entry = entries.get(key)
+            known_digest = None
+            if entry is not None and entry[1] == self.version and outputs_exist(path, self.render_pdf):
+                digest, _, mtime_ns, size = entry
+                if (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size):
+                    skipped.append(ArchiveResult(str(path), ARCHIVE_UNCHANGED, digest))
+                    continue
+                known_digest = digest
+            jobs.append((path, key, stat, known_digest))
+        return jobs, skipped
+
+    def run(self, jobs: list[tuple], progress_every: int = 50) -> list[ArchiveResult]:
+        results: list[ArchiveResult] = []
+        started = time.perf_counter()
+        # Only a few jobs per worker are queued at a time, so an interrupt
+        # stops quickly and memory does not grow with the archive
+        window = self.workers * 4
+        pending = {}
+        remaining = iter(jobs)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                while True:
+                    for job in remaining:
+                        path, _, _, known_digest = job
+                        future = pool.submit(
+                            render_archived_design, str(path), known_digest, self.render_pdf
+                        )
+                        pending[future] = (job, time.perf_counter())
+                        if len(pending) >= window:
+                            break
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        (path, key, stat, _), submitted = pending.pop(future)
+                        results.append(self._finish(future, path, key, stat, submitted))
+
+                        if len(results) % progress_every == 0:
+                            elapsed = time.perf_counter() - started
+                            print(f"… {len(results)}/{len(jobs)} ({len(results) / elapsed:.1f} docs/s)")
+            except KeyboardInterrupt:
+                pool.shutdown(wait=False, cancel_futures=True)
+                print(f"\n⚠️ Interrupted after {len(results)}/{len(jobs)} documents; run again to resume")
+                raise
+
+        return results
+
+    def _finish(self, future, path: Path, key: str, stat: os.stat_result, submitted: float) -> ArchiveResult:
+        result = ArchiveResult(design_path=str(path), seconds=time.perf_counter() - submitted)
+        try:
+            result.status, result.digest = future.result()
+        except Exception as e:
+            # Not recorded, so the next run tries it again
+            result.error = f"{type(e).__name__}: {e}"
+            print(f"❌ {path}: {result.error}")
+            return result
+
+        self.manifest.record(key, result.digest, self.version, stat)
+        return result
+
+
+def summarize(results: list[ArchiveResult], without_design: list[Path], wall_seconds: float) -> dict:
+    counts = {status: 0 for status in (ARCHIVE_RENDERED, ARCHIVE_UNCHANGED, ARCHIVE_FAILED)}
+    for r in results:
+        counts[r.status] += 1
+    return {
+        "designs": len(results),
+        **counts,
+        "without_design": len(without_design),
+        "wall_seconds": round(wall_seconds, 3),
+        "documents_per_second": round(counts[ARCHIVE_RENDERED] / wall_seconds, 2) if wall_seconds else 0.0,
+    }
+
+
+# =========================
+# CLI
+# =========================
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Re-render every archived document whose stored design or renderer "
+            "changed since it was last rendered (no LLM calls). Interrupted runs resume."
+        ),
+    )
+    parser.add_argument(
+        "roots", nargs="*", type=Path, default=DEFAULT_ARCHIVE_ROOTS,
+        help="Directories to walk (default: generated_documents design_engine/documents)",
+    )
+    parser.add_argument("--manifest", type=Path, default=Path(MANIFEST_PATH))
+    parser.add_argument("--workers", type=int, help="Render processes (default: all cores)")
+    parser.add_argument("--no-pdf", action="store_true", help="Only write DOCX files")
+    parser.add_argument("--force", action="store_true", help="Re-render everything, ignoring the manifest")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be re-rendered")
+    parser.add_argument("--report", type=Path, help="Write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    design_paths, without_design = walk_archive(args.roots)
+    renderer = ArchiveRenderer(
+        RenderManifest(str(args.manifest)),
+        workers=args.workers,
+        render_pdf=not args.no_pdf,
+        force=args.force,
+    )
+    jobs, skipped = renderer.plan(design_paths)
+
+    print(f"=== Archive: {len(design_paths)} stored designs under {', '.join(map(str, args.roots))} ===")
+    print(f"Renderer {renderer.version}: {len(skipped)} up to date, {len(jobs)} to check and render")
+    if without_design:
+        print(f"⚠️ {len(without_design)} documents have no stored design and cannot be re-rendered")
+
+    if args.dry_run:
+        for path, *_ in jobs:
+            print(f"  {path}")
+        return 0
+
+    started = time.perf_counter()
+    if jobs:
+        print(f"Rendering with {renderer.workers} processes")
+        try:
+            results = renderer.run(jobs)
+        except KeyboardInterrupt:
+            return 130
+    else:
+        results = []
+    summary = summarize([*skipped, *results], without_design, time.perf_counter() - started)
+
+    print(
+        f"\n{summary['rendered']} rendered, {summary['unchanged']} unchanged, {summary['failed']} failed "
+        f"in {summary['wall_seconds']:.1f}s ({summary['documents_per_second']:.1f} docs/s)"
+    )
+
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(
+            json.dumps(
+                {
+                    "summary": summary,
+                    "renderer_version": renderer.version,
+                    "documents": [asdict(r) for r in results],
+                    "without_design": [str(p) for p in without_design],
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+    return 0 if summary["failed"] == 0 else 1
+
+
+# ✅ Run
+if __name__ == "__main__":
+    sys.exit(main())
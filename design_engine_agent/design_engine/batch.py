@@ -0,0 +1,396 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from google.adk.agents import SequentialAgent
+from google.adk.sessions import InMemorySessionService
+from litellm import close_litellm_async_clients
+
+from .design_document_agent import (
+    create_design_document_agent,
+    create_sectioned_design_agent,
+    pop_raw_output,
+)
+from .design_store import design_path_for
+from .rendering import RenderExecutor
+from .repair import Phase3SectionRepairer
+from .retry import RetryController, RetryExhausted, retry_metrics
+from .runners import RunnerRegistry
+from .schemas import Phase3SystemDesign
+from .utils import build_new_message_phase3, build_new_message_phase3_sections
+
+
+# =========================
+# Batch Configuration
+# =========================
+
+APP_NAME = "Agentic Design Engine"
+DEFAULT_USER_ID = "design_user"
+
+RECORD_SUCCEEDED = "succeeded"
+RECORD_FAILED = "failed"
+
+
+class InvalidRecord(Exception):
+    """A JSONL line that is not a usable batch record."""
+
+
+@dataclass
+class BatchRecord:
+    line: int
+    record_id: str
+    phase_1_inputs: dict
+    phase_2_answers: dict
+
+
+@dataclass
+class RecordResult:
+    line: int
+    record_id: str
+    project_name: Optional[str] = None
+    status: str = RECORD_FAILED
+    error: Optional[str] = None
+    latency_seconds: float = 0.0
+    queued_seconds: float = 0.0
+    generation_seconds: float = 0.0
+    render_seconds: float = 0.0
+    attempts: int = 0
+    retries: int = 0
+    repaired_sections: list[str] = field(default_factory=list)
+    word_path: Optional[str] = None
+    pdf_path: Optional[str] = None
+
+
+# =========================
+# Input
+# =========================
+
+def load_records(path: Path) -> tuple[list[BatchRecord], list[RecordResult]]:
+    """
+    Read one project per JSONL line:
+        {"id": "...", "phase_1_inputs": {...}, "phase_2_answers": {question: [answers]}}
+    Lines that cannot be used are returned as failed results instead.
+    """
+    records, rejected = [], []
+
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(parse_record(line_no, line))
+            except InvalidRecord as e:
+                rejected.append(RecordResult(line=line_no, record_id=str(line_no), error=str(e)))
+
+    return records, rejected
+
+
+def parse_record(line_no: int, line: str) -> BatchRecord:
+    try:
+        data = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise InvalidRecord(f"Invalid JSON: {e}") from e
+
+    if not isinstance(data, dict):
+        raise InvalidRecord("Record must be a JSON object")
+
+    phase_1_inputs = data.get("phase_1_inputs")
+    phase_2_answers = data.get("phase_2_answers")
+    if not isinstance(phase_1_inputs, dict) or not phase_1_inputs.get("project_name"):
+        raise InvalidRecord("phase_1_inputs with a project_name is required")
+    if not isinstance(phase_2_answers, dict) or not phase_2_answers:
+        raise InvalidRecord("phase_2_answers must be a non-empty object")
+
+    # Same shape the wizard stores: question -> list of answers
+    phase_2_answers = {
+        question: answers if isinstance(answers, list) else [answers]
+        for question, answers in phase_2_answers.items()
+    }
+
+    return BatchRecord(
+        line=line_no,
+        record_id=str(data.get("id") or phase_1_inputs["project_name"]),
+        phase_1_inputs=phase_1_inputs,
+        phase_2_answers=phase_2_answers,
+    )
+
+
+def output_stem(record_id: str) -> str:
+    stem = re.sub(r'[\\/:*?"<>|\x00-\x1f]+', "_", record_id).strip(" .")
+    return stem or "document"
+
+
+# =========================
+# Batch Runner
+# =========================
+
+class BatchRunner:
+    """
+    Runs Phase 3 for many pre-answered projects without any prompts.
+
+    - At most ``concurrency`` LLM pipelines run at once; rendering happens
+      in the render process pool so the next record can start generating
+    - Agents and runners are built once and shared by every record
+    - A failing record is reported and never stops the rest of the batch
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        concurrency: int = 2,
+        mode: str = "single",
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        render_pdf: bool = True,
+        render_workers: Optional[int] = None,
+        render_timeout: float = 300.0,
+    ):
+        self.output_dir = output_dir
+        self.concurrency = concurrency
+        self.mode = mode
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.render_pdf = render_pdf
+
+        self.session_service = InMemorySessionService()
+        self.runners = RunnerRegistry(self.session_service)
+        self.runners.register(
+            "phase3_single",
+            lambda: SequentialAgent(
+                name="design_engine_generation",
+                sub_agents=[create_design_document_agent()],
+            ),
+        )
+        self.runners.register("phase3_sections", create_sectioned_design_agent)
+        self.render_executor = RenderExecutor(max_workers=render_workers, timeout=render_timeout)
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def run(self, records: list[BatchRecord]) -> list[RecordResult]:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.runners.warm(f"phase3_{self.mode}")
+        self.render_executor.start()
+
+        # Two records for the same project must not overwrite each other
+        stems: dict[str, int] = {}
+        paths = []
+        for record in records:
+            stem = output_stem(record.record_id)
+            stems[stem] = stems.get(stem, 0) + 1
+            if stems[stem] > 1:
+                stem = f"{stem}-{record.line}"
+            paths.append(self.output_dir / stem)
+
+        try:
+            return await asyncio.gather(
+                *(self.run_record(record, path) for record, path in zip(records, paths))
+            )
+        finally:
+            self.render_executor.shutdown()
+
+    async def run_record(self, record: BatchRecord, output_base: Path) -> RecordResult:
+        result = RecordResult(
+            line=record.line,
+            record_id=record.record_id,
+            project_name=record.phase_1_inputs["project_name"],
+        )
+        started = time.perf_counter()
+
+        try:
+            async with self._slots:
+                result.queued_seconds = time.perf_counter() - started
+                generation_started = time.perf_counter()
+                design = await self.generate(record, result)
+                result.generation_seconds = time.perf_counter() - generation_started
+
+            word_path = f"{output_base}.docx"
+            pdf_path = f"{output_base}.pdf" if self.render_pdf else None
+            render_started = time.perf_counter()
+            await self.render_executor.render(
+                design, word_path, pdf_path, design_path=str(design_path_for(word_path))
+            )
+            result.render_seconds = time.perf_counter() - render_started
+
+            result.word_path, result.pdf_path = word_path, pdf_path
+            result.status = RECORD_SUCCEEDED
+            print(f"✅ [{record.record_id}] Rendered {word_path}")
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            print(f"❌ [{record.record_id}] {result.error}")
+        finally:
+            result.latency_seconds = time.perf_counter() - started
+
+        return result
+
+    async def generate(self, record: BatchRecord, result: RecordResult) -> dict:
+        user_id = record.phase_1_inputs.get("user") or DEFAULT_USER_ID
+        session = await self.session_service.create_session(
+            app_name=APP_NAME,
+            user_id=user_id,
+            session_id=str(uuid.uuid4()),
+            state={
+                "phase_1_inputs": record.phase_1_inputs,
+                "phase_2_answers": record.phase_2_answers,
+            },
+        )
+
+        build_message = (
+            build_new_message_phase3_sections if self.mode == "sections" else build_new_message_phase3
+        )
+
+        try:
+            outcome = await RetryController(
+                phase="phase3",
+                runner=self.runners.runner(f"phase3_{self.mode}", APP_NAME),
+                session_service=self.session_service,
+                app_name=APP_NAME,
+                user_id=user_id,
+                session_id=session.id,
+                output_key="phase_3_system_design",
+                schema=Phase3SystemDesign,
+                build_message=build_message,
+                max_retries=self.max_retries,
+                base_delay=self.base_delay,
+                repair=Phase3SectionRepairer(
+                    session_service=self.session_service,
+                    app_name=APP_NAME,
+                    user_id=user_id,
+                    session_id=session.id,
+                    runners=self.runners,
+                ),
+                raw_output_source=pop_raw_output,
+            ).run()
+        except RetryExhausted as e:
+            self._record_attempts(result, e.outcome)
+            raise
+        finally:
+            await self.session_service.delete_session(
+                app_name=APP_NAME, user_id=user_id, session_id=session.id
+            )
+
+        self._record_attempts(result, outcome)
+        return outcome.value
+
+    @staticmethod
+    def _record_attempts(result: RecordResult, outcome):
+        result.attempts = len(outcome.attempts)
+        result.retries = max(result.attempts - 1, 0)
+        result.repaired_sections = sorted({s for a in outcome.attempts for s in a.repaired_sections})
+
+
+# =========================
+# Report
+# =========================
+
+def summarize(results: list[RecordResult], wall_seconds: float, concurrency: int) -> dict:
+    succeeded = [r for r in results if r.status == RECORD_SUCCEEDED]
+    latencies = sorted(r.latency_seconds for r in succeeded)
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))]
+
+    return {
+        "records": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "concurrency": concurrency,
+        "wall_seconds": round(wall_seconds, 3),
+        "documents_per_minute": round(len(succeeded) / wall_seconds * 60, 2) if wall_seconds else 0.0,
+        "latency_seconds": {
+            "mean": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+            "p50": round(percentile(0.5), 3),
+            "p95": round(percentile(0.95), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+        "attempts": sum(r.attempts for r in results),
+        "retries": sum(r.retries for r in results),
+        "retry_metrics": retry_metrics,
+    }
+
+
+def print_report(summary: dict, results: list[RecordResult]):
+    print("\n=== Batch Summary ===")
+    print(f"{'record':<32} {'status':<10} {'latency':>9} {'retries':>8}  error")
+    for r in sorted(results, key=lambda r: r.line):
+        print(
+            f"{r.record_id[:32]:<32} {r.status:<10} {r.latency_seconds:>8.1f}s "
+            f"{r.retries:>8}  {r.error or ''}"
+        )
+    latency = summary["latency_seconds"]
+    print(
+        f"\n{summary['succeeded']}/{summary['records']} succeeded in {summary['wall_seconds']:.1f}s "
+        f"(p50 {latency['p50']:.1f}s, p95 {latency['p95']:.1f}s, "
+        f"{summary['retries']} retries, {summary['failed']} failed)"
+    )
+
+
+# =========================
+# Main Async Entry Point
+# =========================
+
+async def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Generate design documents for every record of a JSONL file "
+            "(phase_1_inputs + pre-filled phase_2_answers) without prompts."
+        ),
+    )
+    parser.add_argument("input", type=Path, help="JSONL file, one project per line")
+    parser.add_argument("--output-dir", type=Path, default=Path("generated_documents"))
+    parser.add_argument("--report", type=Path, help="Summary report path (default: <output-dir>/batch_report.json)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("DESIGN_ENGINE_BATCH_CONCURRENCY", "2")))
+    parser.add_argument("--mode", choices=["single", "sections"], default=os.getenv("PHASE3_GENERATION_MODE", "single"))
+    parser.add_argument("--max-retries", type=int, default=int(os.getenv("DESIGN_ENGINE_MAX_RETRIES", "5")))
+    parser.add_argument("--render-workers", type=int, default=int(os.getenv("DESIGN_ENGINE_RENDER_WORKERS", "0")) or None)
+    parser.add_argument("--no-pdf", action="store_true", help="Only write DOCX files")
+    args = parser.parse_args(argv)
+
+    records, rejected = load_records(args.input)
+    print(f"=== Batch: {len(records)} records from {args.input} (concurrency {args.concurrency}) ===")
+    for r in rejected:
+        print(f"⚠️ Skipping line {r.line}: {r.error}")
+
+    runner = BatchRunner(
+        output_dir=args.output_dir,
+        concurrency=max(args.concurrency, 1),
+        mode=args.mode,
+        max_retries=args.max_retries,
+        base_delay=float(os.getenv("DESIGN_ENGINE_RETRY_BASE_DELAY", "1.0")),
+        render_pdf=not args.no_pdf,
+        render_workers=args.render_workers,
+        render_timeout=float(os.getenv("DESIGN_ENGINE_RENDER_TIMEOUT", "300")),
+    )
+
+    started = time.perf_counter()
+    try:
+        results = await runner.run(records) if records else []
+    finally:
+        await close_litellm_async_clients()
+    results = sorted([*results, *rejected], key=lambda r: r.line)
+
+    summary = summarize(results, time.perf_counter() - started, runner.concurrency)
+    report_path = args.report or args.output_dir / "batch_report.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(
+        json.dumps({"summary": summary, "records": [asdict(r) for r in results]}, indent=2),
+        encoding="utf-8",
+    )
+
+    print_report(summary, results)
+    print(f"📄 Report written to {report_path}")
+    return 0 if summary["failed"] == 0 else 1
+
+
+# ✅ Run
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from .db import connect, enable_wal
+
+
+# =========================
+# Canonical cache keys
+# =========================
+
+def canonical_digest(payload: Any) -> str:
+    """SHA-256 of a JSON payload with sorted keys and no whitespace."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").strip().lower()).rstrip(" .!")
+
+
+def phase2_question_key(phase_1_inputs: dict) -> str:
+    """
+    Cache key for Phase 2 clarification questions. Only the fields that
+    shape the questions are used, so near-identical projects share a key.
+    """
+    return canonical_digest({
+        "project_type": normalize_text(phase_1_inputs.get("project_type", "")),
+        "platform": normalize_text(phase_1_inputs.get("platform", "")),
+        "expected_user_scale": normalize_text(phase_1_inputs.get("expected_user_scale", "")),
+        "constraints": sorted(normalize_text(c) for c in phase_1_inputs.get("constraints", [])),
+        "description": normalize_text(phase_1_inputs.get("description", "")),
+    })
+
+
+def phase3_design_key(
+    phase_1_inputs: dict,
+    phase_2_answers: dict,
+    model: str,
+    prompt_version: str,
+) -> str:
+    """
+    Cache key for a full Phase 3 design. Generation runs at temperature
+    0.0, so identical inputs, model and prompts give the same document.
+    """
+    return canonical_digest({
+        # The owning user does not change the generated document
+        "phase_1_inputs": {k: v for k, v in phase_1_inputs.items() if k != "user"},
+        "phase_2_answers": phase_2_answers,
+        "model": model,
+        "prompt_version": prompt_version,
+    })
+
+
+# =========================
+# Persistent Cache
+# =========================
+
+class PersistentCache:
+    """
+    SQLite-backed JSON cache with a per-entry TTL and LRU eviction
+    bounded by entry count and, optionally, total stored bytes.
+
+    Safe to share between worker processes (WAL mode, one short-lived
+    connection per operation). Hit/miss counters are per process.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 1000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_bytes: Optional[int] = None,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._metrics = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "writes": 0}
+
+        enable_wal(self.path)
+        with connect(self.path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_lru ON cache (last_access)")
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with connect(self.path) as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self._metrics["misses"] += 1
+                return None
+
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._metrics["expired"] += 1
+                self._metrics["misses"] += 1
+                return None
+
+            conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+
+        self._metrics["hits"] += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        encoded = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded.encode("utf-8")), now, now),
+            )
+            self._evict(conn, now)
+        self._metrics["writes"] += 1
+
+    def delete(self, key: str):
+        with connect(self.path) as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    # For async callers (see db.connect)
+    async def aget(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any):
+        await asyncio.to_thread(self.set, key, value)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        expired = conn.execute(
+            "DELETE FROM cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        self._metrics["expired"] += expired
+
+        overflow = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._metrics["evictions"] += overflow
+
+        if self.max_bytes is None:
+            return
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Walk entries oldest-access first until the total fits
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM cache ORDER BY last_access ASC"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM cache WHERE key = ?", victims)
+        self._metrics["evictions"] += len(victims)
+
+    def stats(self) -> dict:
+        with connect(self.path) as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+        lookups = self._metrics["hits"] + self._metrics["misses"]
+        return {
+            **self._metrics,
+            "entries": entries,
+            "bytes": size,
+            "hit_rate": self._metrics["hits"] / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,177 @@
+import asyncio
+import time
+from pathlib import Path
+
+from .db import connect, enable_wal
+
+
+PROJECT_READY = "ready"
+PROJECT_DOCX_ONLY = "docx_only"
+
+
+# =========================
+# Project Catalog
+# =========================
+
+class ProjectCatalog:
+    """
+    SQLite index of the generated documents under ``base_path``
+    (``<base_path>/<user>/<project>.docx|.pdf``).
+
+    Nothing is scanned up front: a user's directory is (re)indexed the
+    first time it is queried and afterwards only when its mtime changes,
+    so startup cost does not grow with the number of stored documents
+    and files written by other processes are picked up.
+    """
+
+    def __init__(self, path: str, base_path: str):
+        self.path = Path(path)
+        self.base_path = Path(base_path)
+        self._metrics = {"queries": 0, "rescans": 0, "records": 0}
+
+        enable_wal(self.path)
+        with connect(self.path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS projects (
+                    user_id TEXT NOT NULL,
+                    project TEXT NOT NULL,
+                    pdf_path TEXT,
+                    word_path TEXT,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    PRIMARY KEY (user_id, project)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS projects_by_created ON projects (user_id, created_at)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS user_dirs (
+                    user_id TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL
+                )
+                """
+            )
+
+    def refresh_user(self, user_id: str) -> bool:
+        """Re-index one user's directory if it changed. Returns True if rescanned."""
+        user_dir = self.base_path / user_id
+        try:
+            mtime_ns = user_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+
+        with connect(self.path) as conn:
+            row = conn.execute(
+                "SELECT mtime_ns FROM user_dirs WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if row is not None and row[0] == mtime_ns:
+                return False
+            if row is None and mtime_ns is None:
+                return False
+
+            conn.execute("DELETE FROM projects WHERE user_id = ?", (user_id,))
+            if mtime_ns is None:
+                conn.execute("DELETE FROM user_dirs WHERE user_id = ?", (user_id,))
+            else:
+                conn.executemany(
+                    "INSERT INTO projects (user_id, project, pdf_path, word_path, size, created_at, status) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(user_id, *entry) for entry in self._scan(user_dir)],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO user_dirs (user_id, mtime_ns) VALUES (?, ?)",
+                    (user_id, mtime_ns),
+                )
+
+        self._metrics["rescans"] += 1
+        return True
+
+    def _scan(self, user_dir: Path) -> list[tuple]:
+        files: dict[str, dict[str, Path]] = {}
+        for file in user_dir.iterdir():
+            suffix = file.suffix.lower()
+            if suffix in (".pdf", ".docx") and file.is_file():
+                files.setdefault(file.stem, {})[suffix] = file
+
+        entries = []
+        for project, found in files.items():
+            pdf, word = found.get(".pdf"), found.get(".docx")
+            stats = [f.stat() for f in (pdf, word) if f is not None]
+            entries.append((
+                project,
+                str(pdf) if pdf else None,
+                str(word) if word else None,
+                sum(s.st_size for s in stats),
+                min(s.st_mtime for s in stats),
+                PROJECT_READY if pdf else PROJECT_DOCX_ONLY,
+            ))
+        return entries
+
+    def record(self, user_id: str, project: str, word_path: str, pdf_path: str):
+        """Index a freshly rendered document without waiting for a rescan."""
+        paths = [Path(p) for p in (word_path, pdf_path) if p and Path(p).exists()]
+        if not paths:
+            return
+        with connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO projects (user_id, project, pdf_path, word_path, size, created_at, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    user_id,
+                    project,
+                    pdf_path if Path(pdf_path).exists() else None,
+                    word_path if Path(word_path).exists() else None,
+                    sum(p.stat().st_size for p in paths),
+                    time.time(),
+                    PROJECT_READY if Path(pdf_path).exists() else PROJECT_DOCX_ONLY,
+                ),
+            )
+        self._metrics["records"] += 1
+
+    def list_projects(self, user_id: str, offset: int = 0, limit: int = 20) -> tuple[list[dict], int]:
+        """One page of a user's projects (newest first) and the total count."""
+        self.refresh_user(user_id)
+        self._metrics["queries"] += 1
+
+        with connect(self.path) as conn:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM projects WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT project, pdf_path, word_path, size, created_at, status FROM projects "
+                "WHERE user_id = ? ORDER BY created_at DESC, project LIMIT ? OFFSET ?",
+                (user_id, limit, offset),
+            ).fetchall()
+
+        projects = [
+            {
+                "project": project,
+                "pdf_name": Path(pdf_path).name if pdf_path else None,
+                "pdf_path": pdf_path,
+                "word_path": word_path,
+                "size": size,
+                "created_at": created_at,
+                "status": status,
+            }
+            for project, pdf_path, word_path, size, created_at, status in rows
+        ]
+        return projects, total
+
+    # For async callers (see db.connect)
+    async def alist_projects(self, user_id: str, offset: int = 0, limit: int = 20) -> tuple[list[dict], int]:
+        return await asyncio.to_thread(self.list_projects, user_id, offset, limit)
+
+    async def arecord(self, user_id: str, project: str, word_path: str, pdf_path: str):
+        await asyncio.to_thread(self.record, user_id, project, word_path, pdf_path)
+
+    def stats(self) -> dict:
+        with connect(self.path) as conn:
+            projects, users = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT user_id) FROM projects"
+            ).fetchone()
+        return {**self._metrics, "projects": projects, "users": users}
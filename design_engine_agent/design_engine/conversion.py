@@ -0,0 +1,232 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional
+
+from .pools import retire_pool
+
+
+# =========================
+# Worker-side conversion
+# =========================
+
+# One pdfitdown Converter per process, created on first use. Never share
+# one across processes: after a conversion, forked children hang in theirs.
+_converter = None
+
+
+def convert_in_process(word_path: str, pdf_path: str) -> float:
+    """
+    Convert a DOCX to PDF in the calling process and return the seconds
+    it took. Meant for worker processes (conversion pool, render pool);
+    other callers should go through PdfConversionService.
+    """
+    global _converter
+    if _converter is None:
+        from pdfitdown.pdfconversion import Converter
+        _converter = Converter()
+
+    started = time.perf_counter()
+    if _converter.convert(file_path=word_path, output_path=pdf_path) is None:
+        raise ConversionFailed(f"pdfitdown could not convert {word_path}")
+    return time.perf_counter() - started
+
+
+class ConversionFailed(Exception):
+    """The converter did not produce a PDF."""
+
+
+class ConversionTimeout(Exception):
+    """Raised when a conversion does not finish within its timeout."""
+
+
+class ConversionQueueFull(Exception):
+    """Raised when ``max_queue`` conversions are already waiting."""
+
+
+# =========================
+# PDF Conversion Service
+# =========================
+
+class PdfConversionService:
+    """
+    DOCX -> PDF conversions in a pool of worker processes.
+
+    - Each conversion runs in its own process with its own converter, so
+      concurrent conversions cannot interfere with each other or with
+      file access in the calling process
+    - Up to ``max_workers`` conversions run in parallel; ``max_queue``
+      more may wait, beyond that ConversionQueueFull is raised
+    - A conversion that exceeds its timeout raises ConversionTimeout and
+      its pool takes no new work and is terminated once the other
+      conversions in it have finished
+    - Usable from threads (``convert_sync``) and from asyncio (``convert``)
+
+    Workers are spawned, not forked, so they never inherit a converter
+    (or locks) from the parent.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: int = 100,
+        timeout: float = 120.0,
+        latency_window: int = 500,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self._metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "rejected": 0,
+            "in_flight": 0,
+            "total_seconds": 0.0,
+            "convert_seconds": 0.0,
+            "max_seconds": 0.0,
+        }
+
+    def start(self):
+        """Spawn every worker now instead of on the first conversions."""
+        with self._lock:
+            pool = self._ensure_pool()
+        for future in [pool.submit(os.getpid) for _ in range(self.max_workers)]:
+            future.result()
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def convert_sync(self, word_path: str, pdf_path: str, timeout: Optional[float] = None) -> dict:
+        """Blocking conversion; safe to call from any number of threads."""
+        future, pool, started = self._submit(word_path, pdf_path)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            convert_seconds = future.result(timeout=timeout)
+        except FutureTimeoutError as e:
+            self._timed_out(future, pool)
+            raise ConversionTimeout(f"Converting {word_path} exceeded {timeout:.0f}s") from e
+        return self._result(word_path, pdf_path, started, convert_seconds)
+
+    async def convert(self, word_path: str, pdf_path: str, timeout: Optional[float] = None) -> dict:
+        future, pool, started = self._submit(word_path, pdf_path)
+        timeout = self.timeout if timeout is None else timeout
+        waiter = asyncio.wrap_future(future)
+        try:
+            convert_seconds = await asyncio.wait_for(asyncio.shield(waiter), timeout=timeout)
+        except asyncio.TimeoutError as e:
+            # Nobody awaits it any more; consume its outcome
+            waiter.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._timed_out(future, pool)
+            raise ConversionTimeout(f"Converting {word_path} exceeded {timeout:.0f}s") from e
+        return self._result(word_path, pdf_path, started, convert_seconds)
+
+    def _submit(self, word_path: str, pdf_path: str) -> tuple[Future, ProcessPoolExecutor, float]:
+        with self._lock:
+            if self._metrics["in_flight"] >= self.max_workers + self.max_queue:
+                self._metrics["rejected"] += 1
+                raise ConversionQueueFull(
+                    f"{self._metrics['in_flight']} PDF conversions already in progress"
+                )
+            pool = self._ensure_pool()
+            future = pool.submit(convert_in_process, word_path, pdf_path)
+            self._metrics["submitted"] += 1
+            self._metrics["in_flight"] += 1
+        future.add_done_callback(self._done)
+        return future, pool, time.perf_counter()
+
+    def _done(self, future: Future):
+        # Runs on the pool's manager thread
+        with self._lock:
+            self._metrics["in_flight"] -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._metrics["failed"] += 1
+
+    def _result(self, word_path: str, pdf_path: str, started: float, convert_seconds: float) -> dict:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._metrics["completed"] += 1
+            self._metrics["total_seconds"] += elapsed
+            self._metrics["convert_seconds"] += convert_seconds
+            self._metrics["max_seconds"] = max(self._metrics["max_seconds"], elapsed)
+            self._latencies.append(elapsed)
+        return {
+            "word_path": word_path,
+            "pdf_path": pdf_path,
+            "seconds": elapsed,
+            "queued_seconds": max(elapsed - convert_seconds, 0.0),
+            "convert_seconds": convert_seconds,
+        }
+
+    def _timed_out(self, future: Future, pool: ProcessPoolExecutor):
+        with self._lock:
+            self._metrics["timed_out"] += 1
+            if future.cancel():
+                # Still queued: nothing is stuck
+                return
+            # A stuck converter would keep its worker forever: new conversions
+            # go to a fresh pool, the other conversions of this one still finish
+            if self._pool is pool:
+                self._pool = None
+        retire_pool(pool, future)
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self._started_at = self._started_at or time.perf_counter()
+        return self._pool
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._metrics["completed"]
+            latencies = sorted(self._latencies)
+            uptime = time.perf_counter() - self._started_at if self._started_at else 0.0
+            metrics = dict(self._metrics)
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            **metrics,
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queued": max(metrics["in_flight"] - self.max_workers, 0),
+            "avg_seconds": metrics["total_seconds"] / completed if completed else 0.0,
+            "avg_convert_seconds": metrics["convert_seconds"] / completed if completed else 0.0,
+            "p50_seconds": percentile(0.5),
+            "p95_seconds": percentile(0.95),
+            "throughput_per_second": completed / uptime if uptime else 0.0,
+        }
+
+
+_default_service: Optional[PdfConversionService] = None
+_default_lock = threading.Lock()
+
+
+def default_conversion_service() -> PdfConversionService:
+    """Process-wide service, configured from DESIGN_ENGINE_PDF_CONVERT_* env vars."""
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            _default_service = PdfConversionService(
+                max_workers=int(os.getenv("DESIGN_ENGINE_PDF_CONVERT_WORKERS", "2")),
+                max_queue=int(os.getenv("DESIGN_ENGINE_PDF_CONVERT_MAX_QUEUE", "100")),
+                timeout=float(os.getenv("DESIGN_ENGINE_PDF_CONVERT_TIMEOUT", "120")),
+            )
+        return _default_service
@@ -0,0 +1,39 @@
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Union
+
+
+# =========================
+# SQLite connections
+# =========================
+
+# Seconds a connection waits for another process's write lock
+LOCK_TIMEOUT = 30
+
+
+@contextmanager
+def connect(path: Union[str, Path]):
+    """
+    One short-lived connection per operation, committed on success and
+    rolled back on error. Every SQLite store in the app (caches, catalog,
+    session and job stores, render manifest) opens its connections here,
+    which keeps them safe to share between threads and worker processes.
+
+    These calls block, for up to LOCK_TIMEOUT seconds under write
+    contention, so async code never calls a store directly: the stores
+    offer ``a*`` variants that run the call in a thread.
+    """
+    conn = sqlite3.connect(path, timeout=LOCK_TIMEOUT)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def enable_wal(path: Union[str, Path]):
+    """Switch a SQLite database to WAL mode (persisted in the file)."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
@@ -1 +1,4 @@
-from .agent import design_document_agent , create_design_document_agent
+from .agent import design_document_agent , create_design_document_agent , OLLAMA_MODEL , OLLAMA_KEEP_ALIVE
+from .prompts import PROMPT_VERSION
+from .sections import create_sectioned_design_agent , PHASE3_SECTIONS , section_output_key
+from .callbacks import pop_raw_output
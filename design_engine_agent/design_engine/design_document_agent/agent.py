@@ -3,8 +3,9 @@ from dotenv import load_dotenv, find_dotenv
 from google.adk.tools.agent_tool import AgentTool
 
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
+from ..admission import AdmittedLiteLlm
 from .prompts import AGENT_DESCRIPTION , AGENT_INSTRUCTION
+from .callbacks import capture_raw_output
 from ..schemas import *
 from ..utils import generate_content_config
 
@@ -28,9 +29,12 @@ load_dotenv(find_dotenv())
 
 OLLAMA_API_BASE = os.getenv("OLLAMA_API_BASE", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "ollama_chat/phi3")
+# Sent with every call so Ollama does not unload the model between requests
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
 
-ollama_llm = LiteLlm(
-    model=OLLAMA_MODEL
+ollama_llm = AdmittedLiteLlm(
+    model=OLLAMA_MODEL,
+    keep_alive=OLLAMA_KEEP_ALIVE,
     # api_base=OLLAMA_API_BASE,
 )
 
@@ -60,5 +64,6 @@ def create_design_document_agent():
         description=AGENT_DESCRIPTION,
         instruction=AGENT_INSTRUCTION,
         output_key="phase_3_system_design",
-        generate_content_config=generate_content_config
+        generate_content_config=generate_content_config,
+        after_model_callback=capture_raw_output,
     )
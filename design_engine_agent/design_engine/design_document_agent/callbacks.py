@@ -0,0 +1,31 @@
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+
+# ==================================================
+# Raw Phase 3 output capture
+# ==================================================
+# ADK validates output_schema before the event reaches the session, so a
+# document that fails strict validation is otherwise lost. Keeping the raw
+# text lets the repair pipeline reuse the sections that were valid.
+
+raw_phase3_outputs: dict[str, str] = {}
+
+
+def capture_raw_output(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    if llm_response.content and llm_response.content.parts:
+        text = "".join(
+            part.text for part in llm_response.content.parts
+            if part.text and not part.thought
+        )
+        if text.strip():
+            raw_phase3_outputs[callback_context.session.id] = text
+    return None
+
+
+def pop_raw_output(session_id: str) -> Optional[str]:
+    return raw_phase3_outputs.pop(session_id, None)
@@ -0,0 +1,138 @@
+import json
+import time
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent, ParallelAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+from .agent import ollama_llm
+from ..admission import AdmissionRejected
+from .prompts import SECTION_AGENT_DESCRIPTION, SECTION_AGENT_INSTRUCTION
+from ..schemas import Phase3SystemDesign
+from ..utils import generate_content_config
+
+
+# ==================================================
+# Phase 3 sections (one agent per top-level field)
+# ==================================================
+
+PHASE3_SECTION_MODELS = {
+    name: field.annotation
+    for name, field in Phase3SystemDesign.model_fields.items()
+}
+
+PHASE3_SECTIONS = list(PHASE3_SECTION_MODELS)
+
+
+def section_output_key(section: str) -> str:
+    return f"phase_3_section_{section}"
+
+
+def create_section_agent(section: str) -> LlmAgent:
+    model = PHASE3_SECTION_MODELS[section]
+    return LlmAgent(
+        name=f"{section}_agent",
+        model=ollama_llm,
+        output_schema=model,
+        description=SECTION_AGENT_DESCRIPTION,
+        instruction=SECTION_AGENT_INSTRUCTION.format(
+            section_name=section,
+            section_schema=json.dumps(model.model_json_schema()),
+        ),
+        output_key=section_output_key(section),
+        generate_content_config=generate_content_config,
+    )
+
+
+# ==================================================
+# Helper agents
+# ==================================================
+
+class SectionGuardAgent(BaseAgent):
+    """
+    Runs a single section agent and swallows its errors, so one
+    malformed section does not abort the other parallel branches.
+    The assembler reports the section as missing instead.
+    """
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        section_agent = self.sub_agents[0]
+        try:
+            async for event in section_agent.run_async(ctx):
+                yield event
+        except AdmissionRejected:
+            # The whole attempt is refused, not just this section
+            raise
+        except Exception as e:
+            print(f"❌ Section agent {section_agent.name} failed: {e}")
+
+
+class Phase3AssemblerAgent(BaseAgent):
+    """
+    Merges the per-section outputs from session state into a single
+    ``phase_3_system_design`` value. Validation of the assembled
+    document is left to the caller (see RetryController).
+    """
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        design = {}
+        missing = []
+
+        for section in PHASE3_SECTIONS:
+            value = state.get(section_output_key(section))
+            if value is None:
+                missing.append(section)
+            else:
+                design[section] = value
+
+        if missing:
+            print(f"⚠️ Phase 3 sections missing after generation: {missing}")
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(
+                state_delta={
+                    "phase_3_system_design": design,
+                    "phase_3_missing_sections": missing,
+                }
+            ),
+            timestamp=time.time(),
+        )
+
+
+# ==================================================
+# Pipeline factory (for app)
+# ==================================================
+
+def create_sectioned_design_agent(sections: Optional[list[str]] = None) -> SequentialAgent:
+    """
+    Fan out one agent per section in a ParallelAgent, then assemble.
+    Wall-clock time is bounded by the slowest section.
+    """
+    if sections is None:
+        sections = PHASE3_SECTIONS
+
+    return SequentialAgent(
+        name="design_engine_sections",
+        sub_agents=[
+            ParallelAgent(
+                name="phase3_sections",
+                sub_agents=[
+                    SectionGuardAgent(
+                        name=f"{section}_guard",
+                        sub_agents=[create_section_agent(section)],
+                    )
+                    for section in sections
+                ],
+            ),
+            Phase3AssemblerAgent(name="phase3_assembler"),
+        ],
+    )
@@ -0,0 +1,102 @@
+import gzip
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from .render_plan import schema_version
+from .schemas import Phase3SystemDesign
+
+
+# =========================
+# Stored Designs
+# =========================
+
+# <dir>/<project>.design.json.gz next to <dir>/<project>.docx / .pdf
+DESIGN_SUFFIX = ".design.json.gz"
+
+# Bump when the envelope below changes shape
+DESIGN_FORMAT_VERSION = 1
+
+
+class StoredDesignError(Exception):
+    """A stored design that cannot be read (corrupt or unsupported format)."""
+
+
+@dataclass
+class StoredDesign:
+    path: str
+    design: dict
+    format_version: int
+    schema_version: str
+    saved_at: float
+
+
+def design_path_for(word_path: Union[str, Path]) -> Path:
+    """The stored design next to a rendered document."""
+    word_path = Path(word_path)
+    return word_path.with_name(word_path.stem + DESIGN_SUFFIX)
+
+
+def document_paths_for(design_path: Union[str, Path]) -> tuple[Path, Path]:
+    """(word_path, pdf_path) rendered from a stored design."""
+    design_path = Path(design_path)
+    stem = design_path.name[: -len(DESIGN_SUFFIX)]
+    return design_path.with_name(f"{stem}.docx"), design_path.with_name(f"{stem}.pdf")
+
+
+def save_design(design: dict, path: Union[str, Path]) -> Path:
+    """
+    Validate a Phase 3 design and store it gzip-compressed with its
+    format and schema versions. The file is replaced atomically, so a
+    reader never sees a half-written design.
+    """
+    validated = Phase3SystemDesign.model_validate(design).model_dump(mode="json")
+    envelope = {
+        "format_version": DESIGN_FORMAT_VERSION,
+        "schema_version": schema_version(Phase3SystemDesign),
+        "saved_at": time.time(),
+        "design": validated,
+    }
+    data = gzip.compress(
+        json.dumps(envelope, ensure_ascii=False, sort_keys=True).encode("utf-8"),
+        compresslevel=6,
+    )
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_design(path: Union[str, Path]) -> StoredDesign:
+    raw = Path(path).read_bytes()
+    try:
+        envelope = json.loads(gzip.decompress(raw))
+    except (OSError, EOFError, ValueError) as e:
+        raise StoredDesignError(f"{path}: not a stored design ({e})") from e
+
+    version = envelope.get("format_version")
+    if version != DESIGN_FORMAT_VERSION:
+        raise StoredDesignError(f"{path}: unsupported design format version {version}")
+
+    return StoredDesign(
+        path=str(path),
+        design=envelope["design"],
+        format_version=version,
+        schema_version=envelope.get("schema_version", ""),
+        saved_at=envelope.get("saved_at", 0.0),
+    )
+
+
+def find_designs(base_path: Union[str, Path], user_id: Optional[str] = None) -> list[Path]:
+    """Stored designs under ``<base_path>/<user>/`` (one user or all of them)."""
+    base_path = Path(base_path)
+    pattern = f"*{DESIGN_SUFFIX}"
+    if user_id is not None:
+        return sorted((base_path / user_id).glob(pattern))
+    return sorted(base_path.glob(f"*/{pattern}"))
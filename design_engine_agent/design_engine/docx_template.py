@@ -0,0 +1,181 @@
+import io
+import os
+import zipfile
+from functools import lru_cache
+from typing import Optional
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.shared import Emu
+from lxml import etree
+
+from .render_plan import write_phase3_design_from_plan
+from .utils import TABLE_STYLE, run_xml, table_rows_xml
+
+
+# Branded base document (.docx). Its styles, headers/footers, page setup
+# and any body content (e.g. a cover page) are kept; the design is
+# appended after the body content. Unset: python-docx's default template.
+DOCX_TEMPLATE = os.getenv("DESIGN_ENGINE_DOCX_TEMPLATE") or None
+
+BODY_MARKER = "design-engine-body"
+DOCUMENT_XML = "word/document.xml"
+
+BOLD = "<w:rPr><w:b/></w:rPr>"
+NOT_BOLD = '<w:rPr><w:b w:val="0"/></w:rPr>'
+
+
+# =========================
+# Base Template
+# =========================
+
+class DocxTemplate:
+    """
+    A base Word document, loaded and compiled once per process.
+
+    Loading saves the template through python-docx once and keeps every
+    package part as bytes, with word/document.xml split around the point
+    where the body content goes. A render then only writes the body XML
+    for its blocks and copies the other parts unchanged: no template
+    package is re-read or re-parsed and no styles are looked up.
+
+    Block markup is precompiled from the template: paragraph and table
+    style ids are resolved once, table headers (properties + grid) once
+    per column count. The output is the same WordprocessingML that
+    DocxWriter produces through python-docx.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        document = Document(path)
+        self._document = document
+
+        self.block_width = document._block_width
+
+        # A comment marks where rendered blocks are inserted
+        body = document.element.body
+        marker = etree.Comment(BODY_MARKER)
+        sect_pr = body.sectPr
+        if sect_pr is not None:
+            sect_pr.addprevious(marker)
+        else:
+            body.append(marker)
+
+        buffer = io.BytesIO()
+        document.save(buffer)
+        marker.getparent().remove(marker)
+
+        self.parts: list[tuple[str, bytes]] = []
+        with zipfile.ZipFile(buffer) as package:
+            for name in package.namelist():
+                self.parts.append((name, package.read(name)))
+
+        document_xml = dict(self.parts)[DOCUMENT_XML]
+        self.body_prefix, self.body_suffix = document_xml.split(f"<!--{BODY_MARKER}-->".encode())
+
+        self._paragraph_styles: dict[str, str] = {}
+        self._table_heads: dict[int, tuple[str, list[str]]] = {}
+        self.table_style_id = self._style_id(TABLE_STYLE, WD_STYLE_TYPE.TABLE)
+
+    # -----------------
+    # Precompiled blocks
+    # -----------------
+    def heading_xml(self, text, level: int = 1) -> str:
+        if not 0 <= level <= 9:
+            raise ValueError("level must be in range 0-9, got %d" % level)
+        style = "Title" if level == 0 else "Heading %d" % level
+        return self.paragraph_xml(text, style=style)
+
+    def paragraph_xml(self, text, style: Optional[str] = None, run_props: Optional[str] = None) -> str:
+        """
+        A paragraph like Document.add_paragraph(text, style). With run_props
+        the run is always written, like add_paragraph().add_run(text).
+        """
+        xml = ["<w:p>"]
+        if style is not None:
+            style_id = self._paragraph_style_id(style)
+            if style_id is not None:
+                xml.append(f'<w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>')
+        if run_props is not None:
+            xml.append(run_xml("" if text is None else str(text), run_props))
+        elif text:
+            xml.append(run_xml(str(text)))
+        xml.append("</w:p>")
+        return "".join(xml)
+
+    def table_xml(self, headers: list[str], rows: list[list]) -> str:
+        head, cell_widths = self._table_head(len(headers))
+        return f"{head}{table_rows_xml([headers, *rows], cell_widths)}</w:tbl>"
+
+    def _table_head(self, cols: int) -> tuple[str, list[str]]:
+        head = self._table_heads.get(cols)
+        if head is None:
+            # Same table properties and grid as Document.add_table + table.style
+            width = str((Emu(self.block_width // cols) if cols > 0 else Emu(0)).twips)
+            style = f'<w:tblStyle w:val="{self.table_style_id}"/>' if self.table_style_id else ""
+            grid = f'<w:gridCol w:w="{width}"/>' * cols
+            head = self._table_heads[cols] = (
+                "<w:tbl><w:tblPr>"
+                f'{style}<w:tblW w:type="auto" w:w="0"/>'
+                '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+                'w:noHBand="0" w:noVBand="1" w:val="04A0"/>'
+                f"</w:tblPr><w:tblGrid>{grid}</w:tblGrid>",
+                [width] * cols,
+            )
+        return head
+
+    def _paragraph_style_id(self, name: str) -> Optional[str]:
+        if name not in self._paragraph_styles:
+            self._paragraph_styles[name] = self._style_id(name, WD_STYLE_TYPE.PARAGRAPH)
+        return self._paragraph_styles[name]
+
+    def _style_id(self, name: str, style_type) -> Optional[str]:
+        # None for the template's default style, which needs no reference
+        return self._document.part.get_style_id(name, style_type)
+
+    # -----------------
+    # Output
+    # -----------------
+    def write(self, output_path: str, blocks: list[str]):
+        with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as package:
+            for name, data in self.parts:
+                if name == DOCUMENT_XML:
+                    data = b"".join([self.body_prefix, "".join(blocks).encode("utf-8"), self.body_suffix])
+                package.writestr(name, data)
+
+
+@lru_cache(maxsize=None)
+def load_template(path: Optional[str] = None) -> DocxTemplate:
+    """One compiled template per path and process."""
+    return DocxTemplate(path)
+
+
+# =========================
+# Template Writer
+# =========================
+
+class TemplateDocxWriter:
+    """Writes layout blocks (same interface as DocxWriter) into a copy of a DocxTemplate."""
+
+    def __init__(self, template: Optional[DocxTemplate] = None):
+        self.template = template or load_template(DOCX_TEMPLATE)
+        self.blocks: list[str] = []
+
+    def heading(self, text, level=1):
+        self.blocks.append(self.template.heading_xml(text, level))
+
+    def paragraph(self, text, bold=False):
+        self.blocks.append(self.template.paragraph_xml(text, run_props=BOLD if bold else NOT_BOLD))
+
+    def table(self, headers, rows):
+        self.blocks.append(self.template.table_xml(headers, rows))
+
+    def save(self, output_path: str):
+        self.template.write(output_path, self.blocks)
+
+
+def render_phase3_design_from_template(phase3: dict, output_path: str, template: Optional[DocxTemplate] = None):
+    """Renders a Phase 3 system design into a copy of the base Word template."""
+    writer = TemplateDocxWriter(template)
+    write_phase3_design_from_plan(phase3, writer)
+    writer.save(output_path)
@@ -0,0 +1,523 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from .db import connect, enable_wal
+
+
+# =========================
+# Job Model
+# =========================
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    user_id: str
+    app_name: str
+    session_id: str
+    status: str = JOB_QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    # False for jobs whose clients poll at their own pace (the JSON API)
+    abandonable: bool = True
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "user_id": self.user_id,
+            "app_name": self.app_name,
+            "session_id": self.session_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+            "abandonable": self.abandonable,
+        }
+
+
+JobWork = Callable[[Job], Awaitable[Any]]
+
+
+# =========================
+# Job Store
+# =========================
+
+class SqliteJobStore:
+    """
+    SQLite table of jobs shared by every worker process, so whichever
+    worker serves a request can look a job up or find a session's active
+    job, and can leave a cancel request or a "seen" marker for the worker
+    running it.
+
+    One row per job, indexed by user and status; lookups are single
+    SELECTs and never write. Rows not updated for ``ttl_seconds`` are
+    purged, and the oldest finished ones beyond ``max_entries``.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 3600, max_entries: int = 10_000):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._metrics = {"expired": 0, "evicted": 0}
+
+        enable_wal(self.path)
+        with connect(self.path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    data TEXT NOT NULL,
+                    cancel_reason TEXT,
+                    seen_at REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_by_user ON jobs (user_id, status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_by_update ON jobs (updated_at)")
+
+    def save(self, data: dict):
+        """Insert or update a job; cancel requests and markers left by others are kept."""
+        with connect(self.path) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, user_id, status, created_at, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET "
+                "status = excluded.status, updated_at = excluded.updated_at, data = excluded.data",
+                (
+                    data["id"], data["user_id"], data["status"], data["created_at"],
+                    time.time(), json.dumps(data, default=str),
+                ),
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with connect(self.path) as conn:
+            row = conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_jobs(self, user_id: str, statuses) -> list[dict]:
+        placeholders = ", ".join("?" * len(statuses))
+        with connect(self.path) as conn:
+            rows = conn.execute(
+                f"SELECT data FROM jobs WHERE user_id = ? AND status IN ({placeholders}) "
+                "ORDER BY created_at",
+                (user_id, *statuses),
+            ).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def request_cancel(self, job_id: str, reason: str):
+        with connect(self.path) as conn:
+            conn.execute("UPDATE jobs SET cancel_reason = ? WHERE id = ?", (reason, job_id))
+
+    def mark_seen(self, job_id: str, at: float):
+        with connect(self.path) as conn:
+            conn.execute("UPDATE jobs SET seen_at = ? WHERE id = ?", (at, job_id))
+
+    def watch_state(self, job_ids: list[str]) -> dict[str, tuple]:
+        """job id -> (cancel reason, last "seen" time) left by other processes"""
+        placeholders = ", ".join("?" * len(job_ids))
+        with connect(self.path) as conn:
+            rows = conn.execute(
+                f"SELECT id, cancel_reason, seen_at FROM jobs WHERE id IN ({placeholders})",
+                job_ids,
+            ).fetchall()
+        return {job_id: (reason, seen_at) for job_id, reason, seen_at in rows}
+
+    async def purge_expired(self) -> int:
+        return await asyncio.to_thread(self._purge_expired)
+
+    def _purge_expired(self) -> int:
+        with connect(self.path) as conn:
+            expired = conn.execute(
+                "DELETE FROM jobs WHERE updated_at <= ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+            overflow = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] - self.max_entries
+            evicted = 0
+            if overflow > 0:
+                evicted = conn.execute(
+                    "DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE status NOT IN (?, ?) "
+                    "ORDER BY updated_at ASC LIMIT ?)",
+                    (*ACTIVE_STATUSES, overflow),
+                ).rowcount
+        self._metrics["expired"] += expired
+        self._metrics["evicted"] += evicted
+        return expired + evicted
+
+    def stats(self) -> dict:
+        with connect(self.path) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {**self._metrics, "jobs": dict(rows), "max_entries": self.max_entries}
+
+
+# =========================
+# Job Queue
+# =========================
+
+class JobQueue:
+    """
+    Bounded asyncio job queue with a fixed pool of worker tasks.
+
+    Jobs are submitted with an async callable that receives the Job;
+    its return value becomes ``job.result``. Finished jobs are kept
+    (up to ``max_finished_jobs``) so their status can still be queried.
+
+    With a ``store`` (SqliteJobStore) every status change is mirrored
+    there, so other worker processes can look jobs up.
+    Listeners (``add_listener``) are called with the Job on every status
+    change in this process.
+
+    Store writes go through one background thread (in order, never
+    blocking the event loop); async callers read through ``aget``,
+    ``alist_jobs``, ``afind_active`` and ``acancel``.
+
+    ``lanes`` maps a job kind to a worker count: jobs of that kind get
+    their own queue (also ``max_queue_size`` deep) and workers, so they
+    never wait behind the other jobs nor take their workers.
+
+    Jobs can be cancelled (``cancel``), which cancels the task running
+    them. With ``abandon_after`` set, active abandonable jobs nobody has
+    looked at (``touch``) for that many seconds are cancelled as abandoned.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = 2,
+        max_queue_size: int = 100,
+        max_finished_jobs: int = 500,
+        store=None,
+        abandon_after: Optional[float] = None,
+        watch_interval: float = 5.0,
+        lanes: Optional[dict[str, int]] = None,
+    ):
+        self.num_workers = num_workers
+        self.lanes = lanes or {}
+        self.max_finished_jobs = max_finished_jobs
+        self.store = store
+        self.abandon_after = abandon_after
+        self.watch_interval = watch_interval
+        self._listeners: list[Callable[[Job], None]] = []
+        self._running: dict[str, asyncio.Task] = {}
+        self._cancel_reasons: dict[str, str] = {}
+        self._last_seen: dict[str, float] = {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._lane_queues: dict[str, asyncio.Queue] = {
+            kind: asyncio.Queue(maxsize=max_queue_size) for kind in self.lanes
+        }
+        self._jobs: dict[str, Job] = {}
+        self._finished: OrderedDict[str, None] = OrderedDict()
+        self._workers: list[asyncio.Task] = []
+        self._store_writer: Optional[ThreadPoolExecutor] = None
+
+    async def start(self):
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(i, self._queue), name=f"job-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+        for kind, workers in self.lanes.items():
+            self._workers.extend(
+                asyncio.create_task(
+                    self._worker(f"{kind}-{i}", self._lane_queues[kind]),
+                    name=f"job-worker-{kind}-{i}",
+                )
+                for i in range(workers)
+            )
+        if self.abandon_after is not None or self.store is not None:
+            self._workers.append(asyncio.create_task(self._watchdog(), name="job-watchdog"))
+        lanes = "".join(f", {workers} for {kind}" for kind, workers in self.lanes.items())
+        print(f"✅ Job queue started with {self.num_workers} workers{lanes}")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._store_writer is not None:
+            # Flush the last status changes
+            await asyncio.to_thread(self._store_writer.shutdown, wait=True)
+            self._store_writer = None
+
+    def submit(
+        self,
+        *,
+        kind: str,
+        user_id: str,
+        app_name: str,
+        session_id: str,
+        work: JobWork,
+        abandonable: bool = True,
+    ) -> Job:
+        job = Job(
+            id=str(uuid.uuid4()),
+            kind=kind,
+            user_id=user_id,
+            app_name=app_name,
+            session_id=session_id,
+            abandonable=abandonable,
+        )
+        queue = self._lane_queues.get(kind, self._queue)
+        try:
+            queue.put_nowait((job, work))
+        except asyncio.QueueFull as e:
+            raise JobQueueFull(
+                f"Job queue is full ({queue.maxsize} pending jobs)"
+            ) from e
+
+        self._jobs[job.id] = job
+        self._publish(job)
+        print(f"📥 Job {job.id} queued ({kind}) for {user_id}/{app_name}")
+        return job
+
+    def cancel(self, job_id: str, reason: str = "Cancelled by user") -> bool:
+        """Cancel a queued or running job. Returns False if it is not active."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            # Possibly running in another worker process: leave it a flag
+            job = self.get(job_id)
+            if job is None or job.status not in ACTIVE_STATUSES:
+                return False
+            self._write_store(self.store.request_cancel, job_id, reason)
+            return True
+
+        if job.status not in ACTIVE_STATUSES:
+            return False
+
+        self._cancel_reasons[job_id] = reason
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        else:
+            # Still queued: the worker skips it when dequeued
+            job.status = JOB_CANCELLED
+            job.error = reason
+            job.finished_at = time.time()
+            self._publish(job)
+            self._remember_finished(job)
+        print(f"🛑 Job {job_id} cancelled: {reason}")
+        return True
+
+    def touch(self, job_id: str):
+        """Record that a client is still watching an active job."""
+        job = self._jobs.get(job_id)
+        if job is not None and job.status not in ACTIVE_STATUSES:
+            # Finished jobs are polled for their results; nothing to track
+            return
+        now = time.time()
+        previous = self._last_seen.get(job_id, 0.0)
+        self._last_seen[job_id] = now
+        if self.store is not None and now - previous >= self.watch_interval:
+            self._write_store(self.store.mark_seen, job_id, now)
+
+    def add_listener(self, listener: Callable[[Job], None]):
+        self._listeners.append(listener)
+
+    def find_active(self, user_id: str, session_id: str) -> Optional[Job]:
+        """The queued / running job for a session, if there is one."""
+        for job in self.list_jobs(user_id, statuses=ACTIVE_STATUSES):
+            if job.session_id == session_id:
+                return job
+        return None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            data = self.store.get(job_id)
+            job = Job(**data) if data else None
+        return job
+
+    def list_jobs(self, user_id: str, statuses=ACTIVE_STATUSES) -> list[Job]:
+        jobs = {}
+        if self.store is not None:
+            # Jobs submitted through other worker processes
+            jobs = {data["id"]: Job(**data) for data in self.store.list_jobs(user_id, statuses)}
+        # This process's own copies are newer than their queued store writes
+        jobs.update((job.id, job) for job in self._jobs.values() if job.user_id == user_id)
+
+        return sorted(
+            (job for job in jobs.values() if job.status in statuses),
+            key=lambda job: job.created_at,
+        )
+
+    # -----------------
+    # Async lookups (store reads are blocking SQLite calls)
+    # -----------------
+    async def aget(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = await asyncio.to_thread(self.get, job_id)
+        return job
+
+    async def alist_jobs(self, user_id: str, statuses=ACTIVE_STATUSES) -> list[Job]:
+        if self.store is None:
+            return self.list_jobs(user_id, statuses)
+        return await asyncio.to_thread(self.list_jobs, user_id, statuses)
+
+    async def afind_active(self, user_id: str, session_id: str) -> Optional[Job]:
+        for job in await self.alist_jobs(user_id, statuses=ACTIVE_STATUSES):
+            if job.session_id == session_id:
+                return job
+        return None
+
+    async def acancel(self, job_id: str, reason: str = "Cancelled by user") -> bool:
+        if job_id not in self._jobs:
+            job = await self.aget(job_id)
+            if job is None or job.status not in ACTIVE_STATUSES:
+                return False
+        return self.cancel(job_id, reason)
+
+    def stats(self) -> dict:
+        counts = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.num_workers,
+            "queue_depth": self._queue.qsize(),
+            "lanes": {
+                kind: {"workers": self.lanes[kind], "queue_depth": queue.qsize()}
+                for kind, queue in self._lane_queues.items()
+            },
+            "jobs": counts,
+        }
+
+    async def _worker(self, index, queue: asyncio.Queue):
+        while True:
+            job, work = await queue.get()
+            if job.status == JOB_CANCELLED:
+                queue.task_done()
+                continue
+
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            self._publish(job)
+            print(f"⚙️ Worker {index} started job {job.id}")
+
+            task = asyncio.create_task(work(job))
+            self._running[job.id] = task
+            try:
+                job.result = await task
+                job.status = JOB_SUCCEEDED
+                print(f"✅ Job {job.id} finished")
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    # This worker itself is being stopped
+                    job.status = JOB_FAILED
+                    job.error = "Job was cancelled during shutdown"
+                    raise
+                if job.id in self._cancel_reasons:
+                    job.status = JOB_CANCELLED
+                    job.error = self._cancel_reasons[job.id]
+                else:
+                    # Something the job awaited was cancelled (e.g. a render
+                    # future of a restarted pool): the job fails, the worker goes on
+                    job.status = JOB_FAILED
+                    job.error = "Job was cancelled unexpectedly"
+                    print(f"❌ Job {job.id} failed: {job.error}")
+            except Exception as e:
+                job.status = JOB_FAILED
+                job.error = str(e)
+                print(f"❌ Job {job.id} failed: {e}")
+            finally:
+                self._running.pop(job.id, None)
+                job.finished_at = time.time()
+                self._publish(job)
+                self._remember_finished(job)
+                queue.task_done()
+
+    def _publish(self, job: Job):
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                print(f"⚠️ Job listener failed for {job.id}: {e}")
+
+        if self.store is not None:
+            # Snapshot now: the job keeps changing while the write is queued
+            self._write_store(self.store.save, job.to_dict())
+
+    def _write_store(self, fn: Callable, *args):
+        if self._store_writer is None:
+            self._store_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+        future = self._store_writer.submit(fn, *args)
+        future.add_done_callback(_report_store_error)
+
+    def _remember_finished(self, job: Job):
+        self._cancel_reasons.pop(job.id, None)
+        self._last_seen.pop(job.id, None)
+        self._finished[job.id] = None
+        while len(self._finished) > self.max_finished_jobs:
+            old_id, _ = self._finished.popitem(last=False)
+            self._jobs.pop(old_id, None)
+
+    async def _watchdog(self):
+        """Apply cancel requests from other processes and cancel abandoned jobs."""
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            now = time.time()
+            self._forget_seen(now)
+            jobs = [j for j in self._jobs.values() if j.status in ACTIVE_STATUSES]
+            shared = {}
+            if self.store is not None and jobs:
+                try:
+                    shared = await asyncio.to_thread(self.store.watch_state, [j.id for j in jobs])
+                except Exception as e:
+                    print(f"⚠️ Job watchdog could not read the job store: {e}")
+
+            for job in jobs:
+                try:
+                    cancel_reason, seen_at = shared.get(job.id, (None, None))
+                    if cancel_reason:
+                        self.cancel(job.id, cancel_reason)
+                        continue
+
+                    if self.abandon_after is None or not job.abandonable:
+                        continue
+                    last_seen = max(job.created_at, self._last_seen.get(job.id, 0.0))
+                    last_seen = max(last_seen, seen_at or 0.0)
+                    if now - last_seen > self.abandon_after:
+                        self.cancel(job.id, "Abandoned: no client was watching")
+                except Exception as e:
+                    print(f"⚠️ Job watchdog failed for {job.id}: {e}")
+
+    def _forget_seen(self, now: float):
+        # Entries of jobs running in other processes only throttle the
+        # shared "seen" marker, so they are not needed past one interval
+        for job_id, seen_at in list(self._last_seen.items()):
+            job = self._jobs.get(job_id)
+            if (job is None or job.status not in ACTIVE_STATUSES) and now - seen_at > self.watch_interval:
+                del self._last_seen[job_id]
+
+
+def _report_store_error(future):
+    # Losing the shared copy must never fail the job itself
+    if not future.cancelled() and future.exception() is not None:
+        print(f"⚠️ Could not write to the job store: {future.exception()}")
@@ -0,0 +1,299 @@
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from fpdf import FPDF
+
+from .render_plan import write_phase3_design_from_plan
+
+
+# =========================
+# Fonts
+# =========================
+
+# Built-in Helvetica needs no font file and no subsetting, so it is used
+# whenever the text fits Latin-1 (after LATIN1_REPLACEMENTS). Other text
+# switches to a Unicode TTF: the first existing pair below, or
+# DESIGN_ENGINE_PDF_FONT / DESIGN_ENGINE_PDF_FONT_BOLD.
+FONT_CANDIDATES = [
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"),
+    ("/usr/share/fonts/dejavu/DejaVuSans.ttf", "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf"),
+    ("/usr/share/fonts/TTF/DejaVuSans.ttf", "/usr/share/fonts/TTF/DejaVuSans-Bold.ttf"),
+    ("/Library/Fonts/Arial Unicode.ttf", "/Library/Fonts/Arial Unicode.ttf"),
+    ("C:/Windows/Fonts/arial.ttf", "C:/Windows/Fonts/arialbd.ttf"),
+]
+
+LATIN1_REPLACEMENTS = str.maketrans({
+    "\u2013": "-", "\u2014": "-", "\u2018": "'", "\u2019": "'",
+    "\u201c": '"', "\u201d": '"', "\u2022": "-", "\u2026": "...", "\u2192": "->",
+    "\u00a0": " ", "\t": "    ",
+})
+
+
+@lru_cache(maxsize=1)
+def unicode_font_files() -> Optional[tuple[str, str]]:
+    override = os.getenv("DESIGN_ENGINE_PDF_FONT")
+    if override:
+        return override, os.getenv("DESIGN_ENGINE_PDF_FONT_BOLD", override)
+
+    for regular, bold in FONT_CANDIDATES:
+        if Path(regular).exists():
+            return regular, bold if Path(bold).exists() else regular
+    return None
+
+
+# =========================
+# Layout
+# =========================
+
+PAGE_MARGIN = 18  # mm
+PT = 0.3528  # mm per point
+
+# level -> (font size pt, space before mm)
+HEADING_STYLES = {0: (20, 0), 1: (15, 4), 2: (12, 3)}
+BODY_SIZE = 10.5
+TABLE_SIZE = 9
+CELL_PADDING = 1.4
+# Same header shading as Word's "Light Grid Accent 1" table style
+TABLE_HEADER_FILL = (219, 229, 241)
+TABLE_BORDER = (79, 129, 189)
+
+
+class PdfWriter:
+    """
+    Writes layout blocks (headings, paragraphs, tables) straight into a PDF
+    with fpdf2: no office suite and no intermediate DOCX.
+
+    Blocks are collected first and laid out on ``save()``, once the font is
+    known. Wrapping is done here with cached word widths and lines are
+    drawn with ``FPDF.text``, which avoids fpdf2's per-character line
+    breaker. Every render owns its FPDF instance, so renders can run
+    concurrently in threads or worker processes.
+    """
+
+    def __init__(self):
+        self.blocks: list[tuple] = []
+
+    # -----------------
+    # Layout blocks (same interface as DocxWriter)
+    # -----------------
+    def heading(self, text, level=1):
+        self.blocks.append(("heading", _text(text), level))
+
+    def paragraph(self, text, bold=False):
+        self.blocks.append(("paragraph", _text(text), bold))
+
+    def table(self, headers, rows):
+        self.blocks.append((
+            "table",
+            [_text(h) for h in headers],
+            [[_text(str(cell)) for cell in row] for row in rows],
+        ))
+
+    # -----------------
+    # Rendering
+    # -----------------
+    def save(self, output_path: str):
+        self._start()
+        for block in self.blocks:
+            getattr(self, f"_draw_{block[0]}")(*block[1:])
+        self.pdf.output(output_path)
+
+    def _start(self):
+        self.pdf = FPDF(format="A4", unit="mm")
+        self.pdf.set_margins(PAGE_MARGIN, PAGE_MARGIN, PAGE_MARGIN)
+        self.pdf.set_auto_page_break(False)
+        self.pdf.set_draw_color(*TABLE_BORDER)
+        self.pdf.set_line_width(0.2)
+        self._widths: dict[tuple, float] = {}
+
+        self.family, self.encode = "Helvetica", _latin1
+        if not self._fits_latin1():
+            fonts = unicode_font_files()
+            if fonts:
+                self.pdf.add_font("Body", "", fonts[0])
+                self.pdf.add_font("Body", "B", fonts[1])
+                self.family, self.encode = "Body", str
+
+        self.width = self.pdf.epw
+        self.bottom = self.pdf.h - PAGE_MARGIN
+        self._new_page()
+
+    def _fits_latin1(self) -> bool:
+        for block in self.blocks:
+            texts = [block[1]] if block[0] != "table" else [*block[1], *(c for r in block[2] for c in r)]
+            for text in texts:
+                try:
+                    text.translate(LATIN1_REPLACEMENTS).encode("latin-1")
+                except UnicodeEncodeError:
+                    return False
+        return True
+
+    def _new_page(self):
+        self.pdf.add_page()
+        self.y = PAGE_MARGIN
+
+    def _font(self, bold: bool, size: float):
+        self.style, self.size = ("B" if bold else ""), size
+        self.pdf.set_font(self.family, self.style, size)
+
+    def _draw_heading(self, text: str, level: int):
+        size, space = HEADING_STYLES.get(level, HEADING_STYLES[2])
+        self._font(True, size)
+        line_height = size * PT * 1.3
+        lines = self._wrap(text, self.width)
+        # Keep a heading on the same page as the first line after it
+        if self.y + space + line_height * (len(lines) + 1) > self.bottom:
+            self._new_page()
+        elif self.y > PAGE_MARGIN:
+            self.y += space
+        self._draw_lines(lines, PAGE_MARGIN, line_height)
+        self.y += 1.5
+
+    def _draw_paragraph(self, text: str, bold: bool):
+        self._font(bold, BODY_SIZE)
+        self._draw_lines(self._wrap(text, self.width), PAGE_MARGIN, BODY_SIZE * PT * 1.45)
+        self.y += 1.6
+
+    def _draw_lines(self, lines: list[str], x: float, line_height: float):
+        for line in lines:
+            if self.y + line_height > self.bottom:
+                self._new_page()
+            if line:
+                self.pdf.text(x, self._baseline(self.y, line_height), line)
+            self.y += line_height
+
+    def _draw_table(self, headers: list[str], rows: list[list[str]]):
+        line_height = TABLE_SIZE * PT * 1.35
+        widths = self._column_widths(headers, rows)
+
+        header = self._wrap_row(headers, widths, bold=True)
+        self._font(False, TABLE_SIZE)
+        wrapped = [self._wrap_row(row, widths, bold=False) for row in rows]
+
+        header_height = max(len(c) for c in header) * line_height + 2 * CELL_PADDING
+        # Lines of one row that fit on a page below the header
+        capacity = int((self.bottom - PAGE_MARGIN - header_height - 2 * CELL_PADDING) // line_height)
+        blocks = [(cells, False) for cells in wrapped]
+
+        repeat_header = capacity > 0
+        if repeat_header:
+            if self.y + header_height + line_height + 2 * CELL_PADDING > self.bottom:
+                self._new_page()
+            self._draw_row(header, widths, line_height, bold=True)
+        else:
+            # A header that leaves no room below it on a page is drawn once,
+            # split like any other row, and not repeated on later pages
+            capacity = int((self.bottom - PAGE_MARGIN - 2 * CELL_PADDING) // line_height)
+            blocks.insert(0, (header, True))
+
+        for cells, bold in blocks:
+            while True:
+                room = int((self.bottom - self.y - 2 * CELL_PADDING) // line_height)
+                needed = max(len(c) for c in cells)
+                if needed <= room:
+                    self._draw_row(cells, widths, line_height, bold=bold)
+                    break
+                # Only rows taller than a whole page are split across pages
+                if needed > capacity and room > 0:
+                    self._draw_row([c[:room] for c in cells], widths, line_height, bold=bold)
+                    cells = [c[room:] for c in cells]
+                self._new_page()
+                if repeat_header:
+                    self._draw_row(header, widths, line_height, bold=True)
+
+        self.y += 3
+
+    def _draw_row(self, cells: list[list[str]], widths: list[float], line_height: float, bold: bool):
+        self._font(bold, TABLE_SIZE)
+        height = max(len(c) for c in cells) * line_height + 2 * CELL_PADDING
+        if bold:
+            self.pdf.set_fill_color(*TABLE_HEADER_FILL)
+
+        x = PAGE_MARGIN
+        for lines, width in zip(cells, widths):
+            self.pdf.rect(x, self.y, width, height, style="DF" if bold else "D")
+            y = self.y + CELL_PADDING
+            for line in lines:
+                if line:
+                    self.pdf.text(x + CELL_PADDING, self._baseline(y, line_height), line)
+                y += line_height
+            x += width
+        self.y += height
+
+    def _wrap_row(self, cells: list[str], widths: list[float], bold: bool) -> list[list[str]]:
+        self._font(bold, TABLE_SIZE)
+        return [self._wrap(cell, width - 2 * CELL_PADDING) for cell, width in zip(cells, widths)]
+
+    def _column_widths(self, headers: list[str], rows: list[list[str]]) -> list[float]:
+        """Share the page width in proportion to each column's content."""
+        self._font(True, TABLE_SIZE)
+        natural = [self._measure(h) for h in headers]
+        self._font(False, TABLE_SIZE)
+        for row in rows:
+            for i, cell in enumerate(row[:len(natural)]):
+                natural[i] = max(natural[i], self._measure(cell))
+
+        minimum = min(14.0, self.width / len(natural))
+        natural = [min(max(w + 2 * CELL_PADDING, minimum), self.width / 2) for w in natural]
+        scale = self.width / sum(natural)
+        return [w * scale for w in natural]
+
+    def _wrap(self, text: str, width: float) -> list[str]:
+        text = self.encode(text)
+        space = self._measure(" ")
+        lines = []
+        for paragraph in text.split("\n"):
+            line, line_width = [], 0.0
+            for word in paragraph.split(" "):
+                word_width = self._measure(word)
+                if word_width > width:
+                    # A single word wider than the column: hard-break it
+                    if line:
+                        lines.append(" ".join(line))
+                    chunks = self._break_word(word, width)
+                    lines.extend(chunks[:-1])
+                    line, line_width = [chunks[-1]], self._measure(chunks[-1])
+                elif line and line_width + space + word_width > width:
+                    lines.append(" ".join(line))
+                    line, line_width = [word], word_width
+                else:
+                    line_width += (space if line else 0) + word_width
+                    line.append(word)
+            lines.append(" ".join(line))
+        return lines
+
+    def _break_word(self, word: str, width: float) -> list[str]:
+        chunks, chunk = [], ""
+        for char in word:
+            if chunk and self._measure(chunk + char) > width:
+                chunks.append(chunk)
+                chunk = ""
+            chunk += char
+        return chunks + [chunk]
+
+    def _measure(self, text: str) -> float:
+        key = (self.style, self.size, text)
+        width = self._widths.get(key)
+        if width is None:
+            width = self._widths[key] = self.pdf.get_string_width(text)
+        return width
+
+    def _baseline(self, top: float, line_height: float) -> float:
+        return top + (line_height + self.size * PT * 0.7) / 2
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _latin1(text: str) -> str:
+    return text.translate(LATIN1_REPLACEMENTS).encode("latin-1", "replace").decode("latin-1")
+
+
+def render_phase3_design_to_pdf(phase3: dict, output_path: str):
+    """Renders a Phase 3 system design directly to PDF (same layout as the Word document)."""
+    writer = PdfWriter()
+    write_phase3_design_from_plan(phase3, writer)
+    writer.save(output_path)
@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+
+# =========================
+# Retiring stuck process pools
+# =========================
+
+class _Retirement:
+    """A pool that takes no new work and is terminated once only stuck jobs are left."""
+
+    def __init__(self, pool: ProcessPoolExecutor):
+        self.pool = pool
+        # shutdown() drops the pool's references; keep our own
+        self.processes = getattr(pool, "_processes", None) or {}
+        self.pending = getattr(pool, "_pending_work_items", None) or {}
+        self.stuck: set[Future] = set()
+        self.terminated = False
+        self.lock = threading.Lock()
+
+    def watch(self):
+        for item in list(self.pending.values()):
+            if item.future not in self.stuck:
+                item.future.add_done_callback(self.check)
+        self.check()
+
+    def check(self, _=None):
+        # Runs on the pool's manager thread for every finished job
+        with self.lock:
+            if self.terminated:
+                return
+            for item in list(self.pending.values()):
+                if item.future not in self.stuck and not item.future.done():
+                    return
+            self.terminated = True
+
+        for process in list(self.processes.values()):
+            process.terminate()
+        with _retirements_lock:
+            _retirements.pop(self.pool, None)
+
+
+_retirements: dict[ProcessPoolExecutor, _Retirement] = {}
+_retirements_lock = threading.Lock()
+
+
+def retire_pool(pool: ProcessPoolExecutor, stuck: Future):
+    """
+    Take ``pool`` out of service after ``stuck`` exceeded its timeout.
+
+    ProcessPoolExecutor cannot kill one busy worker without breaking
+    every other future of the pool, so the pool stops accepting work
+    instead: its other jobs (running and queued) still finish normally,
+    and then its processes, the stuck ones included, are terminated.
+    The stuck futures then fail with BrokenProcessPool. Callers submit
+    new work to a fresh pool.
+    """
+    with _retirements_lock:
+        retirement = _retirements.get(pool)
+        if retirement is None:
+            retirement = _retirements[pool] = _Retirement(pool)
+        with retirement.lock:
+            retirement.stuck.add(stuck)
+
+    pool.shutdown(wait=False, cancel_futures=False)
+    retirement.watch()
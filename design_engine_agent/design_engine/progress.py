@@ -0,0 +1,126 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Optional
+
+
+# =========================
+# Progress event types
+# =========================
+
+PROGRESS_STATUS = "status"
+PROGRESS_ATTEMPT = "attempt"
+PROGRESS_ATTEMPT_RESULT = "attempt_result"
+PROGRESS_SECTION_COMPLETED = "section_completed"
+PROGRESS_TOKENS = "tokens"
+PROGRESS_CACHE_HIT = "cache_hit"
+PROGRESS_COALESCED = "coalesced"
+PROGRESS_RENDER_STARTED = "render_started"
+PROGRESS_PDF_READY = "pdf_ready"
+
+
+class _Channel:
+    def __init__(self):
+        self.events: list[dict] = []
+        self.last_id = 0
+        self.started = time.time()
+        self.closed = False
+        self.changed = asyncio.Event()
+
+    def notify(self):
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+# =========================
+# Progress Broker
+# =========================
+
+class ProgressBroker:
+    """
+    In-process fan-out of progress events per job.
+
+    Every event gets a sequence id, so subscribers that (re)connect late
+    replay the backlog first (``after`` = last seen id) and then follow
+    live events until the job is closed.
+    """
+
+    def __init__(self, max_events_per_job: int = 500, max_jobs: int = 500):
+        self.max_events_per_job = max_events_per_job
+        self.max_jobs = max_jobs
+        self._channels: OrderedDict[str, _Channel] = OrderedDict()
+
+    def has(self, job_id: str) -> bool:
+        return job_id in self._channels
+
+    def publish(self, job_id: str, event_type: str, **data):
+        channel = self._channel(job_id)
+        if channel.closed:
+            return
+
+        channel.last_id += 1
+        channel.events.append({
+            "id": channel.last_id,
+            "type": event_type,
+            "at": time.time(),
+            "elapsed": round(time.time() - channel.started, 3),
+            **data,
+        })
+        if len(channel.events) > self.max_events_per_job:
+            # Token counts are superseded by later ones, so drop those first
+            last_tokens = max(
+                (e["id"] for e in channel.events if e["type"] == PROGRESS_TOKENS), default=0
+            )
+            channel.events = [
+                e for e in channel.events
+                if e["type"] != PROGRESS_TOKENS or e["id"] == last_tokens
+            ][-self.max_events_per_job:]
+        channel.notify()
+
+    def close(self, job_id: str):
+        channel = self._channels.get(job_id)
+        if channel is not None:
+            channel.closed = True
+            channel.notify()
+
+    async def subscribe(
+        self,
+        job_id: str,
+        after: int = 0,
+        keepalive: float = 15.0,
+    ) -> AsyncIterator[Optional[dict]]:
+        """
+        Yield events with an id greater than ``after``. Yields ``None``
+        every ``keepalive`` seconds without news so callers can ping.
+        """
+        channel = self._channel(job_id)
+        while True:
+            changed = channel.changed
+            for event in channel.events:
+                if event["id"] > after:
+                    after = event["id"]
+                    yield event
+
+            if channel.closed:
+                return
+
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield None
+
+    def _channel(self, job_id: str) -> _Channel:
+        channel = self._channels.get(job_id)
+        if channel is None:
+            channel = self._channels[job_id] = _Channel()
+            while len(self._channels) > self.max_jobs:
+                self._channels.popitem(last=False)
+        return channel
+
+
+def format_sse(event: Optional[dict]) -> str:
+    """Encode one event (or a keep-alive ping for ``None``) as an SSE frame."""
+    if event is None:
+        return ": ping\n\n"
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
@@ -1,5 +1,5 @@
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
+from ..admission import AdmittedLiteLlm
 from dotenv import load_dotenv, find_dotenv
 import os
 from .prompts import AGENT_DESCRIPTION , AGENT_INSTRUCTION
@@ -33,9 +33,12 @@ load_dotenv(find_dotenv())
 
 OLLAMA_API_BASE = os.getenv("OLLAMA_API_BASE", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "ollama_chat/phi3")
+# Sent with every call so Ollama does not unload the model between requests
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
 
-ollama_llm = LiteLlm(
-    model=OLLAMA_MODEL
+ollama_llm = AdmittedLiteLlm(
+    model=OLLAMA_MODEL,
+    keep_alive=OLLAMA_KEEP_ALIVE,
     # api_base=OLLAMA_API_BASE,
 )
 
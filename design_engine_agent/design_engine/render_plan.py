@@ -0,0 +1,319 @@
+import hashlib
+import json
+import types
+import typing
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Optional, Union
+
+from pydantic import BaseModel, ValidationError
+
+from .schemas import MermaidDiagrams, Phase3SystemDesign
+from .utils import sanitize_mermaid_output, write_phase3_design
+
+
+# =========================
+# Layout choices
+# =========================
+
+# The document title comes from this field and is skipped in its section
+TITLE_FIELD = ("executive_summary", "title")
+DEFAULT_TITLE = "System Design Document"
+
+SECTION_TITLES = {
+    "mermaid_diagrams": "System Architecture & Diagrams",
+}
+
+FIELD_LABELS = {
+    "ci_cd": "CI/CD",
+    "db_type": "Database Type",
+    "e2e_testing": "End-to-End Testing",
+    "expected_active_users": "Expected Active Users (MAU)",
+    "infra_as_code": "Infrastructure as Code",
+    "load_and_stress": "Load & Stress Testing",
+    "monthly_estimate_usd": "Monthly Cost",
+    "non_functional_requirements": "Non-Functional Requirements",
+    "slo_sla_targets": "SLO / SLA Targets",
+    "data_flow_diagram_refs": "Data Flow Diagram References",
+}
+
+UPPERCASE_WORDS = {"qa", "dr", "er", "sla", "slo", "api", "usd"}
+LOWERCASE_WORDS = {"of", "as", "for", "to"}
+
+# Mermaid sources are cleaned up and shown as code under their own label
+CODE_FIELDS = {
+    (MermaidDiagrams, "system_architecture"): "System Architecture Diagram (Mermaid Code)",
+    (MermaidDiagrams, "user_flows"): "User Flow Diagram (Mermaid Code)",
+    (MermaidDiagrams, "database_er"): "Database ER Diagram (Mermaid Code)",
+}
+
+FIELD_FORMATS: dict[str, Callable[[Any], str]] = {
+    "monthly_estimate_usd": lambda value: f"${value:,.2f}",
+}
+
+
+def format_value(value) -> str:
+    if isinstance(value, bool):
+        return format_bool(value)
+    if isinstance(value, list):
+        return format_list(value)
+    return str(value)
+
+
+def format_bool(value: bool) -> str:
+    return "Yes" if value else "No"
+
+
+def format_list(value: list) -> str:
+    return ", ".join(str(v) for v in value)
+
+
+def value_formatter(name: str, annotation) -> Optional[Callable[[Any], str]]:
+    """Formatter for a field, chosen from its type; None when the value is already a str."""
+    if name in FIELD_FORMATS:
+        return FIELD_FORMATS[name]
+    if annotation is str:
+        return None
+    if annotation is bool:
+        return format_bool
+    if typing.get_origin(annotation) is list:
+        return format_list
+    if annotation in (int, float):
+        return str
+    return format_value
+
+
+def field_label(name: str) -> str:
+    if name in FIELD_LABELS:
+        return FIELD_LABELS[name]
+    words = []
+    for i, word in enumerate(name.split("_")):
+        if word == "and":
+            words.append("&")
+        elif word in UPPERCASE_WORDS:
+            words.append(word.upper())
+        elif word in LOWERCASE_WORDS and i:
+            words.append(word)
+        else:
+            words.append(word.capitalize())
+    return " ".join(words)
+
+
+# =========================
+# Render Plan
+# =========================
+
+@dataclass(frozen=True)
+class RenderStep:
+    """
+    One field of the schema and how it is laid out.
+
+    kind:
+      - "title":   document title (heading 0)
+      - "section": heading 1, then ``steps`` on the section object
+      - "object":  heading, then ``steps`` on the nested object
+      - "text":    "Label: value"
+      - "code":    bold label, then the (formatted) value as its own paragraph
+      - "list":    bold label, then one "- item" paragraph per item
+      - "text_or_list": "text" or "list", decided by the value
+      - "table":   bold label, then a table with ``columns``
+      - "group":   bold label, then per item a heading (its first field)
+                   followed by ``steps`` on the item
+    """
+
+    kind: str
+    label: str
+    get: Callable[[Any], Any]
+    level: int = 2
+    format: Callable[[Any], str] = str
+    # table: column headers, a getter returning one row's values as a
+    # tuple, and per column a formatter (None: the value is a str)
+    headers: tuple = ()
+    row: Optional[Callable[[Any], tuple]] = None
+    formats: tuple = ()
+    steps: tuple = ()
+
+
+@dataclass(frozen=True)
+class RenderPlan:
+    schema: type
+    version: str
+    steps: tuple
+
+
+@lru_cache(maxsize=None)
+def schema_version(schema: type[BaseModel]) -> str:
+    """Short digest of the JSON schema; changes whenever a field does."""
+    raw = json.dumps(schema.model_json_schema(), sort_keys=True).encode()
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+
+_plans: dict[str, RenderPlan] = {}
+
+
+def get_render_plan(schema: type[BaseModel] = Phase3SystemDesign) -> RenderPlan:
+    """The compiled plan for ``schema``, compiled once per schema version."""
+    version = schema_version(schema)
+    plan = _plans.get(version)
+    if plan is None:
+        plan = _plans[version] = RenderPlan(schema, version, compile_render_plan(schema))
+    return plan
+
+
+def compile_render_plan(schema: type[BaseModel]) -> tuple:
+    """Walk the top-level model once: every field becomes a section."""
+    section, title = TITLE_FIELD
+    steps = [RenderStep("title", "", attrgetter(f"{section}.{title}"), level=0)]
+    for name, field in schema.model_fields.items():
+        skip = {title} if name == section else set()
+        steps.append(RenderStep(
+            "section",
+            SECTION_TITLES.get(name, field_label(name)),
+            attrgetter(name),
+            level=1,
+            steps=_compile_fields(field.annotation, level=2, skip=skip),
+        ))
+    return tuple(steps)
+
+
+def _compile_fields(model: type[BaseModel], level: int, skip: set = frozenset()) -> tuple:
+    steps = []
+    for name, field in model.model_fields.items():
+        if name in skip:
+            continue
+        steps.append(_compile_field(model, name, field.annotation, level))
+    return tuple(steps)
+
+
+def _compile_field(model: type[BaseModel], name: str, annotation, level: int) -> RenderStep:
+    label = field_label(name)
+    get = attrgetter(name)
+    fmt = value_formatter(name, annotation) or str
+
+    if (model, name) in CODE_FIELDS:
+        return RenderStep("code", CODE_FIELDS[model, name], get, format=sanitize_mermaid_output)
+
+    if _is_model(annotation):
+        return RenderStep("object", label, get, level=level, steps=_compile_fields(annotation, level + 1))
+
+    item = _list_item(annotation)
+    if item is not None and _is_model(item):
+        fields = item.model_fields
+        nested = any(_is_model(_list_item(f.annotation)) for f in fields.values())
+        if not nested:
+            names = list(fields)
+            # attrgetter with several names returns a tuple; keep that for one name too
+            row = attrgetter(*names) if len(names) > 1 else (lambda item, n=names[0]: (getattr(item, n),))
+            return RenderStep(
+                "table", label, get,
+                headers=tuple(field_label(n) for n in names),
+                row=row,
+                formats=tuple(value_formatter(n, f.annotation) for n, f in fields.items()),
+            )
+        # Items with tables of their own (e.g. database schemas): one block each
+        first = next(iter(fields))
+        return RenderStep(
+            "group", label, get, level=level,
+            format=attrgetter(first),
+            steps=_compile_fields(item, level + 1, skip={first}),
+        )
+
+    if item is not None:
+        if _is_union(annotation):
+            return RenderStep("text_or_list", label, get, format=format_value)
+        return RenderStep("list", label, get)
+
+    return RenderStep("text", label, get, format=fmt)
+
+
+def _is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _is_union(annotation) -> bool:
+    return typing.get_origin(annotation) in (Union, types.UnionType)
+
+
+def _list_item(annotation) -> Optional[Any]:
+    """Item type of List[X] (also inside X | List[X]), else None."""
+    if typing.get_origin(annotation) is list:
+        return typing.get_args(annotation)[0]
+    if _is_union(annotation):
+        for arg in typing.get_args(annotation):
+            if typing.get_origin(arg) is list:
+                return typing.get_args(arg)[0]
+    return None
+
+
+# =========================
+# Plan Execution
+# =========================
+
+def run_render_plan(plan: RenderPlan, design: BaseModel, writer):
+    """Lay out a validated design with ``writer`` in one pass over the plan."""
+    _run_steps(plan.steps, design, writer)
+
+
+def _run_steps(steps: tuple, obj, writer):
+    for step in steps:
+        value = step.get(obj)
+        kind = step.kind
+
+        if kind == "text":
+            writer.paragraph(f"{step.label}: {step.format(value)}")
+        elif kind == "list" or (kind == "text_or_list" and isinstance(value, list)):
+            if value:
+                writer.paragraph(step.label, bold=True)
+                for item in value:
+                    writer.paragraph(f"- {item}")
+        elif kind == "text_or_list":
+            writer.paragraph(f"{step.label}: {step.format(value)}")
+        elif kind == "table":
+            if value:
+                writer.paragraph(step.label, bold=True)
+                writer.table(headers=list(step.headers), rows=_table_rows(step, value))
+        elif kind in ("section", "object"):
+            writer.heading(step.label, step.level)
+            _run_steps(step.steps, value, writer)
+        elif kind == "group":
+            if value:
+                writer.paragraph(step.label, bold=True)
+                for item in value:
+                    writer.heading(str(step.format(item)), step.level)
+                    _run_steps(step.steps, item, writer)
+        elif kind == "code":
+            text = step.format(value)
+            if text:
+                writer.paragraph(step.label, bold=True)
+                writer.paragraph(text)
+        elif kind == "title":
+            writer.heading(value or DEFAULT_TITLE, 0)
+
+
+def _table_rows(step: RenderStep, items: list) -> list[list[str]]:
+    row, formats = step.row, step.formats
+    if not any(formats):
+        return [list(row(item)) for item in items]
+    return [
+        [value if fmt is None else fmt(value) for value, fmt in zip(row(item), formats)]
+        for item in items
+    ]
+
+
+def write_phase3_design_from_plan(phase3: Union[dict, Phase3SystemDesign], writer):
+    """
+    Lays out a Phase 3 design through the compiled render plan. Designs
+    that do not validate against the schema fall back to the tolerant
+    hand-written layout (utils.write_phase3_design).
+    """
+    if isinstance(phase3, Phase3SystemDesign):
+        design = phase3
+    else:
+        try:
+            design = Phase3SystemDesign.model_validate(phase3)
+        except ValidationError as e:
+            print(f"⚠️ Design does not match the schema ({e.error_count()} errors), using the fallback layout")
+            write_phase3_design(phase3, writer)
+            return
+    run_render_plan(get_render_plan(), design, writer)
@@ -0,0 +1,232 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from .conversion import PdfConversionService, convert_in_process, default_conversion_service
+from .design_store import save_design
+from .docx_template import DOCX_TEMPLATE, load_template, render_phase3_design_from_template
+from .pdf_rendering import render_phase3_design_to_pdf
+from .pools import retire_pool
+from .render_plan import schema_version
+from .schemas import Phase3SystemDesign
+from .utils import render_phase3_design_to_word
+
+
+# "native": fpdf2 renders the design straight to PDF (any OS, no office suite)
+# "pdfitdown": converts the DOCX with pdfitdown; RenderExecutor sends it to
+#              the PdfConversionService, direct callers convert in-process
+# "docx2pdf": converts the DOCX through Microsoft Word (Windows / macOS only)
+PDF_ENGINE = os.getenv("DESIGN_ENGINE_PDF_ENGINE", "native")
+
+# "template": fills a copy of the base template loaded once per worker
+#             (DESIGN_ENGINE_DOCX_TEMPLATE for a branded one)
+# "python-docx": builds every document from Document()
+DOCX_RENDERER = os.getenv("DESIGN_ENGINE_DOCX_RENDERER", "template")
+
+# Bump whenever a change to the layout or the writers changes what gets
+# rendered, so `python -m design_engine.archive` refreshes old documents
+RENDERER_REVISION = 1
+
+
+def renderer_version(render_pdf: bool = True) -> str:
+    """Identifies everything besides the design that shapes the rendered files."""
+    return "-".join([
+        f"r{RENDERER_REVISION}",
+        schema_version(Phase3SystemDesign),
+        DOCX_RENDERER,
+        PDF_ENGINE if render_pdf else "no-pdf",
+    ])
+
+
+# =========================
+# Worker-side render job
+# =========================
+
+def render_design_documents(
+    phase3: dict,
+    word_path: str,
+    pdf_path: Optional[str],
+    design_path: Optional[str] = None,
+) -> dict:
+    """
+    Render a Phase 3 design to Word and PDF (PDF skipped when
+    ``pdf_path`` is None) and, with ``design_path``, store the design
+    JSON next to them so the documents can be re-rendered later.
+    Runs inside a worker process, so it must stay a top-level function.
+    """
+    Path(word_path).parent.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    if DOCX_RENDERER == "python-docx":
+        render_phase3_design_to_word(phase3, word_path)
+    else:
+        render_phase3_design_from_template(phase3, word_path)
+    rendered = time.perf_counter()
+
+    if pdf_path is not None:
+        if PDF_ENGINE == "pdfitdown":
+            convert_in_process(word_path, pdf_path)
+        elif PDF_ENGINE == "docx2pdf":
+            from docx2pdf import convert
+            convert(word_path, pdf_path)
+        else:
+            render_phase3_design_to_pdf(phase3, pdf_path)
+    converted = time.perf_counter()
+
+    if design_path is not None:
+        try:
+            save_design(phase3, design_path)
+        except Exception as e:
+            # The documents are already written; only re-rendering them is lost
+            print(f"⚠️ Could not store design JSON {design_path}: {e}")
+            design_path = None
+
+    return {
+        "word_path": word_path,
+        "pdf_path": pdf_path,
+        "design_path": design_path,
+        "render_seconds": rendered - started,
+        "convert_seconds": converted - rendered,
+    }
+
+
+def warm_worker():
+    """Loads the renderers in a fresh worker (spawned workers import on first use)."""
+    if DOCX_RENDERER != "python-docx":
+        load_template(DOCX_TEMPLATE)
+
+
+class RenderTimeout(Exception):
+    """Raised when a render job does not finish within its timeout."""
+
+
+# =========================
+# Render Executor
+# =========================
+
+class RenderExecutor:
+    """
+    Process pool for DOCX and PDF rendering.
+
+    The FastAPI app awaits ``render()``; the heavy python-docx / fpdf2
+    work runs in worker processes so the event loop is never blocked.
+
+    With the "pdfitdown" engine the render workers only write the DOCX;
+    its PDF conversion goes through ``conversion`` (the process-wide
+    PdfConversionService by default), with that service's queue bound,
+    timeout and stats.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: float = 300.0,
+        conversion: Optional[PdfConversionService] = None,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        if conversion is None and PDF_ENGINE == "pdfitdown":
+            conversion = default_conversion_service()
+        self.conversion = conversion
+        self._conversion_started = False
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "in_flight": 0,
+            "total_seconds": 0.0,
+            "max_seconds": 0.0,
+        }
+
+    def start(self):
+        if self._pool is None:
+            # Spawned, not forked: the app process already runs threads
+            # (to_thread, the job store writer) whose locks a fork would copy
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            # Start every worker now, not one per render as they are needed
+            for _ in range(self.max_workers):
+                self._pool.submit(warm_worker)
+            print(f"✅ Render executor started with {self.max_workers} processes")
+            if self.conversion is not None and not self._conversion_started:
+                # Spawns its workers once, not again when a stuck render pool is replaced
+                self.conversion.start()
+                self._conversion_started = True
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self.conversion is not None:
+            self.conversion.shutdown()
+            self._conversion_started = False
+
+    async def render(
+        self,
+        phase3: dict,
+        word_path: str,
+        pdf_path: Optional[str],
+        timeout: Optional[float] = None,
+        design_path: Optional[str] = None,
+    ) -> dict:
+        self.start()
+        timeout = self.timeout if timeout is None else timeout
+
+        self._metrics["submitted"] += 1
+        self._metrics["in_flight"] += 1
+        started = time.perf_counter()
+
+        convert_pdf = pdf_path is not None and self.conversion is not None
+        pool = self._pool
+        future = pool.submit(
+            render_design_documents, phase3, word_path, None if convert_pdf else pdf_path, design_path
+        )
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+            if convert_pdf:
+                conversion = await self.conversion.convert(word_path, pdf_path)
+                result["pdf_path"] = pdf_path
+                result["convert_seconds"] = conversion["seconds"]
+        except asyncio.TimeoutError as e:
+            self._metrics["timed_out"] += 1
+            self._retire_pool(pool, future)
+            raise RenderTimeout(
+                f"Rendering {word_path} exceeded {timeout:.0f}s"
+            ) from e
+        except Exception:
+            self._metrics["failed"] += 1
+            raise
+        finally:
+            self._metrics["in_flight"] -= 1
+
+        elapsed = time.perf_counter() - started
+        self._metrics["completed"] += 1
+        self._metrics["total_seconds"] += elapsed
+        self._metrics["max_seconds"] = max(self._metrics["max_seconds"], elapsed)
+        return result
+
+    def stats(self) -> dict:
+        completed = self._metrics["completed"]
+        return {
+            **self._metrics,
+            "workers": self.max_workers,
+            "avg_seconds": self._metrics["total_seconds"] / completed if completed else 0.0,
+        }
+
+    def _retire_pool(self, pool: ProcessPoolExecutor, stuck):
+        if stuck.cancel():
+            # Still queued: nothing is stuck
+            return
+        # A stuck worker would keep its slot forever: new renders go to a
+        # fresh pool, the other renders of this one still finish
+        if self._pool is pool:
+            self._pool = None
+        retire_pool(pool, stuck)
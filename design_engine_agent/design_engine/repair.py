@@ -0,0 +1,157 @@
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from google.adk.events import Event, EventActions
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService
+from google.genai import types
+from pydantic import ValidationError
+
+from .design_document_agent import (
+    PHASE3_SECTIONS,
+    create_sectioned_design_agent,
+    section_output_key,
+)
+from .design_document_agent.sections import PHASE3_SECTION_MODELS
+from .runners import RunnerRegistry
+
+
+# =========================
+# Per-section validation
+# =========================
+
+def split_phase3_sections(raw: Any) -> tuple[dict, dict]:
+    """
+    Validate each Phase3SystemDesign section on its own.
+    Returns (valid_sections, errors) where errors maps section -> message.
+    Unknown top-level keys are dropped.
+    """
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError as e:
+            return {}, {section: f"Document was not valid JSON: {e}" for section in PHASE3_SECTIONS}
+
+    if not isinstance(raw, dict):
+        return {}, {section: "Document was not a JSON object" for section in PHASE3_SECTIONS}
+
+    valid, errors = {}, {}
+    for section, model in PHASE3_SECTION_MODELS.items():
+        if section not in raw:
+            errors[section] = "Section is missing"
+            continue
+        try:
+            valid[section] = model.model_validate(raw[section]).model_dump()
+        except ValidationError as e:
+            errors[section] = str(e)
+
+    return valid, errors
+
+
+def build_repair_message(errors: dict) -> types.Content:
+    error_lines = "\n".join(
+        f"- {section}: {message}" for section, message in errors.items()
+    )
+    return types.Content(
+        role="user",
+        parts=[types.Part(text=(
+            "REPAIR MODE: the previous system design document failed validation.\n"
+            "Only the sections listed below are being regenerated; all other "
+            "sections were valid and are kept as they are.\n\n"
+            "Validation errors by section:\n"
+            f"{error_lines}\n\n"
+            "Regenerate ONLY your section, fixing the errors listed for it.\n"
+            "- Output JSON ONLY for that section\n"
+            "- No missing keys, no extra keys, no empty values\n"
+        ))]
+    )
+
+
+# =========================
+# Repair planning
+# =========================
+
+@dataclass
+class RepairPlan:
+    sections: list[str]
+    runner: Runner
+    message: types.Content
+
+
+class Phase3SectionRepairer:
+    """
+    Keeps the sections of a failed Phase 3 document that validate, and
+    plans a run that regenerates only the failing ones (with their
+    validation errors as context). The sectioned pipeline's assembler
+    merges kept and regenerated sections back into phase_3_system_design.
+
+    With a ``runners`` registry, the repair pipeline for a given set of
+    failing sections is built once and reused.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_service: BaseSessionService,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        runners: Optional[RunnerRegistry] = None,
+    ):
+        self.session_service = session_service
+        self.runners = runners
+        self.app_name = app_name
+        self.user_id = user_id
+        self.session_id = session_id
+
+    async def __call__(self, raw: Any) -> Optional[RepairPlan]:
+        valid, errors = split_phase3_sections(raw)
+
+        if not valid:
+            # Nothing worth keeping, a full regeneration is cheaper
+            return None
+
+        print(f"🩹 Keeping {len(valid)} valid sections, repairing {list(errors)}")
+
+        session = await self.session_service.get_session(
+            app_name=self.app_name,
+            user_id=self.user_id,
+            session_id=self.session_id,
+        )
+        await self.session_service.append_event(
+            session,
+            Event(
+                invocation_id=f"phase_3_repair_{int(time.time() * 1000)}",
+                author="system",
+                actions=EventActions(
+                    state_delta={
+                        **{section_output_key(s): v for s, v in valid.items()},
+                        # Failing sections must not be reused from older attempts
+                        **{section_output_key(s): None for s in errors},
+                        "phase_3_repair_errors": errors,
+                    }
+                ),
+                timestamp=time.time(),
+            ),
+        )
+
+        return RepairPlan(
+            sections=list(errors),
+            runner=self._runner(list(errors)),
+            message=build_repair_message(errors),
+        )
+
+    def _runner(self, sections: list[str]) -> Runner:
+        if self.runners is None:
+            return Runner(
+                agent=create_sectioned_design_agent(sections),
+                app_name=self.app_name,
+                session_service=self.session_service,
+            )
+        return self.runners.runner(
+            f"phase3_repair:{','.join(sections)}",
+            self.app_name,
+            factory=lambda: create_sectioned_design_agent(sections),
+        )
@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from .design_store import DESIGN_SUFFIX, document_paths_for, find_designs, load_design
+from .rendering import RenderExecutor
+
+
+# =========================
+# Re-rendering
+# =========================
+
+RERENDER_SUCCEEDED = "succeeded"
+RERENDER_FAILED = "failed"
+
+
+@dataclass
+class RerenderResult:
+    design_path: str
+    word_path: Optional[str] = None
+    pdf_path: Optional[str] = None
+    status: str = RERENDER_FAILED
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+
+async def rerender_design(
+    executor: RenderExecutor,
+    design_path: Path,
+    render_pdf: bool = True,
+) -> RerenderResult:
+    """Render the DOCX (and PDF) next to a stored design again, without the LLM."""
+    result = RerenderResult(design_path=str(design_path))
+    started = time.perf_counter()
+    try:
+        stored = await asyncio.to_thread(load_design, design_path)
+        word_path, pdf_path = document_paths_for(design_path)
+        await executor.render(stored.design, str(word_path), str(pdf_path) if render_pdf else None)
+        result.word_path = str(word_path)
+        result.pdf_path = str(pdf_path) if render_pdf else None
+        result.status = RERENDER_SUCCEEDED
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        print(f"❌ Re-render of {design_path} failed: {result.error}")
+    finally:
+        result.seconds = time.perf_counter() - started
+    return result
+
+
+async def rerender_designs(
+    executor: RenderExecutor,
+    design_paths: list[Path],
+    render_pdf: bool = True,
+    concurrency: Optional[int] = None,
+) -> list[RerenderResult]:
+    """
+    Re-render many stored designs; the executor's workers render them in
+    parallel. ``concurrency`` caps how many are rendering at once, leaving
+    the other workers free for other renders.
+    """
+    if not concurrency:
+        return await asyncio.gather(
+            *(rerender_design(executor, path, render_pdf) for path in design_paths)
+        )
+
+    limit = asyncio.Semaphore(concurrency)
+
+    async def bounded(path: Path) -> RerenderResult:
+        async with limit:
+            return await rerender_design(executor, path, render_pdf)
+
+    return await asyncio.gather(*(bounded(path) for path in design_paths))
+
+
+def summarize(results: list[RerenderResult], wall_seconds: float) -> dict:
+    rendered = sum(r.status == RERENDER_SUCCEEDED for r in results)
+    return {
+        "documents": len(results),
+        "rendered": rendered,
+        "failed": len(results) - rendered,
+        "wall_seconds": round(wall_seconds, 3),
+        "documents_per_second": round(rendered / wall_seconds, 2) if wall_seconds else 0.0,
+    }
+
+
+# =========================
+# CLI
+# =========================
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Re-render DOCX/PDF documents from their stored design JSON (no LLM calls).",
+    )
+    parser.add_argument("designs", nargs="*", type=Path, help=f"Stored design files (*{DESIGN_SUFFIX})")
+    parser.add_argument("--base-path", type=Path, default=Path("design_engine/documents"))
+    parser.add_argument("--user", help="Re-render every document of this user")
+    parser.add_argument("--project", help="With --user: only this project")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("DESIGN_ENGINE_RENDER_WORKERS", "0")) or None)
+    parser.add_argument("--no-pdf", action="store_true", help="Only write DOCX files")
+    parser.add_argument("--report", type=Path, help="Write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    if args.project and not args.user:
+        parser.error("--project requires --user")
+
+    paths = list(args.designs)
+    if args.user and args.project:
+        paths.append(args.base_path / args.user / f"{args.project}{DESIGN_SUFFIX}")
+    elif args.user:
+        paths.extend(find_designs(args.base_path, args.user))
+    elif not paths:
+        paths = find_designs(args.base_path)
+
+    if not paths:
+        print(f"⚠️ No stored designs found under {args.base_path}")
+        return 1
+
+    executor = RenderExecutor(
+        max_workers=args.workers,
+        timeout=float(os.getenv("DESIGN_ENGINE_RENDER_TIMEOUT", "300")),
+    )
+    print(f"=== Re-rendering {len(paths)} documents with {executor.max_workers} workers ===")
+
+    started = time.perf_counter()
+    executor.start()
+    try:
+        results = asyncio.run(rerender_designs(executor, paths, render_pdf=not args.no_pdf))
+    finally:
+        executor.shutdown()
+    summary = summarize(results, time.perf_counter() - started)
+
+    for r in results:
+        print(f"{'✅' if r.status == RERENDER_SUCCEEDED else '❌'} {r.design_path} {r.seconds:.2f}s {r.error or ''}")
+    print(
+        f"\n{summary['rendered']}/{summary['documents']} re-rendered in {summary['wall_seconds']:.1f}s "
+        f"({summary['documents_per_second']:.1f} docs/s, {summary['failed']} failed)"
+    )
+
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(
+            json.dumps({"summary": summary, "documents": [asdict(r) for r in results]}, indent=2),
+            encoding="utf-8",
+        )
+    return 0 if summary["failed"] == 0 else 1
+
+
+# ✅ Run
+if __name__ == "__main__":
+    sys.exit(main())
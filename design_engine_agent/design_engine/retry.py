@@ -0,0 +1,318 @@
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Optional, Type
+
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService
+from google.genai import types
+from litellm.exceptions import BadRequestError
+from pydantic import BaseModel, ValidationError
+
+from .admission import PRIORITY_BATCH, AdmissionScheduler, admitting
+
+
+# =========================
+# Attempt bookkeeping
+# =========================
+
+ATTEMPT_VALID = "valid"
+ATTEMPT_INVALID = "invalid"
+ATTEMPT_LLM_ERROR = "llm_error"
+ATTEMPT_CANCELLED = "cancelled"
+
+
+@dataclass
+class AttemptRecord:
+    attempt: int
+    is_retry: bool
+    started_at: float
+    duration_seconds: float = 0.0
+    outcome: str = ATTEMPT_INVALID
+    error: Optional[str] = None
+    # Sections regenerated by a repair attempt (empty for full attempts)
+    repaired_sections: list[str] = field(default_factory=list)
+
+
+@dataclass
+class RetryOutcome:
+    success: bool
+    value: Optional[dict] = None
+    cancelled: bool = False
+    attempts: list[AttemptRecord] = field(default_factory=list)
+
+    def attempts_as_dicts(self) -> list[dict]:
+        return [asdict(a) for a in self.attempts]
+
+
+class InvalidOutput(Exception):
+    """An attempt finished but its output did not validate."""
+
+    def __init__(self, message: str, raw: Any = None):
+        super().__init__(message)
+        self.raw = raw
+
+
+# A repair hook receives the raw invalid output and may return a plan
+# (with ``runner``, ``message`` and ``sections``) for a cheaper retry
+RepairHook = Callable[[Any], Awaitable[Optional[Any]]]
+
+
+class RetryExhausted(Exception):
+    """Raised when every attempt failed to produce a valid output."""
+
+    def __init__(self, message: str, outcome: RetryOutcome):
+        super().__init__(message)
+        self.outcome = outcome
+
+
+# Progress hook: receives an event type and its payload
+ProgressHook = Callable[..., None]
+
+
+# Aggregate counters per phase, exposed on /metrics
+retry_metrics: dict[str, dict[str, int]] = {}
+
+
+def _record_metrics(phase: str, outcome: RetryOutcome):
+    m = retry_metrics.setdefault(
+        phase, {"requests": 0, "attempts": 0, "succeeded": 0, "failed": 0, "cancelled": 0}
+    )
+    m["requests"] += 1
+    m["attempts"] += len(outcome.attempts)
+    if outcome.cancelled:
+        m["cancelled"] += 1
+    else:
+        m["succeeded" if outcome.success else "failed"] += 1
+
+
+# =========================
+# Retry Controller
+# =========================
+
+class RetryController:
+    """
+    Runs an agent until the value it writes to ``output_key`` validates
+    against ``schema``.
+
+    - Stops on the first valid result
+    - Uses the stricter retry prompt only after a failed attempt
+    - Waits with exponential backoff between attempts
+    - Optionally repairs only the invalid parts of an output (``repair``)
+      instead of regenerating it from scratch
+    - Cancelling the task running ``run()`` stops the in-flight LLM call
+      and is recorded as a cancelled outcome
+    - With an ``admission`` scheduler, every LLM request of the agent
+      waits for a slot, so each parallel section of a sectioned run counts
+      against the cap; ``reject_when_full`` makes the first attempt fail
+      fast with AdmissionRejected instead of queueing behind a full queue
+    """
+
+    def __init__(
+        self,
+        *,
+        phase: str,
+        runner: Runner,
+        session_service: BaseSessionService,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        output_key: str,
+        schema: Type[BaseModel],
+        build_message: Callable[[bool], types.Content],
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        repair: Optional[RepairHook] = None,
+        raw_output_source: Optional[Callable[[str], Any]] = None,
+        progress: Optional[ProgressHook] = None,
+        admission: Optional[AdmissionScheduler] = None,
+        priority: int = PRIORITY_BATCH,
+        reject_when_full: bool = False,
+    ):
+        self.phase = phase
+        self.runner = runner
+        self.session_service = session_service
+        self.app_name = app_name
+        self.user_id = user_id
+        self.session_id = session_id
+        self.output_key = output_key
+        self.schema = schema
+        self.build_message = build_message
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.repair = repair
+        self.raw_output_source = raw_output_source
+        self.progress = progress
+        self.admission = admission
+        self.priority = priority
+        self.reject_when_full = reject_when_full
+
+    def _emit(self, event_type: str, **data):
+        if self.progress is not None:
+            self.progress(event_type, phase=self.phase, **data)
+
+    def backoff_delay(self, attempt: int) -> float:
+        # attempt 2 waits base_delay, attempt 3 waits 2x, attempt 4 waits 4x ...
+        return min(self.max_delay, self.base_delay * (2 ** (attempt - 2)))
+
+    async def run(self) -> RetryOutcome:
+        outcome = RetryOutcome(success=False)
+        repair_plan = None
+
+        try:
+            for attempt in range(1, self.max_retries + 1):
+                is_retry = attempt > 1
+                if is_retry:
+                    delay = self.backoff_delay(attempt)
+                    print(f"⏳ Backing off {delay:.1f}s before attempt {attempt}")
+                    await asyncio.sleep(delay)
+
+                print(f"\n🔁 [{self.phase}] Runner attempt {attempt}")
+                record = AttemptRecord(
+                    attempt=attempt, is_retry=is_retry, started_at=time.time()
+                )
+                outcome.attempts.append(record)
+                started = time.perf_counter()
+
+                if repair_plan is not None:
+                    runner, message = repair_plan.runner, repair_plan.message
+                    record.repaired_sections = list(repair_plan.sections)
+                else:
+                    runner, message = self.runner, self.build_message(is_retry)
+
+                self._emit(
+                    "attempt",
+                    attempt=attempt,
+                    is_retry=is_retry,
+                    repaired_sections=record.repaired_sections,
+                )
+
+                raw = None
+                try:
+                    outcome.value = await self._run_attempt(
+                        runner, message, reject_when_full=self.reject_when_full and not is_retry
+                    )
+                    record.outcome = ATTEMPT_VALID
+                    outcome.success = True
+                except asyncio.CancelledError:
+                    print(f"🛑 [{self.phase}] Cancelled during attempt {attempt}")
+                    record.outcome = ATTEMPT_CANCELLED
+                    raise
+                except BadRequestError as e:
+                    print("❌ LLM BadRequestError occurred")
+                    print("Message:", str(e))
+                    record.outcome = ATTEMPT_LLM_ERROR
+                    record.error = str(e)
+                except InvalidOutput as e:
+                    print(f"❌ [{self.phase}] Output failed validation: {e}")
+                    record.outcome = ATTEMPT_INVALID
+                    record.error = str(e)
+                    raw = e.raw
+                finally:
+                    record.duration_seconds = time.perf_counter() - started
+
+                self._emit(
+                    "attempt_result",
+                    attempt=attempt,
+                    outcome=record.outcome,
+                    duration_seconds=round(record.duration_seconds, 3),
+                    error=record.error,
+                )
+
+                if outcome.success:
+                    print(f"✅ [{self.phase}] Valid output on attempt {attempt}")
+                    break
+
+                repair_plan = None
+                if self.repair is not None and raw is not None:
+                    repair_plan = await self.repair(raw)
+
+                if repair_plan is not None:
+                    print(f"🩹 Repairing only: {repair_plan.sections}")
+                else:
+                    print("🔧 Retrying with stricter prompt...")
+        except asyncio.CancelledError:
+            # Also covers cancellation during backoff or repair planning
+            outcome.cancelled = True
+            self._finish(outcome)
+            raise
+
+        self._finish(outcome)
+
+        if not outcome.success:
+            print("🚨 Max retries reached. Aborting.")
+            raise RetryExhausted(
+                f"{self.phase}: no valid output after {len(outcome.attempts)} attempts",
+                outcome,
+            )
+
+        return outcome
+
+    def _finish(self, outcome: RetryOutcome):
+        if self.raw_output_source is not None:
+            # Drop any raw output captured for this session
+            self.raw_output_source(self.session_id)
+
+        _record_metrics(self.phase, outcome)
+
+    async def _run_attempt(
+        self,
+        runner: Runner,
+        message: types.Content,
+        reject_when_full: bool = False,
+    ) -> dict:
+        if self.admission is None:
+            return await self._run_agent(runner, message)
+
+        with admitting(self.admission, self.user_id, self.priority, reject_when_full):
+            return await self._run_agent(runner, message)
+
+    async def _run_agent(self, runner: Runner, message: types.Content) -> dict:
+        produced_output = False
+        total_tokens = 0
+
+        try:
+            async for event in runner.run_async(
+                user_id=self.user_id,
+                session_id=self.session_id,
+                new_message=message,
+            ):
+                state_delta = (event.actions.state_delta or {}) if event.actions else {}
+                if self.output_key in state_delta:
+                    produced_output = True
+                if state_delta:
+                    self._emit("state", author=event.author, keys=list(state_delta))
+                if event.usage_metadata and event.usage_metadata.total_token_count:
+                    total_tokens += event.usage_metadata.total_token_count
+                    self._emit("tokens", total_tokens=total_tokens)
+                if event.is_final_response() and event.content and event.content.parts:
+                    print(f"\n=== [{self.phase}] Final response ===")
+                    print(event.content.parts[0].text)
+        except (ValidationError, json.JSONDecodeError, ValueError) as e:
+            # The agent's own output_schema check rejected the response
+            raw = self.raw_output_source(self.session_id) if self.raw_output_source else None
+            raise InvalidOutput(str(e), raw) from e
+
+        if not produced_output:
+            raise InvalidOutput(f"Agent did not write '{self.output_key}' to the session")
+
+        session = await self.session_service.get_session(
+            app_name=self.app_name,
+            user_id=self.user_id,
+            session_id=self.session_id,
+        )
+        raw = session.state.get(self.output_key)
+        try:
+            return validate_output(raw, self.schema)
+        except (ValidationError, json.JSONDecodeError, ValueError) as e:
+            raise InvalidOutput(str(e), raw) from e
+
+
+def validate_output(raw: Any, schema: Type[BaseModel]) -> dict:
+    """Validate a session value (dict or JSON string) and return it as a dict."""
+    if isinstance(raw, str):
+        return schema.model_validate_json(raw).model_dump()
+    return schema.model_validate(raw).model_dump()
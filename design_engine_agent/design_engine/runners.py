@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService
+
+
+AgentFactory = Callable[[], BaseAgent]
+
+
+# =========================
+# Runner Registry
+# =========================
+
+class RunnerRegistry:
+    """
+    Builds each agent pipeline once and reuses its Runner per app_name.
+
+    Building agents compiles their output schemas and instructions, so
+    doing it per request is pure overhead: agents and runners keep no
+    per-invocation state and can be shared by concurrent requests.
+
+    Pipelines are registered by name with a factory. Both caches are LRU
+    bounded, since app names (project names) come from users and repair
+    pipelines are built per set of failing sections.
+    """
+
+    def __init__(
+        self,
+        session_service: BaseSessionService,
+        max_agents: int = 64,
+        max_runners: int = 512,
+    ):
+        self.session_service = session_service
+        self.max_agents = max_agents
+        self.max_runners = max_runners
+        self._factories: dict[str, AgentFactory] = {}
+        self._agents: OrderedDict[str, BaseAgent] = OrderedDict()
+        self._runners: OrderedDict[tuple[str, str], Runner] = OrderedDict()
+        self._metrics = {"agents_built": 0, "runners_built": 0, "hits": 0}
+
+    def register(self, pipeline: str, factory: AgentFactory):
+        self._factories[pipeline] = factory
+
+    def agent(self, pipeline: str, factory: Optional[AgentFactory] = None) -> BaseAgent:
+        agent = self._agents.get(pipeline)
+        if agent is not None:
+            self._agents.move_to_end(pipeline)
+            return agent
+
+        agent = (factory or self._factories[pipeline])()
+        self._metrics["agents_built"] += 1
+
+        self._agents[pipeline] = agent
+        while len(self._agents) > self.max_agents:
+            evicted, _ = self._agents.popitem(last=False)
+            self._drop_runners(evicted)
+        return agent
+
+    def runner(self, pipeline: str, app_name: str, factory: Optional[AgentFactory] = None) -> Runner:
+        """
+        Shared Runner for ``pipeline`` under ``app_name``. Dynamically
+        named pipelines pass their ``factory`` instead of registering it.
+        """
+        key = (pipeline, app_name)
+        runner = self._runners.get(key)
+        if runner is not None:
+            self._runners.move_to_end(key)
+            self._metrics["hits"] += 1
+            return runner
+
+        runner = Runner(
+            agent=self.agent(pipeline, factory),
+            app_name=app_name,
+            session_service=self.session_service,
+        )
+        self._metrics["runners_built"] += 1
+
+        self._runners[key] = runner
+        while len(self._runners) > self.max_runners:
+            self._runners.popitem(last=False)
+        return runner
+
+    def warm(self, *pipelines: str):
+        """Build the given pipelines' agents up front (e.g. at startup)."""
+        for pipeline in pipelines:
+            self.agent(pipeline)
+        print(f"✅ Agent pipelines ready: {', '.join(pipelines)}")
+
+    def stats(self) -> dict:
+        return {
+            **self._metrics,
+            "agents": len(self._agents),
+            "runners": len(self._runners),
+        }
+
+    def _drop_runners(self, pipeline: str):
+        for key in [k for k in self._runners if k[0] == pipeline]:
+            del self._runners[key]
@@ -0,0 +1,390 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+
+from .db import connect, enable_wal
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a JSON-like value, in bytes."""
+    return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+# =========================
+# Wizard state store
+# =========================
+
+class SessionStore(ABC):
+    """
+    Key/value store for per-session wizard state (Phase 2 questions,
+    answers, current question index).
+
+    Values are plain JSON-like dicts. Callers must ``set`` a value again
+    after changing it; stores are free to hand out copies.
+
+    Async code uses ``aget`` / ``aset`` / ``adelete``, which stores that
+    block (SQLite) run in a thread.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: dict):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    async def purge_expired(self) -> int:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+    async def aget(self, key: str) -> Optional[dict]:
+        return self.get(key)
+
+    async def aset(self, key: str, value: dict):
+        self.set(key, value)
+
+    async def adelete(self, key: str):
+        self.delete(key)
+
+
+class TTLSessionStore(SessionStore):
+    """
+    In-memory store with a per-entry TTL and an LRU bound on both the
+    number of entries and their estimated total size.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (value, expires_at, size)
+        self._entries: OrderedDict[str, tuple[dict, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._metrics = {"expired": 0, "evicted": 0}
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            self._metrics["expired"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: dict):
+        if key in self._entries:
+            self._remove(key)
+
+        size = estimate_size(value)
+        self._entries[key] = (value, time.time() + self.ttl_seconds, size)
+        self._bytes += size
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._metrics["evicted"] += 1
+
+    def delete(self, key: str):
+        if key in self._entries:
+            self._remove(key)
+
+    async def purge_expired(self) -> int:
+        now = time.time()
+        expired = [k for k, (_, expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        self._metrics["expired"] += len(expired)
+        return len(expired)
+
+    def stats(self) -> dict:
+        return {
+            **self._metrics,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    SQLite-backed store (WAL mode) shared by every uvicorn worker
+    process, so any worker can serve any step of the wizard.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 3600,
+        max_entries: int = 10_000,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._metrics = {"expired": 0, "evicted": 0}
+
+        enable_wal(self.path)
+        with connect(self.path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS wizard_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS wizard_state_lru ON wizard_state (last_access)"
+            )
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with connect(self.path) as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM wizard_state WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at <= now:
+                conn.execute("DELETE FROM wizard_state WHERE key = ?", (key,))
+                self._metrics["expired"] += 1
+                return None
+
+            conn.execute("UPDATE wizard_state SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key: str, value: dict):
+        encoded = json.dumps(value, default=str)
+        now = time.time()
+        with connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO wizard_state (key, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded.encode("utf-8")), now + self.ttl_seconds, now),
+            )
+            overflow = conn.execute("SELECT COUNT(*) FROM wizard_state").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM wizard_state WHERE key IN "
+                    "(SELECT key FROM wizard_state ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self._metrics["evicted"] += overflow
+
+    def delete(self, key: str):
+        with connect(self.path) as conn:
+            conn.execute("DELETE FROM wizard_state WHERE key = ?", (key,))
+
+    async def purge_expired(self) -> int:
+        return await asyncio.to_thread(self._purge_expired)
+
+    def _purge_expired(self) -> int:
+        with connect(self.path) as conn:
+            purged = conn.execute(
+                "DELETE FROM wizard_state WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+        self._metrics["expired"] += purged
+        return purged
+
+    # For async callers (see db.connect)
+    async def aget(self, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: dict):
+        await asyncio.to_thread(self.set, key, value)
+
+    async def adelete(self, key: str):
+        await asyncio.to_thread(self.delete, key)
+
+    def stats(self) -> dict:
+        with connect(self.path) as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM wizard_state"
+            ).fetchone()
+        return {
+            **self._metrics,
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.max_entries,
+        }
+
+
+# =========================
+# ADK session service
+# =========================
+
+class BoundedInMemorySessionService(InMemorySessionService):
+    """
+    InMemorySessionService that forgets idle sessions.
+
+    Sessions expire ``ttl_seconds`` after their last access, and the least
+    recently used ones are dropped once ``max_sessions`` or ``max_bytes``
+    (estimated from state + events) is exceeded. Sessions in use by a
+    queued or running job are pinned (``pin`` / ``unpin``) and never dropped.
+
+    The size of a session is measured once when it is created and then
+    grows by the size of every appended event.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_sessions: int = 1000,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        # (app_name, user_id, session_id) -> (last_access, size)
+        self._lru: OrderedDict[tuple[str, str, str], tuple[float, int]] = OrderedDict()
+        self._bytes = 0
+        # key -> number of queued or running jobs using the session
+        self._pinned: dict[tuple[str, str, str], int] = {}
+        self._metrics = {"expired": 0, "evicted": 0}
+
+    def pin(self, *, app_name: str, user_id: str, session_id: str):
+        key = (app_name, user_id, session_id)
+        self._pinned[key] = self._pinned.get(key, 0) + 1
+
+    def unpin(self, *, app_name: str, user_id: str, session_id: str):
+        key = (app_name, user_id, session_id)
+        count = self._pinned.get(key, 0) - 1
+        if count > 0:
+            self._pinned[key] = count
+        else:
+            self._pinned.pop(key, None)
+
+    async def create_session(self, *, app_name: str, user_id: str, **kwargs) -> Session:
+        session = await super().create_session(app_name=app_name, user_id=user_id, **kwargs)
+        storage = self.sessions.get(session.app_name, {}).get(session.user_id, {}).get(session.id)
+        self._touch(session, grow=len(storage.model_dump_json()) if storage else 0)
+        await self._enforce_bounds()
+        return session
+
+    async def get_session(
+        self, *, app_name: str, user_id: str, session_id: str, **kwargs
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        entry = self._lru.get(key)
+        if entry is not None and key not in self._pinned and entry[0] + self.ttl_seconds <= time.time():
+            await self.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+            self._metrics["expired"] += 1
+            return None
+
+        session = await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, **kwargs
+        )
+        if session is not None:
+            self._touch(session)
+        return session
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session, event)
+        # Partial (streaming) events are not stored
+        self._touch(session, grow=0 if event.partial else len(event.model_dump_json()))
+        await self._enforce_bounds()
+        return event
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        entry = self._lru.pop((app_name, user_id, session_id), None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    async def purge_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            key for key, (last_access, _) in self._lru.items()
+            if last_access <= cutoff and key not in self._pinned
+        ]
+        for app_name, user_id, session_id in expired:
+            await self.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        self._metrics["expired"] += len(expired)
+        return len(expired)
+
+    def stats(self) -> dict:
+        return {
+            **self._metrics,
+            "sessions": len(self._lru),
+            "pinned": len(self._pinned),
+            "bytes": self._bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _touch(self, session: Session, grow: int = 0):
+        key = (session.app_name, session.user_id, session.id)
+        old = self._lru.pop(key, None)
+        size = (old[1] if old else 0) + grow
+        self._bytes += grow
+        self._lru[key] = (time.time(), size)
+
+    async def _enforce_bounds(self):
+        candidates = iter(list(self._lru))
+        while len(self._lru) > self.max_sessions or self._bytes > self.max_bytes:
+            key = next((k for k in candidates if k not in self._pinned), None)
+            if key is None:
+                # Everything left is in use by a queued or running job
+                break
+            app_name, user_id, session_id = key
+            await self.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+            self._metrics["evicted"] += 1
+
+
+# =========================
+# Background expiry
+# =========================
+
+async def run_expiry_loop(*stores, interval: float = 60.0):
+    """
+    Periodically purge expired entries from every given store.
+    Stores without ``purge_expired`` (e.g. DatabaseSessionService) are skipped.
+    """
+    stores = [store for store in stores if hasattr(store, "purge_expired")]
+    while True:
+        await asyncio.sleep(interval)
+        for store in stores:
+            try:
+                purged = await store.purge_expired()
+                if purged:
+                    print(f"🧹 Expired {purged} entries from {type(store).__name__}")
+            except Exception as e:
+                print(f"❌ Session expiry failed for {type(store).__name__}: {e}")
@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+
+# =========================
+# Single-flight
+# =========================
+
+class _Flight:
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.listeners: list[Callable] = []
+
+    def emit(self, *args, **kwargs):
+        for listener in list(self.listeners):
+            try:
+                listener(*args, **kwargs)
+            except Exception as e:
+                print(f"⚠️ Progress listener failed: {e}")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+
+    The first caller for a key starts the work as a task; callers that
+    arrive while it is running await the same task instead of starting
+    their own. A caller that is cancelled (e.g. its client disconnected)
+    only stops waiting; the work itself is cancelled once nobody waits,
+    and later callers for the key start a new execution.
+
+    With ``progress``, ``work`` is called with one progress callback that
+    forwards every event to the ``progress`` of each caller waiting on it.
+
+    Coalescing is per process. Across worker processes the persistent
+    caches catch repeats once the first generation has finished.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: dict[str, _Flight] = {}
+        self._metrics = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    async def do(
+        self,
+        key: str,
+        work: Callable[..., Awaitable[Any]],
+        progress: Optional[Callable] = None,
+    ) -> tuple[Any, bool]:
+        """
+        Run ``work()`` for ``key`` or join the run already in flight.
+        Returns the result and whether it was shared from another caller.
+        """
+        self._metrics["calls"] += 1
+        flight = self._flights.get(key)
+        shared = flight is not None
+
+        if shared:
+            self._metrics["coalesced"] += 1
+            print(f"🔗 [{self.name}] Joined in-flight generation {key[:12]}")
+        else:
+            self._metrics["executions"] += 1
+            flight = self._flights[key] = _Flight()
+            flight.task = asyncio.create_task(work(flight.emit) if progress is not None else work())
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+
+        task = flight.task
+        flight.waiters += 1
+        if progress is not None:
+            flight.listeners.append(progress)
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if not task.done():
+                flight.waiters -= 1
+                if progress is not None:
+                    flight.listeners.remove(progress)
+                if flight.waiters == 0:
+                    # Callers arriving from now on must not join a dying task
+                    self._forget(key, flight)
+                    task.cancel()
+            raise
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> dict:
+        return {**self._metrics, "in_flight": len(self._flights)}
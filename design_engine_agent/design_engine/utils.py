@@ -2,13 +2,15 @@ from docx import Document
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import nsdecls, qn
 import re
-from pdfitdown.pdfconversion import Converter
-import builtins
+from functools import lru_cache
+from xml.sax.saxutils import escape
 from google.genai import types
 
+from .conversion import default_conversion_service
+
 
 generate_content_config = types.GenerateContentConfig(
     # 🔒 Enforce machine-readable output
@@ -113,6 +115,26 @@ def build_new_message_phase3(is_retry: bool = False):
         parts=[types.Part(text=base_prompt)]
     )
 
+def build_new_message_phase3_sections(is_retry: bool = False):
+    base_prompt = (
+        "Using all available session context (Phase 1 + Phase 2), generate "
+        "ONLY the system design section you are responsible for.\n"
+        "- Output JSON ONLY for that section\n"
+        "- No missing keys, no extra keys, no empty values\n"
+    )
+
+    if is_retry:
+        base_prompt += (
+            "\n⚠️ RETRY MODE:\n"
+            "- The previous document failed validation\n"
+            "- Output the SIMPLEST JSON that fully satisfies your section schema\n"
+        )
+
+    return types.Content(
+        role="user",
+        parts=[types.Part(text=base_prompt)]
+    )
+
 
 # =========================
 # Phase 1 – CLI Helpers
@@ -546,18 +568,60 @@ def safe_get(d: dict, path: list, default=None):
     return cur
 
 
+TABLE_STYLE = "Light Grid Accent 1"
+
+
 def add_table(doc: Document, headers: list[str], rows: list[list[str]]):
-    table = doc.add_table(rows=1, cols=len(headers))
-    table.style = "Light Grid Accent 1"
+    """
+    Appends a TABLE_STYLE table with a header row.
+
+    All rows are written as one XML string and parsed once, instead of
+    add_row().cells + cell.text per cell, which re-walks the table XML on
+    every access. The markup is the same as cell.text produces.
+    """
+    table = doc.add_table(rows=0, cols=len(headers))
+    table.style = TABLE_STYLE
 
-    hdr_cells = table.rows[0].cells
-    for i, h in enumerate(headers):
-        hdr_cells[i].text = h
+    tbl = table._tbl
+    cell_widths = [col.get(qn("w:w")) for col in tbl.tblGrid.gridCol_lst]
+    xml = f"<w:tbl {nsdecls('w')}>{table_rows_xml([headers, *rows], cell_widths)}</w:tbl>"
+    tbl.extend(list(parse_xml(xml)))
 
+
+def table_rows_xml(rows: list[list], cell_widths: list[str]) -> str:
+    """<w:tr> markup for rows, with one cell per grid column (widths in twips)."""
+    cell_props = [f'<w:tcPr><w:tcW w:type="dxa" w:w="{w}"/></w:tcPr>' for w in cell_widths]
+    xml = []
     for row in rows:
-        row_cells = table.add_row().cells
-        for i, cell in enumerate(row):
-            row_cells[i].text = str(cell)
+        xml.append("<w:tr>")
+        for i, props in enumerate(cell_props):
+            # Cells missing from a short row stay empty, like add_row() leaves them
+            run = run_xml(str(row[i])) if i < len(row) else ""
+            xml.append(f"<w:tc>{props}<w:p>{run}</w:p></w:tc>")
+        xml.append("</w:tr>")
+    return "".join(xml)
+
+
+_RUN_BREAKS = re.compile(r"([\t\r\n])")
+
+
+@lru_cache(maxsize=4096)
+def run_xml(text: str, props: str = "") -> str:
+    """
+    <w:r> markup for text, as python-docx's Run.text setter writes it.
+    props is inserted as the run properties (e.g. "<w:rPr><w:b/></w:rPr>").
+    """
+    parts = ["<w:r>", props]
+    for chunk in _RUN_BREAKS.split(text):
+        if chunk == "\t":
+            parts.append("<w:tab/>")
+        elif chunk in ("\r", "\n"):
+            parts.append("<w:br/>")
+        elif chunk:
+            space = ' xml:space="preserve"' if chunk.strip() != chunk else ""
+            parts.append(f"<w:t{space}>{escape(chunk)}</w:t>")
+    parts.append("</w:r>")
+    return "".join(parts)
 
 
 def sanitize_mermaid_output(text: str) -> str | None:
@@ -619,6 +683,27 @@ def sanitize_mermaid_output(text: str) -> str | None:
     return "\n".join(cleaned_lines)
 
 
+class DocxWriter:
+    """Writes layout blocks (headings, paragraphs, tables) into a python-docx Document."""
+
+    def __init__(self):
+        self.doc = Document()
+
+    def heading(self, text, level=1):
+        self.doc.add_heading(text, level=level)
+
+    def paragraph(self, text, bold=False):
+        p = self.doc.add_paragraph()
+        run = p.add_run(text)
+        run.bold = bold
+
+    def table(self, headers, rows):
+        add_table(self.doc, headers=headers, rows=rows)
+
+    def save(self, output_path: str):
+        self.doc.save(output_path)
+
+
 def render_phase3_design_to_word(phase3: dict, output_path: str):
     """
     Renders Phase 3 system design to a Word document.
@@ -627,15 +712,22 @@ def render_phase3_design_to_word(phase3: dict, output_path: str):
       - diagrams['user_flows']
       - diagrams['database_er']
     """
-    doc = Document()
+    # render_plan imports this module
+    from .render_plan import write_phase3_design_from_plan
 
-    def add_heading(text, level=1):
-        doc.add_heading(text, level=level)
+    writer = DocxWriter()
+    write_phase3_design_from_plan(phase3, writer)
+    writer.save(output_path)
 
-    def add_paragraph(text, bold=False):
-        p = doc.add_paragraph()
-        run = p.add_run(text)
-        run.bold = bold
+
+def write_phase3_design(phase3: dict, writer):
+    """
+    Lays out a Phase 3 design as headings, paragraphs and tables.
+    Tolerant of missing keys: the renderers use it for designs that do
+    not validate against Phase3SystemDesign (see render_plan).
+    """
+    add_heading = writer.heading
+    add_paragraph = writer.paragraph
 
     # -----------------------------
     # Title
@@ -697,7 +789,7 @@ def render_phase3_design_to_word(phase3: dict, output_path: str):
                     ", ".join(c.get("technologies", [])),
                     ", ".join(c.get("interfaces", [])),
                 ])
-            add_table(doc, headers=["Component", "Responsibility", "Technologies", "Interfaces"], rows=rows)
+            writer.table(headers=["Component", "Responsibility", "Technologies", "Interfaces"], rows=rows)
 
     # -----------------------------
     # Database Design (TABLE)
@@ -717,7 +809,7 @@ def render_phase3_design_to_word(phase3: dict, output_path: str):
                     col.get("nullable"),
                     col.get("description"),
                 ])
-            add_table(doc, headers=["Column", "Type", "Nullable", "Description"], rows=rows)
+            writer.table(headers=["Column", "Type", "Nullable", "Description"], rows=rows)
 
     # -----------------------------
     # Cost Estimation (TABLE)
@@ -728,7 +820,7 @@ def render_phase3_design_to_word(phase3: dict, output_path: str):
         rows = []
         for c in ce.get("cost_items", []):
             rows.append([c.get("name"), f"${c.get('monthly_estimate_usd')}", c.get("rationale")])
-        add_table(doc, headers=["Cost Item", "Monthly Cost", "Rationale"], rows=rows)
+        writer.table(headers=["Cost Item", "Monthly Cost", "Rationale"], rows=rows)
 
     # -----------------------------
     # Testing Strategy
@@ -776,7 +868,6 @@ def render_phase3_design_to_word(phase3: dict, output_path: str):
             add_paragraph("Database ER Diagram (Mermaid Code):", bold=True)
             add_paragraph(sanitize_mermaid_output(md["database_er"]))
 
-    doc.save(output_path)
 
 
 
@@ -977,24 +1068,13 @@ def render_phase3_design_to_word(phase3: dict, output_path: str):
 
 
 
-converter = Converter()
-
-def convert_docx_to_pdf(word_file_path: str, pdf_file_path: str):
-    # Patch open() for utf-8 safety (as required by pdfitdown)
-    orig_open = builtins.open
-
-    def open_utf8(file, mode='r', *args, **kwargs):
-        if 'b' not in mode:
-            kwargs['encoding'] = 'utf-8'
-        return orig_open(file, mode, *args, **kwargs)
-
-    builtins.open = open_utf8
-
-    try:
-        converter.convert(
-            file_path=word_file_path,
-            output_path=pdf_file_path
-        )
-        print(f"✅ PDF generated: {pdf_file_path}")
-    finally:
-        builtins.open = orig_open
\ No newline at end of file
+def convert_docx_to_pdf(word_file_path: str, pdf_file_path: str, timeout: float | None = None) -> dict:
+    """
+    Convert a Word document to PDF in the shared conversion worker pool.
+    Thread-safe: each conversion runs in its own worker process.
+    """
+    result = default_conversion_service().convert_sync(
+        word_file_path, pdf_file_path, timeout=timeout
+    )
+    print(f"✅ PDF generated: {pdf_file_path}")
+    return result
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from typing import Optional
+
+import litellm
+
+
+# =========================
+# Model Warmup
+# =========================
+
+class ModelWarmup:
+    """
+    Loads the configured models before the first real request.
+
+    A one-token completion per model makes Ollama load the weights and
+    makes LiteLLM create its pooled async HTTP client for the provider.
+    ``keep_alive`` is passed to Ollama so the model stays resident, and
+    ``refresh_interval`` re-pings it so idle periods do not unload it.
+
+    ``ready`` flips to True once every model answered; until then
+    warmup keeps retrying with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        models: list[str],
+        keep_alive: str = "30m",
+        timeout: float = 300.0,
+        refresh_interval: Optional[float] = 120.0,
+        max_backoff: float = 60.0,
+        api_base: Optional[str] = None,
+    ):
+        self.models = models
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.refresh_interval = refresh_interval
+        self.max_backoff = max_backoff
+        self.api_base = api_base
+        self.ready = False
+        self._status: dict[str, dict] = {
+            model: {"warm": False, "seconds": None, "error": None, "last_ping": None}
+            for model in models
+        }
+
+    async def ping(self, model: str):
+        started = time.perf_counter()
+        await litellm.acompletion(
+            model=model,
+            messages=[{"role": "user", "content": "ping"}],
+            max_tokens=1,
+            temperature=0.0,
+            keep_alive=self.keep_alive,
+            timeout=self.timeout,
+            **({"api_base": self.api_base} if self.api_base else {}),
+        )
+        status = self._status[model]
+        status.update(
+            warm=True,
+            seconds=round(time.perf_counter() - started, 3),
+            error=None,
+            last_ping=time.time(),
+        )
+
+    async def warm(self):
+        """Ping every model until all of them respond."""
+        delay = 1.0
+        pending = list(self.models)
+        while pending:
+            for model in list(pending):
+                try:
+                    await self.ping(model)
+                    pending.remove(model)
+                    print(f"🔥 Model {model} warm in {self._status[model]['seconds']:.1f}s")
+                except Exception as e:
+                    self._status[model]["error"] = str(e)
+                    print(f"⚠️ Warmup of {model} failed: {e}")
+
+            if pending:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+
+        self.ready = True
+
+    async def run(self):
+        """Warm up, then keep the models resident."""
+        await self.warm()
+        if not self.refresh_interval:
+            return
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            for model in self.models:
+                try:
+                    await self.ping(model)
+                except Exception as e:
+                    self._status[model]["error"] = str(e)
+                    print(f"⚠️ Keep-alive ping of {model} failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "keep_alive": self.keep_alive,
+            "models": self._status,
+        }
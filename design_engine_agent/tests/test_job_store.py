@@ -0,0 +1,62 @@
+"""
+Several job queues (one per worker process in production) sharing one
+SqliteJobStore must all see each other's jobs.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from design_engine.jobs import ACTIVE_STATUSES, JOB_QUEUED, JobQueue, SqliteJobStore
+
+USER_ID = "store-user"
+
+
+def test_concurrent_submits_are_all_listed(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+
+    async def run():
+        release = asyncio.Event()
+
+        async def work(job):
+            await release.wait()
+            return job.session_id
+
+        queues = [
+            JobQueue(num_workers=1, max_queue_size=20, store=SqliteJobStore(path))
+            for _ in range(4)
+        ]
+        # Not started: every job stays queued while the stores are written
+        for round_ in range(10):
+            for index, queue in enumerate(queues):
+                queue.submit(
+                    kind="phase3",
+                    user_id=USER_ID,
+                    app_name="app",
+                    session_id=f"session-{index}-{round_}",
+                    work=work,
+                )
+        await asyncio.gather(*(queue.stop() for queue in queues))
+
+        # A queue of another process sees every job through the store
+        observer = JobQueue(store=SqliteJobStore(path))
+        listed = await observer.alist_jobs(USER_ID, statuses=ACTIVE_STATUSES)
+        found = await observer.afind_active(USER_ID, "session-3-9")
+        return listed, found
+
+    listed, found = asyncio.run(run())
+    assert len(listed) == 40
+    assert {job.status for job in listed} == {JOB_QUEUED}
+    assert found is not None and found.session_id == "session-3-9"
+
+
+def test_remote_cancel_request_is_kept_on_save(tmp_path):
+    store = SqliteJobStore(tmp_path / "jobs.sqlite3")
+    data = {"id": "job-1", "user_id": USER_ID, "status": JOB_QUEUED, "created_at": 1.0}
+    store.save(data)
+    store.request_cancel("job-1", "Cancelled by user")
+    store.save({**data, "status": "running"})
+
+    assert store.watch_state(["job-1"]) == {"job-1": ("Cancelled by user", None)}
+    assert store.get("job-1")["status"] == "running"
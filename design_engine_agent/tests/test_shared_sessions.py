@@ -0,0 +1,136 @@
+"""
+One Phase 2 -> Phase 3 flow served by several worker processes that
+share the SQLite session backend (DESIGN_ENGINE_SESSION_BACKEND=sqlite).
+
+Every step runs in a fresh process, like requests landing on different
+uvicorn workers. No LLM is called: Phase 2 state is written directly and
+the Phase 3 job work is replaced by one that reports the session state.
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+AGENT_ROOT = Path(__file__).resolve().parents[1]
+
+APP_NAME = "Shared Sessions"
+USER_ID = "shared-user"
+QUESTION = "Which database?"
+
+
+def run_in_worker(fn, *args):
+    """Run ``fn`` in a new spawned process, as if served by another worker."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(fn, *args).result(timeout=120)
+
+
+def load_app(data_dir: str):
+    os.environ.update({
+        "DESIGN_ENGINE_SESSION_BACKEND": "sqlite",
+        "DESIGN_ENGINE_DB_PATH": f"{data_dir}/design_engine.sqlite3",
+        "DESIGN_ENGINE_CACHE_DIR": f"{data_dir}/cache",
+        "DESIGN_ENGINE_CATALOG_PATH": f"{data_dir}/projects.sqlite3",
+        "DESIGN_ENGINE_WARMUP": "false",
+        "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+    })
+    # The app resolves templates, static files and documents from here
+    os.chdir(AGENT_ROOT)
+    sys.path.insert(0, str(AGENT_ROOT))
+    from design_engine.app import main
+    return main
+
+
+# =========================
+# Worker-side steps
+# =========================
+
+def start_wizard(data_dir: str) -> str:
+    """Worker 1: create the project session and its Phase 2 wizard state."""
+    main = load_app(data_dir)
+    session_id = "shared-session-1"
+    phase_1_inputs = {"project_name": APP_NAME, "user": USER_ID, "description": "d"}
+
+    async def run():
+        await main.session_service_stateful.create_session(
+            app_name=APP_NAME,
+            user_id=USER_ID,
+            session_id=session_id,
+            state={"phase_1_inputs": phase_1_inputs},
+        )
+        await main.phase2_sessions.aset(session_id, {
+            "phase_1_inputs": phase_1_inputs,
+            "questions": {QUESTION: {"type": "multi_choice", "options": ["PostgreSQL", "Other"]}},
+            "question_keys": [QUESTION],
+            "current_index": 0,
+            "answers": {},
+        })
+
+    asyncio.run(run())
+    return session_id
+
+
+def submit_answers(data_dir: str, session_id: str) -> dict:
+    """Worker 2: submit the answers and run the queued Phase 3 job."""
+    main = load_app(data_dir)
+    from fastapi.testclient import TestClient
+
+    async def phase3_work(job) -> dict:
+        session = await main.session_service_stateful.get_session(
+            app_name=job.app_name, user_id=job.user_id, session_id=job.session_id
+        )
+        return {
+            "phase_1_inputs": session.state["phase_1_inputs"],
+            "phase_2_answers": session.state["phase_2_answers"],
+        }
+
+    main.run_phase3_job = phase3_work
+    with TestClient(main.app) as client:
+        accepted = client.post(
+            f"/api/projects/{session_id}/answers",
+            json={"answers": {QUESTION: "PostgreSQL"}},
+        )
+        assert accepted.status_code == 202, accepted.text
+        job = client.get(f"/api/jobs/{accepted.json()['id']}", params={"wait": 30}).json()
+    return job
+
+
+def read_back(data_dir: str, job_id: str, session_id: str) -> dict:
+    """Worker 3: look the job, the session and the wizard state up."""
+    main = load_app(data_dir)
+    from fastapi.testclient import TestClient
+
+    with TestClient(main.app) as client:
+        job = client.get(f"/api/jobs/{job_id}").json()
+
+    async def run():
+        session = await main.session_service_stateful.get_session(
+            app_name=APP_NAME, user_id=USER_ID, session_id=session_id
+        )
+        return session.state, await main.phase2_sessions.aget(session_id)
+
+    state, wizard = asyncio.run(run())
+    return {"job": job, "state": state, "wizard": wizard}
+
+
+# =========================
+# Test
+# =========================
+
+def test_flow_across_worker_processes(tmp_path):
+    data_dir = str(tmp_path)
+
+    session_id = run_in_worker(start_wizard, data_dir)
+    job = run_in_worker(submit_answers, data_dir, session_id)
+    assert job["status"] == "succeeded", job
+    assert job["result"]["phase_1_inputs"]["project_name"] == APP_NAME
+    assert job["result"]["phase_2_answers"] == {QUESTION: ["PostgreSQL"]}
+
+    seen = run_in_worker(read_back, data_dir, job["id"], session_id)
+    assert seen["job"]["status"] == "succeeded"
+    assert seen["job"]["result"] == job["result"]
+    assert seen["state"]["phase_2_answers"] == {QUESTION: ["PostgreSQL"]}
+    assert seen["state"]["phase_1_inputs"]["user"] == USER_ID
+    # Answered wizards are removed from the shared store
+    assert seen["wizard"] is None